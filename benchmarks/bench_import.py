@@ -0,0 +1,75 @@
+"""
+导入耗时检查: 在新的解释器进程中使用 python -X importtime 测量各导入语句的耗时, 并检查不应被提前加载的模块
+    1. import xyplot / xyplot.io / xyplot.batch 不加载 matplotlib 与 scipy
+    2. from xyplot import XyPlot 不加载 pyplot(交互式后端)、scipy 与填色图模块 xyplot.DrawContourf
+    存在不应加载的模块, 或耗时超过 --budget 指定的上限(毫秒)时以非0状态码退出, 可用于检查导入耗时的退化
+    python benchmarks/bench_import.py [-n 重复次数] [--budget 'from xyplot import XyPlot=1500'] [-v]
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 导入语句: 不应被加载的模块(前缀匹配)
+CASES = {
+    'import xyplot': ('matplotlib', 'scipy', 'pandas'),
+    'import xyplot.io': ('matplotlib', 'scipy', 'pandas'),
+    'import xyplot.batch': ('matplotlib', 'scipy', 'pandas'),
+    'from xyplot import XyPlot': ('matplotlib.pyplot', 'scipy', 'pandas', 'xyplot.DrawContourf', 'xyplot.Regrid'),
+}
+
+
+def importtime(statement):
+    """
+    在新的解释器进程中执行导入语句
+    Returns
+    -------
+    (总耗时(微秒), {模块名: (自身耗时, 累计耗时)})
+    """
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, (ROOT, os.environ.get('PYTHONPATH')))))
+    env.pop('MPLBACKEND', None)
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement], env=env, cwd=ROOT,
+                          capture_output=True, text=True, check=True)
+    total, modules = 0, dict()
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative, name = line[len('import time:'):].split('|')
+        modules[name.strip()] = (int(self_us), int(cumulative))
+        # 顶层导入(缩进最少)的累计耗时之和即为总耗时
+        if len(name) - len(name.lstrip()) == 1:
+            total += int(cumulative)
+    return total, modules
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-n', '--number', type=int, default=3)
+    parser.add_argument('--budget', action='append', default=[], metavar='STATEMENT=MS',
+                        help='导入语句的耗时上限(毫秒, 取多次测量中的最短耗时)')
+    parser.add_argument('-v', '--verbose', action='store_true', help='输出耗时最多的模块')
+    args = parser.parse_args(argv)
+    budgets = {k.strip(): float(v) for k, v in (item.rsplit('=', 1) for item in args.budget)}
+
+    failed = False
+    print(f"{'statement':<32}{'best ms':>10}  status")
+    for statement, forbidden in CASES.items():
+        runs = [importtime(statement) for _ in range(args.number)]
+        total, modules = min(runs, key=lambda run: run[0])
+        loaded = [prefix for prefix in forbidden
+                  if any(name == prefix or name.startswith(prefix + '.') for name in modules)]
+        problems = [f"loads {', '.join(loaded)}"] if loaded else []
+        if statement in budgets and total / 1e3 > budgets[statement]:
+            problems.append(f"over budget {budgets[statement]:.0f} ms")
+        failed = failed or bool(problems)
+        print(f"{statement:<32}{total / 1e3:>10.1f}  {'; '.join(problems) or 'ok'}")
+        if args.verbose:
+            for name, (self_us, _) in sorted(modules.items(), key=lambda item: -item[1][0])[:10]:
+                print(f"    {name:<40}{self_us / 1e3:>8.1f} ms")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
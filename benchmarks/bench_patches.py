@@ -0,0 +1,54 @@
+"""
+批量绘制几何图形的性能测试:
+    对比逐个添加 Patch(Branch.patches 的 circle 列表配置) 与合并为一个 PatchCollection(collection 配置)
+    在构建配置调度与渲染(Agg 画布绘制)两部分的耗时
+    python benchmarks/bench_patches.py [-n 图形个数]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+
+from xyplot import XyPlot  # noqa: E402
+
+
+def measure(axes):
+    """返回 (构建耗时, 渲染耗时)"""
+    t = time.perf_counter()
+    xyplt = XyPlot(axes=axes)
+    t_build = time.perf_counter() - t
+    t = time.perf_counter()
+    xyplt.to_rgba()
+    t_draw = time.perf_counter() - t
+    xyplt.close()
+    return t_build, t_draw
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('-n', '--number', type=int, default=10000)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    xy = rng.uniform(0, 100, (args.number, 2))
+    radius = rng.uniform(0.1, 0.5, args.number)
+    colors = rng.uniform(0, 1, (args.number, 3))
+    limits = dict(xlim=(0, 100), ylim=(0, 100))
+
+    circles = [dict(xy=tuple(p), radius=r, facecolor=c, edgecolor='k') for p, r, c in zip(xy, radius, colors)]
+    per_patch = dict(Branch=dict(patches=dict(circle=circles)), **limits)
+    collection = dict(Branch=dict(patches=dict(collection=dict(kind='circle', xy=xy, radius=radius,
+                                                               facecolors=colors, edgecolors='k'))), **limits)
+
+    print(f"{'case':<24}{'patches':>10}{'build s':>10}{'draw s':>10}{'total s':>10}")
+    for name, axes in (('per patch', per_patch), ('PatchCollection', collection)):
+        t_build, t_draw = measure(axes)
+        print(f"{name:<24}{args.number:>10}{t_build:>10.3f}{t_draw:>10.3f}{t_build + t_draw:>10.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,227 @@
+"""
+读取 → 插值 → 绘制 → 保存 全流程的性能测试, 结果保存为 JSON 以便对比不同提交之间的性能变化:
+    1. tecplot 解析: 自带的 P-L1-IMM-SWMF_*.dat 样例以及按样例格式生成的更大的合成文件
+    2. 散点插值: 建立插值权重(Delaunay 三角剖分) 与 复用权重的插值
+    3. XyPlotDirector 构建开销(配置拷贝与调度, 只有少量图元)
+    4. contourf、streamplot(无缓存/几何缓存命中)、patches(PatchCollection)、colorbar
+    5. PNG/PDF 保存
+    每个用例在 small/medium/large 几种数据规模下重复测量, 记录最短、中位数与平均耗时
+
+    python benchmarks/bench_pipeline.py [-s small medium] [-n 重复次数] [-o results.json] [-k 用例名称片段]
+    python benchmarks/bench_pipeline.py --compare base.json new.json [--threshold 1.1]
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import matplotlib  # noqa: E402
+matplotlib.use('Agg')
+import numpy as np  # noqa: E402
+
+from xyplot import XyPlot  # noqa: E402
+from xyplot.io import read_tecplot  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE = os.path.join(ROOT, "P-L1-IMM-SWMF_20221018004619_0005M_SWMF.dat")
+RESULTS_DIR = os.path.join(ROOT, 'benchmarks', 'results')
+
+# 各数据规模: (tecplot 合成文件的 I, J), 规则网格边长, 散点个数, 几何图形个数
+SIZES = dict(
+    small=dict(zone=(78, 49), grid=100, points=2000, patches=1000),
+    medium=dict(zone=(312, 196), grid=300, points=20000, patches=10000),
+    large=dict(zone=(780, 490), grid=1000, points=200000, patches=100000),
+)
+LEVELS = np.linspace(-1, 1, 21)
+
+
+def write_tecplot(file, i, j):
+    """按样例文件的格式(F=POINT 有序zone)生成合成的 tecplot 文件"""
+    rng = np.random.default_rng(0)
+    theta, r = np.meshgrid(np.linspace(0, 2 * np.pi, i), np.linspace(1, 8, j))
+    columns = [r * np.cos(theta), r * np.sin(theta)] + [rng.normal(size=theta.shape) for _ in range(6)]
+    with open(file, 'w') as f:
+        f.write('TITLE="synthetic"\n')
+        f.write('VARIABLES=' + ','.join(f'"V{n}"' for n in range(len(columns))) + '\n')
+        f.write(f'ZONE T="synthetic" I={i}, J={j}, F=POINT\n')
+        np.savetxt(f, np.column_stack([c.ravel() for c in columns]), fmt='%11.3E')
+
+
+def field(n):
+    """边长为 n 的规则网格上的标量场与矢量场"""
+    x = y = np.linspace(-3, 3, n)
+    X, Y = np.meshgrid(x, y)
+    Z = np.sin(X) * np.cos(Y)
+    return X, Y, Z, -Y, X
+
+
+def render(axes, **kwargs):
+    """构建并在 Agg 画布上完整绘制一次"""
+    with XyPlot(axes=axes, **kwargs) as xyplt:
+        xyplt.to_rgba()
+
+
+def cases(size, tmp):
+    """返回 {用例名称: (准备函数, 计时函数)}, 准备函数的返回值作为计时函数的参数, 准备部分不计时"""
+    from xyplot import Regrid, Streamline
+    cfg = SIZES[size]
+    n = cfg['grid']
+    X, Y, Z, U, V = field(n)
+    rng = np.random.default_rng(1)
+    points = rng.uniform(-3, 3, (cfg['points'], 2))
+    values = np.sin(points[:, 0]) * np.cos(points[:, 1])
+    xi = (X, Y)
+    tec = os.path.join(tmp, f'{size}.dat')
+    write_tecplot(tec, *cfg['zone'])
+    xy = rng.uniform(0, 100, (cfg['patches'], 2))
+    radius = rng.uniform(0.1, 0.5, cfg['patches'])
+    contourf = dict(Branch=dict(contourf=dict(init=dict(args=(X, Y, Z), levels=LEVELS, extend='both'))))
+    colorbar = dict(Branch=dict(contourf=dict(init=dict(args=(X, Y, Z), levels=LEVELS, extend='both'),
+                                              cbar=dict(init=dict(shrink=0.8, orientation='horizontal')))))
+    stream = dict(streamplot=dict(args=(X, Y, U, V), density=1.5, linewidth=0.5))
+    patches = dict(Branch=dict(patches=dict(collection=dict(kind='circle', xy=xy, radius=radius))),
+                   xlim=dict(args=(0, 100)), ylim=dict(args=(0, 100)))
+
+    def saved(fmt):
+        def prepare():
+            return XyPlot(axes=contourf)
+
+        def run(xyplt):
+            xyplt.to_bytes(fmt)
+            xyplt.close()
+        return prepare, run
+
+    def clear_streamlines():
+        Streamline.clear_cache()
+
+    def warm_streamlines():
+        render(stream)
+
+    return {
+        'tecplot.parse': (None, lambda: read_tecplot(tec)),
+        'tecplot.sample': (None, lambda: read_tecplot(SAMPLE)) if size == 'small' else None,
+        'regrid.weights': (Regrid.clear_cache, lambda: Regrid.regrid(points, values, xi)),
+        'regrid.cached': (None, lambda: Regrid.regrid(points, values, xi)),
+        'director.overhead': (None, lambda: XyPlot(axes=dict(title='t', xlabel='x', ylabel='y',
+                                                             xlim=dict(args=(0, 1)))).close()),
+        'contourf': (None, lambda: render(contourf)),
+        'colorbar': (None, lambda: render(colorbar)),
+        'streamplot': (clear_streamlines, lambda: render(stream)),
+        'streamplot.cached': (warm_streamlines, lambda: render(stream)),
+        'patches': (None, lambda: render(patches)),
+        'save.png': saved('png'),
+        'save.pdf': saved('pdf'),
+    }
+
+
+def measure(prepare, run, number):
+    """重复 number 次, 返回每次的耗时(秒), 首次调用作为预热不计入"""
+    times = []
+    for i in range(number + 1):
+        arg = None if prepare is None else prepare()
+        arg = () if arg is None else (arg, )
+        t = time.perf_counter()
+        run(*arg)
+        if i:
+            times.append(time.perf_counter() - t)
+    return times
+
+
+def metadata():
+    """运行环境与当前提交信息"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return dict(
+        commit=commit,
+        date=datetime.datetime.now().isoformat(timespec='seconds'),
+        python=platform.python_version(),
+        numpy=np.__version__,
+        matplotlib=matplotlib.__version__,
+        machine=platform.machine(),
+        processor=platform.processor(),
+        cpu_count=os.cpu_count(),
+    )
+
+
+def run_suite(sizes, number, keyword=None, report=print):
+    """运行测试, 返回 {'meta': 运行环境, 'results': {'用例名称[规模]': 统计结果}}"""
+    results = dict()
+    tmp = tempfile.mkdtemp()
+    try:
+        for size in sizes:
+            for name, case in cases(size, tmp).items():
+                key = f"{name}[{size}]"
+                if case is None or (keyword and keyword not in key):
+                    continue
+                times = measure(*case, number)
+                results[key] = dict(min=min(times), median=statistics.median(times), mean=statistics.fmean(times),
+                                    number=number)
+                if report is not None:
+                    report(f"{key:<32}{results[key]['min'] * 1e3:>12.2f}{results[key]['median'] * 1e3:>12.2f}")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return dict(meta=metadata(), results=results)
+
+
+def compare(base_file, new_file, threshold=1.1):
+    """对比两次测试结果的中位数耗时, 返回变慢超过阈值的用例个数"""
+    with open(base_file) as f:
+        base = json.load(f)
+    with open(new_file) as f:
+        new = json.load(f)
+    print(f"base: {base['meta'].get('commit')}  new: {new['meta'].get('commit')}")
+    print(f"{'case':<32}{'base ms':>12}{'new ms':>12}{'ratio':>10}")
+    regressions = 0
+    for key, result in new['results'].items():
+        if key not in base['results']:
+            continue
+        old, cur = base['results'][key]['median'], result['median']
+        ratio = cur / old if old else float('inf')
+        flag = ''
+        if ratio > threshold:
+            flag = '  slower'
+            regressions += 1
+        elif ratio < 1 / threshold:
+            flag = '  faster'
+        print(f"{key:<32}{old * 1e3:>12.2f}{cur * 1e3:>12.2f}{ratio:>9.2f}x{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-s', '--sizes', nargs='+', choices=list(SIZES), default=['small', 'medium'])
+    parser.add_argument('-n', '--number', type=int, default=3)
+    parser.add_argument('-k', '--keyword', default=None, help='只运行名称中包含该片段的用例')
+    parser.add_argument('-o', '--output', default=None,
+                        help='结果文件, 默认为 benchmarks/results/<提交>.json')
+    parser.add_argument('--compare', nargs=2, metavar=('BASE', 'NEW'), help='对比两次测试结果')
+    parser.add_argument('--threshold', type=float, default=1.1, help='对比时判定为变慢的耗时比例')
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        return 1 if compare(*args.compare, args.threshold) else 0
+
+    print(f"{'case':<32}{'min ms':>12}{'median ms':>12}")
+    suite = run_suite(args.sizes, args.number, args.keyword)
+    output = args.output or os.path.join(RESULTS_DIR, f"{suite['meta']['commit'] or 'latest'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(suite, f, indent=2)
+    print(f"Results written to {output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,71 @@
+"""
+set_rc 的绘图开销测试:
+    对比不使用 set_rc、使用 set_rc(只修改并恢复涉及的键, 校验结果缓存)以及原有的
+    全量拷贝/全量恢复 rcParams 方式, 每次绘图的耗时与临时修改 rcParams 本身的耗时
+    python benchmarks/bench_rc.py [-n 重复次数]
+"""
+import argparse
+import copy
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import matplotlib as mpl  # noqa: E402
+import numpy as np  # noqa: E402
+
+from xyplot import XyPlot  # noqa: E402
+from xyplot.xyplotBuilder import SetTempRc  # noqa: E402
+
+THEME = {'figure.facecolor': 'k', 'axes.labelcolor': 'w', 'axes.titlecolor': 'w', 'ytick.color': 'w',
+         'xtick.color': 'w', 'font.size': 12, 'lines.linewidth': 2, 'font.sans-serif': ['DejaVu Sans']}
+
+
+class LegacyTempRc:
+    """原有实现: 全量拷贝 rcParams, 恢复时逐个键重新赋值(每个键都经过校验)"""
+    def __init__(self, **kwargs):
+        self.Raw_Rc = copy.copy(mpl.rcParams)
+        for k, v in kwargs.items():
+            mpl.rcParams[k] = v
+
+    def revert(self):
+        for k, v in self.Raw_Rc.items():
+            mpl.rcParams[k] = v
+
+
+def timeit(func, number):
+    """返回 number 次调用的平均耗时"""
+    func()
+    t = time.perf_counter()
+    for _ in range(number):
+        func()
+    return (time.perf_counter() - t) / number
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('-n', '--number', type=int, default=200)
+    args = parser.parse_args(argv)
+
+    x = np.linspace(-np.pi, np.pi, 100)
+    axes = dict(plot=dict(args=(x, np.sin(x))), title='y=sin(x)')
+
+    def render(**kwargs):
+        XyPlot(axes=axes, **kwargs).close()
+
+    print(f"{'case':<32}{'us/call':>12}")
+    for name, func in (
+            ('temp rc (legacy full copy)', lambda: LegacyTempRc(**THEME).revert()),
+            ('temp rc (scoped, cached)', lambda: SetTempRc(**THEME).revert()),
+    ):
+        print(f"{name:<32}{timeit(func, args.number) * 1e6:>12.1f}")
+    for name, func in (
+            ('render without set_rc', lambda: render()),
+            ('render with set_rc', lambda: render(set_rc=THEME)),
+    ):
+        print(f"{name:<32}{timeit(func, max(1, args.number // 10)) * 1e6:>12.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+Tecplot ASCII 读取性能测试:
+    1. 对比 main.py 中原有的逐行解析方式与 xyplot.io.tecplot 的向量化解析
+    2. 对比二进制缓存的冷加载(解析 + 写缓存)与热加载(内存映射), 以及热加载后读取3个变量的耗时
+    python benchmarks/bench_tecplot.py [file ...] [-n 重复次数]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from xyplot.io import read_tecplot  # noqa: E402
+
+SAMPLE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                      "P-L1-IMM-SWMF_20221018004619_0005M_SWMF.dat")
+
+
+def legacy_read_data(file):
+    """main.py 中原有的读取方式(逐行解析 + pandas.DataFrame)"""
+    import pandas as pd
+    with open(file, 'r') as f:
+        line_list = list(filter(lambda x: x[0] != '#', f.readlines()))
+    variables = line_list[1].strip().split("=")[1].replace('"', '').split(",")
+    data_list = []
+    for line in line_list[6:]:
+        try:
+            line_data = [float(i) for i in line.strip().split(" ") if i]
+        except:
+            continue
+        data_list.append(line_data)
+
+    return pd.DataFrame(columns=variables, data=data_list)
+
+
+def timeit(func, file, number):
+    """返回 number 次调用中的最短耗时"""
+    best = float('inf')
+    for _ in range(number):
+        t = time.perf_counter()
+        func(file)
+        best = min(best, time.perf_counter() - t)
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('files', nargs='*', default=[SAMPLE])
+    parser.add_argument('-n', '--number', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    print(f"{'file':<48}{'MB':>8}{'legacy MB/s':>14}{'tecplot MB/s':>14}{'speedup':>10}")
+    for file in args.files:
+        mb = os.path.getsize(file) / 2 ** 20
+        legacy = timeit(legacy_read_data, file, args.number)
+        vectorized = timeit(read_tecplot, file, args.number)
+        print(f"{os.path.basename(file)[-48:]:<48}{mb:>8.2f}{mb / legacy:>14.1f}{mb / vectorized:>14.1f}"
+              f"{legacy / vectorized:>9.1f}x")
+
+    print()
+    print(f"{'file':<48}{'cold ms':>10}{'warm ms':>10}{'warm+3 cols ms':>16}")
+    for file in args.files:
+        cache_dir = tempfile.mkdtemp()
+        try:
+            def cold(f):
+                shutil.rmtree(cache_dir)
+                read_tecplot(f, cache=True, cache_dir=cache_dir)
+
+            def warm(f):
+                return read_tecplot(f, cache=True, cache_dir=cache_dir)
+
+            def warm_columns(f):
+                zone = warm(f)[0]
+                for name in zone.variables[:3]:
+                    zone[name].sum()
+
+            t_cold = timeit(cold, file, args.number)
+            t_warm = timeit(warm, file, args.number)
+            t_columns = timeit(warm_columns, file, args.number)
+        finally:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+        print(f"{os.path.basename(file)[-48:]:<48}{t_cold * 1e3:>10.2f}{t_warm * 1e3:>10.2f}{t_columns * 1e3:>16.2f}")
+
+
+if __name__ == '__main__':
+    main()
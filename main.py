@@ -1,33 +1,19 @@
-from xyplot import XyPlot
+from xyplot import XyPlot, Profiler
+from xyplot.io import read_tecplot
 import numpy as np
-import pandas as pd
-from scipy.interpolate import griddata
-
-
-def read_data(file):
-    with open(file, 'r') as f:
-        line_list = list(filter(lambda x: x[0] != '#', f.readlines()))
-    variables = line_list[1].strip().split("=")[1].replace('"', '').split(",")
-    data_list = []
-    for line in line_list[6:]:
-        try:
-            line_data = [float(i) for i in line.strip().split(" ") if i]
-        except:
-            continue
-        data_list.append(line_data)
-
-    return pd.DataFrame(columns=variables, data=data_list)
+from xyplot.Regrid import regrid
 
 
 file = r"P-L1-IMM-SWMF_20221018004619_0005M_SWMF.dat"
-df = read_data(file)
-# print(df.keys())
-x, y = df['X [R]'].values, df['Y [R]'].values
+zone = read_tecplot(file)[0]
+# print(zone.keys())
+x, y = zone['X [R]'], zone['Y [R]']
 xx = yy = np.linspace(-6.5, 6.5, 1000)
 X, Y = np.meshgrid(xx, yy)
-grid_data = griddata((x, y), df[df.keys()[7]].values, (X, Y), method="linear")  # 散点插值成网格数据
-U = griddata((x, y), df[df.keys()[8]].values, (X, Y), method="linear")  # 散点插值成网格数据
-V = griddata((x, y), df[df.keys()[9]].values, (X, Y), method="linear")  # 散点插值成网格数据
+# 散点插值成网格数据(共用同一组插值权重)
+grid_data, U, V = regrid((x, y), [zone[name] for name in zone.variables[7:10]], (X, Y))
+# 有序网格(ZONE I=78, J=49)可直接取出 (J, I) 曲线网格绘制填色图, 无需插值
+zone_x, zone_y, zone_data = zone.grid('X [R]', 'Y [R]', zone.variables[7])
 
 x = np.linspace(-np.pi, np.pi, 100)
 y = np.sin(x)
@@ -59,7 +45,7 @@ cfg = dict(
     # ),
     Branch=dict(
         contourf=dict(
-            init=dict(args=(X, Y, grid_data), levels=np.linspace(0, 30, 50), extend="both", cmap=dict(
+            init=dict(args=(zone_x, zone_y, zone_data), levels=np.linspace(0, 30, 50), extend="both", cmap=dict(
                               init=dict(
                                   name='chaos',
                                   colors=['black', 'purple', 'blue', 'cyan', 'green', 'yellow', 'orange', 'red'], N=100),
@@ -104,10 +90,10 @@ axes_dict = dict(
     # )
 )
 
-import time
-t = time.time()
-xy_plot = XyPlot(**axes_dict)
-print(time.time() - t)
+# 按配置路径统计绘图耗时
+with Profiler() as profiler:
+    xy_plot = XyPlot(**axes_dict)
+print(profiler.summary(limit=10))
 xy_plot.show()
 # axes_dict.pop('set_rc')
 # a = XyPlot(**axes_dict)
@@ -0,0 +1,10 @@
+import os
+import sys
+
+# 测试中只使用非交互式后端; 从仓库根目录以外运行 pytest 时也能导入 xyplot
+os.environ.setdefault('MPLBACKEND', 'Agg')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def pytest_configure(config):
+    config.addinivalue_line('markers', "slow: 耗时较长的测试(如长时间循环绘图), 使用 -m 'not slow' 跳过")
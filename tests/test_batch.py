@@ -0,0 +1,77 @@
+"""批量绘图: 当前进程中依次绘制与进程池并行绘制, 结果一致且按输入顺序返回"""
+import matplotlib
+import numpy as np
+import pytest
+
+from xyplot.batch import expand_files, output_path, render_batch
+from xyplot.Plan import Placeholder
+
+TEMPLATE = dict(axes=dict(Branch=dict(contourf=dict(
+    init=dict(args=(Placeholder('X'), Placeholder('Y'), Placeholder('V')), levels=np.linspace(0, 3, 7)),
+))))
+
+
+def config_for(file):
+    """可调用的模板: 根据输入文件返回绘图配置"""
+    value = float(open(file).read().split()[-1])
+    return dict(axes=dict(plot=dict(args=([0, 1], [0, value]))))
+
+
+@pytest.fixture
+def inputs(tmp_path):
+    files = []
+    for n in range(3):
+        path = tmp_path / f"zone_{n}.dat"
+        rows = ''.join(f"{x} {y} {x + y + n * 0.5}\n" for y in range(3) for x in range(4))
+        path.write_text(f'VARIABLES="X","Y","V"\nZONE I=4, J=3, F=POINT\n{rows}')
+        files.append(str(path))
+    return files
+
+
+@pytest.fixture
+def svg_backend():
+    # 批量绘图不应改变调用者的 matplotlib 后端
+    backend = matplotlib.get_backend()
+    matplotlib.use('svg', force=True)
+    yield
+    matplotlib.use(backend, force=True)
+
+
+def _render(inputs, tmp_path, name, **kwargs):
+    reports = []
+    out = render_batch(TEMPLATE, inputs, str(tmp_path / name / '{stem}.png'), report=reports.append, **kwargs)
+    return out, [open(path, 'rb').read() for path in out], reports
+
+
+def test_in_process(inputs, tmp_path, svg_backend):
+    out, images, reports = _render(inputs, tmp_path, 'serial', processes=1, save_kwargs=dict(dpi=40))
+    assert [path.rsplit('/', 1)[-1] for path in out] == ['zone_0.png', 'zone_1.png', 'zone_2.png']
+    assert all(image.startswith(b'\x89PNG') for image in images) and len(set(images)) == 3
+    assert reports[0].startswith('[1/3]') and len(reports) == 3
+    assert matplotlib.get_backend() == 'svg'
+
+
+def test_two_processes_match_in_process(inputs, tmp_path, svg_backend):
+    _, serial, _ = _render(inputs, tmp_path, 'serial', processes=1, save_kwargs=dict(dpi=40))
+    out, parallel, reports = _render(inputs, tmp_path, 'parallel', processes=2, max_in_flight=1,
+                                     save_kwargs=dict(dpi=40))
+    assert parallel == serial
+    assert [r.split(']')[0] for r in reports] == ['[1/3', '[2/3', '[3/3']
+    assert matplotlib.get_backend() == 'svg'
+
+
+def test_callable_template_and_render_cache(inputs, tmp_path):
+    cache = str(tmp_path / 'cache')
+    first = render_batch(config_for, inputs[:2], str(tmp_path / 'a') + '/', processes=1, report=None)
+    assert [p.rsplit('/', 1)[-1] for p in first] == ['zone_0.png', 'zone_1.png']
+    a = render_batch(TEMPLATE, inputs, str(tmp_path / 'b' / '{index}.png'), processes=1, report=None,
+                     render_cache=cache)
+    b = render_batch(TEMPLATE, inputs, str(tmp_path / 'c' / '{index}.png'), processes=1, report=None,
+                     render_cache=cache)
+    assert [open(p, 'rb').read() for p in a] == [open(p, 'rb').read() for p in b]
+
+
+def test_paths(tmp_path, inputs):
+    assert expand_files(str(tmp_path / 'zone_*.dat')) == inputs
+    assert output_path('{stem}-{index}.svg', '/data/run.dat', 4) == 'run-4.svg'
+    assert output_path(str(tmp_path) + '/', '/data/run.dat', 0) == str(tmp_path / 'run.png')
@@ -0,0 +1,59 @@
+"""全流程性能测试脚本: 生成的数据可读取、结果 JSON 的格式、两次结果的对比"""
+import importlib.util
+import json
+import os
+
+import pytest
+
+from xyplot.io import read_tecplot
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope='module')
+def bench():
+    spec = importlib.util.spec_from_file_location('bench_pipeline', os.path.join(ROOT, 'benchmarks',
+                                                                                 'bench_pipeline.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_synthetic_tecplot(bench, tmp_path):
+    file = tmp_path / 'zone.dat'
+    bench.write_tecplot(file, 20, 7)
+    (zone, ) = read_tecplot(file)
+    assert (zone.i, zone.j) == (20, 7) and len(zone.variables) == 8
+
+
+def test_cases(bench, tmp_path):
+    small = bench.cases('small', str(tmp_path))
+    assert small['tecplot.sample'] is not None
+    assert bench.cases('medium', str(tmp_path))['tecplot.sample'] is None
+    times = bench.measure(*small['director.overhead'], 2)
+    assert len(times) == 2 and all(t > 0 for t in times)
+
+
+def test_run_and_write_results(bench, tmp_path, capsys):
+    output = tmp_path / 'results.json'
+    assert bench.main(['-s', 'small', '-n', '1', '-k', 'director', '-o', str(output)]) == 0
+    suite = json.loads(output.read_text())
+    assert list(suite['results']) == ['director.overhead[small]']
+    result = suite['results']['director.overhead[small]']
+    assert result['number'] == 1 and result['min'] == result['median'] == result['mean'] > 0
+    assert {'commit', 'python', 'numpy', 'matplotlib', 'cpu_count'} <= set(suite['meta'])
+    assert 'director.overhead[small]' in capsys.readouterr().out
+
+
+def test_compare(bench, tmp_path, capsys):
+    def write(name, **medians):
+        results = {key: dict(min=v, median=v, mean=v, number=1) for key, v in medians.items()}
+        (tmp_path / name).write_text(json.dumps(dict(meta=dict(commit=name), results=results)))
+        return str(tmp_path / name)
+
+    base = write('base', a=1.0, b=1.0, c=1.0)
+    new = write('new', a=1.5, b=0.5, c=1.05, d=2.0)
+    assert bench.compare(base, new, threshold=1.1) == 1
+    out = capsys.readouterr().out
+    assert 'slower' in out and 'faster' in out and '\nd' not in out
+    assert bench.main(['--compare', base, new, '--threshold', '2']) == 0
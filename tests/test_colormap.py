@@ -0,0 +1,90 @@
+"""字典配置创建的颜色映射被缓存共享, 共享的颜色映射只读"""
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+from matplotlib.colors import LinearSegmentedColormap
+
+from xyplot.DrawContourf import ColorMapBuilder, SharedColormap, clear_colormap_cache
+from xyplot.xyplotBuilder import XyPlotDirector
+
+CMAP = dict(init=dict(name='chaos', colors=['#0000ff', '#ffffff', '#ff0000'], N=64))
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    clear_colormap_cache()
+    yield
+    clear_colormap_cache()
+
+
+def test_same_config_returns_shared_colormap():
+    first, second = ColorMapBuilder(CMAP)(), ColorMapBuilder(dict(CMAP))()
+    assert first is second
+    assert isinstance(first, SharedColormap)
+
+
+def test_shared_colormap_is_read_only():
+    cmap = ColorMapBuilder(CMAP)()
+    for method in ('set_bad', 'set_under', 'set_over'):
+        with pytest.raises(TypeError):
+            getattr(cmap, method)('k')
+    assert ColorMapBuilder(CMAP)()(-1.0) == cmap(0.0)
+
+
+def test_copies_are_mutable_and_independent():
+    cmap = ColorMapBuilder(CMAP)()
+    copied = cmap.copy()
+    assert type(copied) is LinearSegmentedColormap
+    copied.set_under('k')
+    extremes = cmap.with_extremes(over='g')
+    assert copied(-1.0) == (0.0, 0.0, 0.0, 1.0)
+    assert extremes(2.0) != cmap(2.0)
+    assert cmap(-1.0) == cmap(0.0)
+    assert type(pickle.loads(pickle.dumps(cmap))) is SharedColormap
+
+
+def test_options_do_not_modify_base_colormap():
+    base = ColorMapBuilder(CMAP)()
+    under = ColorMapBuilder(dict(CMAP, under='k'))()
+    assert under is not base
+    assert under(-1.0) == (0.0, 0.0, 0.0, 1.0)
+    assert base(-1.0) == base(0.0)
+
+
+def test_render_with_extend_uses_cached_colormap():
+    z = np.outer(np.linspace(-1, 1, 30), np.linspace(-1, 1, 30))
+    config = dict(axes=dict(Branch=dict(contourf=dict(
+        init=dict(args=(z, ), levels=np.linspace(-0.5, 0.5, 11), extend='both', cmap=dict(CMAP, over='g')),
+        cbar=dict(init=dict()),
+    ))))
+    for _ in range(2):
+        with XyPlotDirector(**config) as director:
+            director.to_bytes('png', dpi=30)
+
+
+def test_cached_colormap_is_a_copy(monkeypatch):
+    # 缓存的是只读副本, 不改变 matplotlib 创建的对象的类型
+    created = []
+    original = ColorMapBuilder.create_colormap
+
+    def create(**kwargs):
+        created.append(original(**kwargs))
+        return created[-1]
+
+    monkeypatch.setattr(ColorMapBuilder, 'create_colormap', staticmethod(create))
+    cmap = ColorMapBuilder(CMAP)()
+    assert type(created[0]) is LinearSegmentedColormap and cmap is not created[0]
+    assert cmap == created[0]
+    created[0].set_under('k')
+    assert cmap(-1.0) == cmap(0.0)
+
+
+def test_concurrent_lookups_share_one_colormap():
+    configs = [dict(init=dict(name=f"c{i % 4}", colors=['k', 'w'], N=8 + i % 4)) for i in range(256)]
+    with ThreadPoolExecutor(8) as pool:
+        cmaps = list(pool.map(lambda cfg: ColorMapBuilder(cfg)(), configs))
+    # 同一配置只缓存一个对象, 各线程得到同一颜色映射
+    assert len({id(c) for c in cmaps}) == 4
+    assert all(cmap is ColorMapBuilder(cfg)() for cfg, cmap in zip(configs, cmaps))
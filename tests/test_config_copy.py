@@ -0,0 +1,44 @@
+"""绘图配置按引用传递, 不再深拷贝"""
+import io
+import tracemalloc
+
+import numpy as np
+
+from xyplot.xyplotBuilder import XyPlotDirector
+
+BIG = np.zeros(4_000_000)   # 32 MB, 放在绘图对象的 gid 中, 绘制时不参与计算也不被拷贝
+
+
+def _config(n):
+    return dict(axes=dict(
+        plot=[dict(args=([0, 1], [0, 1]), gid=BIG) for _ in range(n)],
+        title=dict(args=('title', ), gid=BIG),
+    ))
+
+
+def _peak(config):
+    tracemalloc.start()
+    try:
+        with XyPlotDirector(**config) as director:
+            director.save(io.BytesIO(), format='png', dpi=30)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def test_peak_memory_does_not_scale_with_config_copies():
+    _peak(_config(1))   # 预热(字体缓存等)
+    single, many = _peak(_config(1)), _peak(_config(8))
+    # 配置中的数组不被拷贝: 峰值远小于数组本身, 且与数组被引用的次数无关
+    assert single < BIG.nbytes / 4
+    assert many < BIG.nbytes / 4
+    assert many - single < BIG.nbytes / 16
+
+
+def test_config_is_not_modified():
+    config = _config(2)
+    snapshot = repr(config)
+    with XyPlotDirector(**config):
+        pass
+    assert repr(config) == snapshot
+    assert config['axes']['plot'][0]['gid'] is BIG
@@ -0,0 +1,75 @@
+"""折线降采样: minmax/LTTB 保留首尾点与极值, 保留点数不超过设定值, LTTB 与逐桶计算一致"""
+import numpy as np
+import pytest
+
+from xyplot.Decimate import lttb_indices, minmax_indices
+from xyplot.xyplotBuilder import XyPlotDirector
+
+rng = np.random.default_rng(7)
+SIZE = 20000
+x = np.sort(rng.random(SIZE)) * 100
+y = np.cumsum(rng.standard_normal(SIZE))
+y[[123, 9000]] = (500.0, -500.0)     # 孤立的尖峰
+
+
+def _lttb_reference(x, y, n_out):
+    """逐桶计算的 LTTB"""
+    size = len(y)
+    edges = np.linspace(1, size - 1, n_out - 1).astype(np.int64)
+    keep = [0]
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        if i + 2 < n_out - 1:
+            cx, cy = x[hi:edges[i + 2]].mean(), y[hi:edges[i + 2]].mean()
+        else:
+            cx, cy = x[-1], y[-1]
+        a = keep[-1]
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        keep.append(lo + int(np.nanargmax(area)) if not np.all(np.isnan(area)) else lo)
+    return np.array(keep + [size - 1])
+
+
+@pytest.mark.parametrize('n', [10, 100, 1000])
+def test_minmax(n):
+    keep = minmax_indices(x, y, n)
+    assert keep[0] == 0 and keep[-1] == SIZE - 1
+    assert np.all(np.diff(keep) > 0) and keep.size <= 2 * n + 2
+    assert {123, 9000} <= set(keep.tolist())
+    # 每个桶的极值都被保留: 降采样后的包络与原始数据一致
+    assert y[keep].max() == y.max() and y[keep].min() == y.min()
+
+
+def test_minmax_keeps_gaps():
+    values = y.copy()
+    values[5000:5003] = np.nan
+    keep = minmax_indices(x, values, 100)
+    assert np.isnan(values[keep]).any()
+    assert minmax_indices(x[:50], y[:50], 100) is None
+
+
+@pytest.mark.parametrize('n_out', [3, 50, 777, 5000])
+def test_lttb(n_out):
+    keep = lttb_indices(x, y, n_out)
+    assert keep.size == n_out and keep[0] == 0 and keep[-1] == SIZE - 1
+    assert np.all(np.diff(keep) > 0)
+    np.testing.assert_array_equal(keep, _lttb_reference(x, y, n_out))
+    if n_out >= 50:
+        assert {123, 9000} <= set(keep.tolist())
+
+
+def test_lttb_with_nan():
+    values = y.copy()
+    values[rng.integers(0, SIZE, 500)] = np.nan
+    values[2000:2400] = np.nan      # 整个桶均为 NaN
+    np.testing.assert_array_equal(lttb_indices(x, values, 200), _lttb_reference(x, values, 200))
+    assert lttb_indices(x, y, SIZE) is None
+
+
+@pytest.mark.parametrize('method', ['minmax', 'lttb'])
+def test_plot(method):
+    config = dict(axes=dict(plot=dict(args=(x, y), decimate=dict(method=method, n=200))))
+    with XyPlotDirector(**config) as director:
+        (line, ) = director.figure.axes[0].lines
+        xd, yd = line.get_data()
+        assert len(xd) <= 402 and (xd[0], xd[-1]) == (x[0], x[-1])
+        assert yd.max() == 500.0 and yd.min() == -500.0
@@ -0,0 +1,60 @@
+"""画布不由 pyplot 管理, 关闭后即可被回收, 长时间循环绘图内存不增长"""
+import gc
+import io
+import os
+import weakref
+
+import numpy as np
+import pytest
+
+from xyplot.xyplotBuilder import XyPlotDirector
+
+X = np.linspace(0, 1, 2000)
+
+
+def _config(i):
+    z = np.sin(np.add.outer(X[::20], X[::20]) * (i % 7 + 1))
+    return dict(axes=dict(
+        plot=dict(args=(X, np.sin(X * i))),
+        Branch=dict(contourf=dict(init=dict(args=(z, ), levels=10), cbar=dict(init=dict()))),
+        title=f"frame {i}",
+    ))
+
+
+def _rss():
+    """当前进程的常驻内存(字节)"""
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+
+def test_figure_not_registered_with_pyplot():
+    import matplotlib.pyplot as plt
+    with XyPlotDirector(**_config(0)) as director:
+        director.save(io.BytesIO(), format='png', dpi=20)
+        assert plt.get_fignums() == []
+
+
+def test_closed_figure_is_collected():
+    director = XyPlotDirector(**_config(0))
+    director.save(io.BytesIO(), format='png', dpi=20)
+    ref = weakref.ref(director.figure)
+    director.close()
+    gc.collect()
+    assert ref() is None
+
+
+@pytest.mark.slow
+@pytest.mark.skipif(not os.path.exists('/proc/self/statm'), reason='需要 /proc 读取常驻内存')
+def test_soak_rss_stays_flat():
+    def render(n, start):
+        for i in range(start, start + n):
+            with XyPlotDirector(**_config(i)) as director:
+                director.save(io.BytesIO(), format='png', dpi=30)
+
+    render(30, 0)   # 预热: 字体缓存、色卡等一次性分配
+    gc.collect()
+    before = _rss()
+    render(200, 30)
+    gc.collect()
+    # 每次绘图约分配数 MB, 存在泄漏时 200 次绘图后常驻内存会明显增长
+    assert _rss() - before < 20 * 2 ** 20
@@ -0,0 +1,47 @@
+"""有序 tecplot zone 的曲线网格: grid 返回 (J, I) 视图, 可直接绘制 pcolormesh/contourf"""
+import numpy as np
+from matplotlib.collections import QuadMesh
+
+from xyplot.io import parse_tecplot
+from xyplot.xyplotBuilder import XyPlotDirector
+
+# 极坐标下的曲线网格: I 沿角度方向, J 沿半径方向
+I, J = 12, 5
+theta, radius = np.meshgrid(np.linspace(0, np.pi, I), np.linspace(1, 2, J))
+X, Y, V = radius * np.cos(theta), radius * np.sin(theta), radius + theta
+ROWS = "".join(f"{a:.17g} {b:.17g} {c:.17g}\n" for a, b, c in zip(X.ravel(), Y.ravel(), V.ravel()))
+RAW = f'VARIABLES="X","Y","V"\nZONE T="polar" I={I}, J={J}, F=POINT\n{ROWS}'.encode()
+
+
+def test_grid_views():
+    zone = parse_tecplot(RAW)[0]
+    x, y, v = zone.grid('X', 'Y', 'V')
+    assert zone.shape == (J, I) and x.shape == y.shape == v.shape == (J, I)
+    np.testing.assert_array_equal(x, X)
+    np.testing.assert_array_equal(v, V)
+    assert np.shares_memory(v, zone.data)
+    assert zone.grid('X').shape == (J, I)
+
+
+def test_pcolormesh_branch_on_curvilinear_grid():
+    x, y, v = parse_tecplot(RAW)[0].grid('X', 'Y', 'V')
+    config = dict(axes=dict(Branch=dict(pcolormesh=dict(init=dict(args=(x, y, v), shading='gouraud'),
+                                                        cbar=dict(init=dict())))))
+    figure = XyPlotDirector(**config).figure
+    axes = figure.axes[0]
+    (mesh, ) = [c for c in axes.collections if isinstance(c, QuadMesh)]
+    np.testing.assert_array_equal(mesh.get_array().reshape(J, I), V)
+    # 色卡子区域
+    assert len(figure.axes) == 2
+    # 数据范围为曲线网格覆盖的范围
+    xmin, xmax = axes.dataLim.intervalx
+    assert xmin <= -2 and xmax >= 2
+
+
+def test_contourf_branch_on_curvilinear_grid():
+    x, y, v = parse_tecplot(RAW)[0].grid('X', 'Y', 'V')
+    config = dict(axes=dict(Branch=dict(contourf=dict(init=dict(args=(x, y, v), levels=np.linspace(1, 5, 9))))))
+    axes = XyPlotDirector(**config).figure.axes[0]
+    cset = axes.get_children()[0]
+    np.testing.assert_array_equal(cset.levels, np.linspace(1, 5, 9))
+    assert axes.dataLim.intervaly[0] < 0.5 and axes.dataLim.intervaly[1] > 1.9
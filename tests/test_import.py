@@ -0,0 +1,38 @@
+"""import xyplot 不加载 matplotlib.pyplot/scipy 等重量级模块, 绘图对象在首次访问时才导入"""
+import os
+import subprocess
+import sys
+
+import pytest
+
+HEAVY = ('matplotlib.pyplot', 'scipy')
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _import(statement):
+    """在新的解释器中使用 -X importtime 执行导入语句, 返回 (已导入的模块列表, importtime 输出的模块列表)"""
+    code = f"{statement}\nimport sys\nprint('\\n'.join(sorted(sys.modules)))"
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], capture_output=True, text=True,
+                            check=True, cwd=ROOT)
+    timed = [line.rsplit('|', 1)[-1].strip() for line in result.stderr.splitlines() if line.startswith('import time:')]
+    return set(result.stdout.split()), timed
+
+
+@pytest.mark.parametrize('statement', ['import xyplot', 'import xyplot.io', 'import xyplot.batch'])
+def test_import_does_not_load_heavy_modules(statement):
+    modules, timed = _import(statement)
+    assert 'xyplot' in modules
+    for name in HEAVY:
+        assert name not in modules
+        assert name not in timed
+
+
+def test_import_xyplot_does_not_load_matplotlib():
+    modules, _ = _import('import xyplot')
+    assert not any(name == 'matplotlib' or name.startswith('matplotlib.') for name in modules)
+
+
+def test_lazy_attribute_loads_on_first_use():
+    modules, _ = _import('import xyplot\nxyplot.XyPlot')
+    assert 'xyplot.xyplotBuilder' in modules
+    assert 'matplotlib.pyplot' not in modules
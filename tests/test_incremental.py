@@ -0,0 +1,68 @@
+"""增量模式: 直接更新数据、重新绘制的对象保持绘制顺序, 结果与重新创建的画布一致"""
+import numpy as np
+import pytest
+from matplotlib.lines import Line2D
+from matplotlib.patches import FancyArrowPatch
+
+from xyplot.xyplotBuilder import XyPlotDirector, replace_artist
+
+x = np.linspace(-2, 2, 24)
+y = np.linspace(-1, 1, 16)
+X, Y = np.meshgrid(x, y)
+LEVELS = np.linspace(-2, 2, 9)
+
+
+def _config(z, u, v, line):
+    return dict(axes=dict(
+        Branch=dict(contourf=dict(init=dict(args=(X, Y, z), levels=LEVELS))),
+        streamplot=dict(args=(x, y, u, v), density=0.6, color='k'),
+        plot=dict(args=(x, line), color='r', lw=3),
+        xlim=dict(args=(-2, 2)), ylim=dict(args=(-1, 1)),
+    ))
+
+
+FIRST = _config(X * Y, -Y, X, np.sin(x))
+SECOND = _config(X - Y, Y, -X, np.cos(x))
+
+
+def test_update_matches_new_figure():
+    with XyPlotDirector(**SECOND) as director:
+        expected = director.to_rgba(dpi=60).copy()
+    with XyPlotDirector(incremental=True, **FIRST) as director:
+        line = director.figure.axes[0].lines[0]
+        director.update({
+            'axes[0].Branch.contourf.init': (X, Y, X - Y),
+            'axes[0].streamplot': (x, y, Y, -X),
+            'axes[0].plot': (x, np.cos(x)),
+        })
+        axes = director.figure.axes[0]
+        # 折线直接更新数据, contourf/streamplot 重新绘制
+        assert axes.lines[0] is line
+        np.testing.assert_array_equal(line.get_ydata(), np.cos(x))
+        np.testing.assert_array_equal(director.to_rgba(dpi=60), expected)
+
+
+def test_replaced_artists_keep_drawing_order():
+    with XyPlotDirector(incremental=True, **FIRST) as director:
+        axes = director.figure.axes[0]
+        before = [type(a) for a in axes.get_children()]
+        arrows = len(axes.patches)
+        director.update({'axes[0].streamplot': (x, y, Y, -X)})
+        director.update({'axes[0].Branch.contourf.init': (X, Y, X - Y)})
+        after = [type(a) for a in axes.get_children()]
+        assert after[0] is before[0] and after.index(Line2D) == before.index(Line2D)
+        # 旧的箭头全部移除
+        assert len(axes.patches) == sum(t is FancyArrowPatch for t in after) and len(axes.patches) <= arrows + 5
+        assert director.artists['axes[0].streamplot'][-1].lines in axes.collections
+
+
+def test_replace_artist_with_removed_artist():
+    with XyPlotDirector(incremental=True, **FIRST) as director:
+        axes = director.figure.axes[0]
+        old = axes.lines[0]
+        old.remove()
+        new = axes.plot(x, x)
+        replace_artist(old, new)
+        assert axes.lines[0] is new[0]
+        with pytest.raises(KeyError, match='No recorded artist'):
+            director.update({'axes[1].plot': (x, x)})
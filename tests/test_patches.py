@@ -0,0 +1,68 @@
+"""批量绘制几何图形: PatchCollection 与逐个添加的图形绘制结果一致"""
+import importlib.util
+import os
+
+import numpy as np
+import pytest
+from matplotlib.collections import PatchCollection
+
+from xyplot.xyplotBuilder import XyPlotDirector
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+rng = np.random.default_rng(3)
+N = 40
+XY = rng.uniform(1, 9, (N, 2))
+RADIUS = rng.uniform(0.1, 0.6, N)
+COLORS = rng.uniform(0, 1, (N, 3))
+LIMITS = dict(xlim=dict(args=(0, 10)), ylim=dict(args=(0, 10)))
+
+
+def _render(patches):
+    with XyPlotDirector(axes=dict(Branch=dict(patches=patches), **LIMITS)) as director:
+        axes = director.figure.axes[0]
+        return director.to_rgba(dpi=50).copy(), list(axes.patches), list(axes.collections)
+
+
+def test_collection_matches_per_patch():
+    circles = [dict(xy=tuple(p), radius=r, facecolor=c, edgecolor='k') for p, r, c in zip(XY, RADIUS, COLORS)]
+    expected, patches, _ = _render(dict(circle=circles))
+    assert len(patches) == N
+    collection = dict(kind='circle', xy=XY, radius=RADIUS, facecolors=COLORS, edgecolors='k')
+    arrays, patches, (collection, ) = _render(dict(collection=collection))
+    assert isinstance(collection, PatchCollection) and len(collection.get_paths()) == N and not patches
+    listed = [dict(xy=p, radius=r) for p, r in zip(XY, RADIUS)]
+    dicts, _, _ = _render(dict(collection=dict(kind='circle', patches=listed, facecolors=COLORS, edgecolors='k')))
+    np.testing.assert_array_equal(arrays, dicts)
+    # 单个图形与集合的抗锯齿边缘可能有细微差别
+    differ = np.any(np.abs(arrays.astype(int) - expected) > 8, axis=-1)
+    assert differ.mean() < 0.01
+
+
+@pytest.mark.parametrize('kind, geometry', [
+    ('ellipse', dict(width=0.5, height=0.2, angle=30)),
+    ('rectangle', dict(width=RADIUS, height=0.3)),
+    ('wedge', dict(r=0.5, theta1=0, theta2=RADIUS * 300)),
+])
+def test_broadcast_geometry(kind, geometry):
+    point = 'center' if kind == 'wedge' else 'xy'
+    _, _, (collection, ) = _render(dict(collection=dict(kind=kind, **{point: XY}, **geometry, array=RADIUS,
+                                                        cmap='viridis')))
+    assert len(collection.get_paths()) == N
+    np.testing.assert_array_equal(collection.get_array(), RADIUS)
+
+
+def test_errors():
+    with pytest.raises(KeyError, match='Optional kinds'):
+        _render(dict(collection=dict(kind='hexagon', xy=XY)))
+    with pytest.raises(KeyError, match="'xy' must be given"):
+        _render(dict(collection=dict(kind='circle', radius=RADIUS)))
+
+
+def test_benchmark_runs(capsys):
+    spec = importlib.util.spec_from_file_location('bench_patches', os.path.join(ROOT, 'benchmarks',
+                                                                                'bench_patches.py'))
+    bench = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(bench)
+    bench.main(['-n', '20'])
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == 3 and lines[2].startswith('PatchCollection')
@@ -0,0 +1,51 @@
+"""渲染计划: 编译一次、多次执行, 结果与直接绘制一致, 配置检查在编译时进行"""
+import matplotlib as mpl
+import numpy as np
+import pytest
+
+from xyplot import Placeholder
+from xyplot.xyplotBuilder import XyPlotDirector
+
+x = np.linspace(0, 2 * np.pi, 50)
+X, Y = np.meshgrid(x, x[:30])
+
+
+def _config(line, field):
+    panel = dict(plot=dict(args=(x, line), color='r'), title='line', xlim=dict(args=(0, 6)))
+    branch = dict(Branch=dict(contourf=dict(init=dict(args=(X, Y, field), levels=np.linspace(-1, 1, 9)),
+                                            cbar=dict(init=dict()))))
+    return dict(set_rc={'lines.linewidth': 3}, axes=dict(init=(121, 122), axes=(panel, branch)))
+
+
+def _pixels(figure):
+    figure.canvas.draw()
+    return np.asarray(figure.canvas.buffer_rgba()).copy()
+
+
+def test_plan_matches_direct_render():
+    plan = XyPlotDirector.compile(_config(Placeholder('line'), Placeholder('field')))
+    assert plan.placeholders == {'line', 'field'} and len(plan) > 0
+    for k in (1, 2):
+        line, field = np.sin(k * x), np.sin(k * X) * np.cos(Y)
+        expected = _pixels(XyPlotDirector(**_config(line, field)).figure)
+        np.testing.assert_array_equal(_pixels(plan(line=line, field=field).figure), expected)
+
+
+def test_rc_restored_after_execution():
+    plan = XyPlotDirector.compile(_config(Placeholder('line'), np.cos(X)))
+    before = mpl.rcParams['lines.linewidth']
+    figure = plan.execute(line=np.sin(x))
+    assert figure.axes[0].lines[0].get_linewidth() == 3
+    assert mpl.rcParams['lines.linewidth'] == before
+
+
+def test_errors():
+    plan = XyPlotDirector.compile(axes=dict(plot=dict(args=(Placeholder('x'), Placeholder('y')))))
+    with pytest.raises(KeyError, match='Missing data'):
+        plan(x=x)
+    # 配置键在编译时检查
+    with pytest.raises(AssertionError, match='No corresponding executable object'):
+        XyPlotDirector.compile(axes=dict(plott=dict(args=(x, ))))
+    with pytest.raises(TypeError, match='Figure is not created'):
+        XyPlotDirector.compile(set_rc={'lines.linewidth': 3})
+    assert 'plot' in repr(plan)
@@ -0,0 +1,70 @@
+"""多子区域 contourf 的等值线几何预先计算: 结果与 axes.contourf 逐像素一致, 不适用的配置回退到 axes.contourf"""
+from contextlib import nullcontext
+
+import numpy as np
+import pytest
+from matplotlib.contour import QuadContourSet
+
+import xyplot.DrawContourf as DrawContourf
+from xyplot.xyplotBuilder import XyPlotDirector
+
+x = np.linspace(-3, 3, 120)
+y = np.linspace(-2, 2, 90)
+X, Y = np.meshgrid(x, y)
+Z1 = np.sin(X) * np.cos(Y) * 2     # 部分区域超出分级范围, 不填充
+Z2 = np.exp(-(X ** 2 + Y ** 2))
+Z2[:5] = np.nan
+LEVELS = np.linspace(-1, 1, 11)
+
+
+def _panel(args, **kwargs):
+    return dict(Branch=dict(contourf=dict(init=dict(args=args, levels=LEVELS, **kwargs), cbar=dict(init=dict()))))
+
+
+def _config(*panels):
+    return dict(axes=dict(init=[dict(args=(1, len(panels), i + 1)) for i in range(len(panels))], axes=list(panels)))
+
+
+CONFIGS = dict(
+    grid=_config(_panel((X, Y, Z1)), _panel((x, y, Z2))),
+    z_only=_config(_panel((Z1, ), alpha=0.7), _panel((Z2, ))),
+    minimum_on_level=_config(_panel((X, Y, np.clip(Z1, -1, 1))), _panel((X, Y, np.clip(Z1, -1, 1)))),
+    extend=_config(_panel((X, Y, Z1), extend='both'), _panel((X, Y, Z2), extend='max')),
+)
+
+
+@pytest.fixture(autouse=True)
+def _workers(monkeypatch):
+    # 单核环境下也进行预先计算
+    monkeypatch.setattr(DrawContourf, 'CONTOUR_WORKERS', 2)
+
+
+def _render(config):
+    with XyPlotDirector(**config) as director:
+        return director.to_rgba(dpi=60), [type(c) for ax in director.figure.axes for c in ax.collections]
+
+
+@pytest.mark.parametrize('name', CONFIGS)
+def test_pixels_match_contourf(name, monkeypatch):
+    precomputed, types = _render(CONFIGS[name])
+    monkeypatch.setattr(DrawContourf, 'precompute_contours', lambda cfg_lst: nullcontext())
+    plain, _ = _render(CONFIGS[name])
+    np.testing.assert_array_equal(precomputed, plain)
+    # extend 不为 'neither' 时不预先计算
+    assert (QuadContourSet in types) == (name == 'extend')
+
+
+def test_entries_matched_by_identity_and_released():
+    config = CONFIGS['grid']
+    inits = [panel['Branch']['contourf']['init'] for panel in config['axes']['axes']]
+    with DrawContourf.precompute_contours(config['axes']['axes']):
+        assert [DrawContourf._find_precomputed(init).init for init in inits] == inits
+        assert DrawContourf._find_precomputed(dict(inits[0])) is None
+    assert DrawContourf._PRECOMPUTED.entries == []
+
+
+def test_update_with_new_data_recomputes():
+    with XyPlotDirector(incremental=True, **CONFIGS['grid']) as director:
+        director.update({'axes[0].Branch.contourf.init': (X, Y, -Z1)})
+        cset = director.artists['axes[0].Branch.contourf.init'][3]
+        assert isinstance(cset, QuadContourSet)
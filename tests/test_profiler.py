@@ -0,0 +1,96 @@
+"""按配置路径统计耗时: 总耗时/自身耗时按嵌套层次归属, 未启用时不维护配置路径"""
+import json
+import time
+
+import numpy as np
+import pytest
+
+from xyplot import Placeholder, Profiler
+from xyplot.utils import call_path, _NULL_SCOPE
+from xyplot.xyplotBuilder import XyPlotDirector
+
+X = np.linspace(0, 1, 100)
+CONFIG = dict(axes=dict(plot=dict(args=(X, X ** 2)), title='profile', xlabel='x'))
+
+
+def test_nested_time_is_attributed_to_each_level():
+    with Profiler() as profiler:
+        with call_path('outer'):
+            time.sleep(0.03)
+            with call_path(0):
+                time.sleep(0.06)
+            with call_path(1):
+                time.sleep(0.01)
+    calls, total, self_time, _ = profiler.stats['outer']
+    first, second = profiler.stats['outer[0]'][1], profiler.stats['outer[1]'][1]
+    assert calls == 1
+    # sleep 只保证不少于指定时长, 只比较下限与各层之间的关系
+    assert self_time >= 0.03 and first >= 0.06 and second >= 0.01
+    assert total - self_time == pytest.approx(first + second, rel=1e-6)
+    assert total > first + second > first
+
+
+def test_render_paths_and_summary():
+    with Profiler() as profiler:
+        with XyPlotDirector(**CONFIG) as director:
+            director.to_bytes('png', dpi=30)
+    assert {'axes', 'axes.init', 'axes[0].plot', 'axes[0].title', 'axes[0].xlabel'} <= set(profiler.stats)
+    assert any(path.startswith('savefig') for path in profiler.stats)
+    for calls, total, self_time, _ in profiler.stats.values():
+        assert calls >= 1 and total >= self_time >= 0
+    lines = profiler.summary(sort='self', limit=3).splitlines()
+    assert lines[0].split() == ['path', 'calls', 'total', 'ms', 'self', 'ms']
+    assert len(lines) == 4
+    with pytest.raises(ValueError):
+        profiler.summary(sort='name')
+
+
+def test_render_plan_steps_are_profiled():
+    plan = XyPlotDirector.compile(axes=dict(plot=dict(args=(Placeholder('x'), Placeholder('y')))))
+    with Profiler() as profiler:
+        plan(x=X, y=X).close()
+    assert profiler.stats
+    assert sum(stat[0] for stat in profiler.stats.values()) >= len(plan.steps)
+
+
+def test_memory_peak():
+    with Profiler(memory=True) as profiler:
+        with call_path('outer'):
+            kept = np.ones(2 ** 18)
+            with call_path('temporary'):
+                # 分配后立即释放, 执行前后的差值接近 0, 峰值仍为数组大小
+                np.ones(2 ** 20).sum()
+            with call_path('small'):
+                pass
+    del kept
+    outer, temporary, small = (profiler.stats[path][3] for path in ('outer', 'outer.temporary', 'outer.small'))
+    assert temporary >= 8 * 2 ** 20
+    assert outer >= 2 * 2 ** 20 + temporary
+    assert small < 2 ** 18
+    assert 'peak KB' in profiler.summary(sort='memory')
+
+
+def test_memory_peak_is_max_over_calls():
+    with Profiler(memory=True) as profiler:
+        for n in (2 ** 20, 2 ** 10):
+            with call_path('alloc'):
+                np.ones(n).sum()
+    assert 8 * 2 ** 20 <= profiler.stats['alloc'][3] < 9 * 2 ** 20
+
+
+def test_chrome_trace(tmp_path):
+    with Profiler() as profiler:
+        XyPlotDirector(**CONFIG).close()
+    file = tmp_path / 'trace.json'
+    profiler.to_chrome_trace(file)
+    events = json.loads(file.read_text(encoding='utf-8'))['traceEvents']
+    assert len(events) == len(profiler.events)
+    assert all(e['ph'] == 'X' and e['dur'] >= 0 for e in events)
+    assert {e['name'] for e in events} == set(profiler.stats)
+
+
+def test_no_path_tracking_without_profiler():
+    assert call_path('axes') is _NULL_SCOPE
+    with Profiler():
+        assert call_path('axes') is not _NULL_SCOPE
+    assert call_path('axes') is _NULL_SCOPE
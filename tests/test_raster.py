@@ -0,0 +1,72 @@
+"""contourf 栅格模式: 填充/留空的区域与 axes.contourf 一致"""
+import numpy as np
+import pytest
+from matplotlib.image import AxesImage
+
+from xyplot.xyplotBuilder import XyPlotDirector
+
+x = np.linspace(0, 8, 41)
+y = np.linspace(0, 6, 31)
+X, Y = np.meshgrid(x, y)
+Z = np.sin(X) * np.cos(Y) * 0.9
+Z[5:12, 5:12] = -2     # 低于最低分级
+Z[18:26, 25:35] = 2     # 高于最高分级
+Z[20:28, 5:12] = np.nan
+LEVELS = np.linspace(-1, 1, 9)
+
+
+def _render(mode, **init):
+    """绘制并返回各网格点处是否被填充(渲染结果的不透明度)与绘制的对象"""
+    config = dict(axes=dict(Branch=dict(contourf=dict(init=dict(args=(X, Y, Z), **init), mode=mode))))
+    with XyPlotDirector(**config) as director:
+        axes = director.figure.axes[0]
+        artist = axes.get_children()[0]
+        director.figure.patch.set_alpha(0)
+        axes.patch.set_alpha(0)
+        axes.set_axis_off()
+        rgba = director.to_rgba(dpi=100)
+        px, py = axes.transData.transform(np.column_stack((X.ravel(), Y.ravel()))).T
+        rows = rgba.shape[0] - 1 - np.floor(py).astype(int)
+        filled = rgba[rows, np.floor(px).astype(int), 3] > 0
+        return filled.reshape(Z.shape), artist
+
+
+def _interior():
+    """与周围 8 个网格点属于同一类(有效/低于/高于/无效)的内部网格点, 排除位于多边形边界上的点"""
+    category = np.select([np.isnan(Z), Z < LEVELS[0], Z > LEVELS[-1]], [0, 1, 2], 3)
+    same = np.zeros(Z.shape, dtype=bool)
+    same[1:-1, 1:-1] = True
+    padded = np.pad(category, 1, mode='edge')
+    for dy in (0, 1, 2):
+        for dx in (0, 1, 2):
+            same &= padded[dy:dy + Z.shape[0], dx:dx + Z.shape[1]] == category
+    return same
+
+
+@pytest.mark.parametrize('extend', ['neither', 'min', 'max', 'both'])
+def test_filled_region_matches_contourf(extend):
+    raster_filled, image = _render('raster', levels=LEVELS, extend=extend)
+    filled, _ = _render('vector', levels=LEVELS, extend=extend)
+    assert isinstance(image, AxesImage)
+    interior = _interior()
+    np.testing.assert_array_equal(raster_filled[interior], filled[interior])
+    # 超出分级范围的一侧只在 extend 包括该侧时填充
+    assert raster_filled[8, 8] == (extend in ('min', 'both'))
+    assert raster_filled[22, 30] == (extend in ('max', 'both'))
+    assert not raster_filled[24, 8]
+
+
+@pytest.mark.parametrize('levels', [None, 5])
+@pytest.mark.parametrize('extend', ['neither', 'both'])
+def test_auto_levels_match_contourf(levels, extend):
+    _, image = _render('raster', levels=levels, extend=extend)
+    _, cset = _render('vector', levels=levels, extend=extend)
+    np.testing.assert_array_equal(image.norm.boundaries, cset.levels)
+
+
+def test_all_nan():
+    config = dict(axes=dict(Branch=dict(contourf=dict(init=dict(args=(np.full((4, 5), np.nan), )), mode='raster'))))
+    with XyPlotDirector(**config) as director:
+        (image, ) = director.figure.axes[0].images
+        assert np.ma.getmaskarray(image.get_array()).all()
+        director.to_rgba()
@@ -0,0 +1,62 @@
+"""按点数栅格化: 流线的大量箭头(patches)与密集数据以图像形式嵌入 PDF/SVG"""
+import re
+
+import numpy as np
+import pytest
+
+from matplotlib.patches import Circle
+
+from xyplot.Rasterize import PatchLayer, rasterize_above
+from xyplot.xyplotBuilder import XyPlotDirector
+
+x = np.linspace(-3, 3, 60)
+y = np.linspace(-2, 2, 40)
+X, Y = np.meshgrid(x, y)
+U, V = -Y, X
+
+
+def _config(threshold=None):
+    axes = dict(streamplot=dict(args=(x, y, U, V), density=2), plot=dict(args=(x, np.sin(x))))
+    if threshold is not None:
+        axes['rasterize_above'] = threshold
+    return dict(axes=axes)
+
+
+def _images(data, format):
+    """矢量文件中嵌入的图像个数"""
+    if format == 'svg':
+        return data.count(b'<image')
+    return len(re.findall(rb'/Subtype\s*/Image', data))
+
+
+@pytest.mark.parametrize('format', ['svg', 'pdf'])
+def test_streamplot_arrows_embedded_as_image(format):
+    with XyPlotDirector(**_config()) as director:
+        vector = director.to_bytes(format)
+    with XyPlotDirector(**_config(threshold=200)) as director:
+        axes = director.figure.axes[0]
+        # 箭头(FancyArrowPatch)本身不支持栅格化, 合并为一个栅格化图层
+        assert not axes.patches
+        (layer, ) = [a for a in axes.artists if isinstance(a, PatchLayer)]
+        assert layer.get_rasterized() and len(layer.patches) > 20
+        assert all(c.get_rasterized() for c in axes.collections)
+        # 点数较少的折线保持矢量
+        assert not any(line.get_rasterized() for line in axes.lines)
+        raster = director.to_bytes(format)
+    assert _images(vector, format) == 0
+    assert _images(raster, format) >= 1
+    if format == 'svg':
+        # 流线与箭头不再逐个写为矢量路径
+        assert raster.count(b'<path') < vector.count(b'<path') // 10
+
+
+def test_images_and_patches():
+    data = np.arange(400.0).reshape(20, 20)
+    with XyPlotDirector(axes=dict(plot=dict(args=([0, 19], [0, 19])))) as director:
+        axes = director.figure.axes[0]
+        axes.imshow(data)
+        circle = axes.add_patch(Circle((5, 5), 2))
+        assert rasterize_above(axes, 1000) == []
+        assert rasterize_above(axes, 100) == [axes.images[0]]  # 图像 400 个像素, 折线 2 个点
+        # 支持栅格化的图形直接设置, 仍保留在子区域中
+        assert rasterize_above(axes, 5) == [circle] and circle.get_rasterized() and axes.patches[0] is circle
@@ -0,0 +1,45 @@
+"""set_rc 临时修改 rcParams: 只修改并恢复配置中的键, 校验结果缓存但不共享可变的值"""
+import matplotlib as mpl
+import pytest
+
+from xyplot.xyplotBuilder import SetTempRc, XyPlotDirector, validate_rc
+
+THEME = {'lines.linewidth': 3, 'lines.dashed_pattern': [4, 2], 'axes.grid': True}
+
+
+def test_values_are_validated_and_restored():
+    before = {k: mpl.rcParams[k] for k in THEME}
+    with SetTempRc(**THEME):
+        assert mpl.rcParams['lines.linewidth'] == 3.0
+        assert mpl.rcParams['lines.dashed_pattern'] == [4.0, 2.0]
+        assert mpl.rcParams['axes.grid'] is True
+    assert {k: mpl.rcParams[k] for k in THEME} == before
+
+
+def test_invalid_value_raises():
+    with pytest.raises(ValueError):
+        SetTempRc(**{'lines.linewidth': 'wide'})
+
+
+def test_restored_after_render_error():
+    before = mpl.rcParams['lines.linewidth']
+    with pytest.raises(Exception):
+        XyPlotDirector(set_rc=THEME, axes=dict(plot=dict(args=([0, 1], ), no_such_property=1)))
+    assert mpl.rcParams['lines.linewidth'] == before
+
+
+def test_cached_values_are_not_shared():
+    first = validate_rc(THEME)
+    first['lines.dashed_pattern'].append(99.0)
+    assert validate_rc(THEME)['lines.dashed_pattern'] == [4.0, 2.0]
+    with SetTempRc(**THEME):
+        mpl.rcParams['lines.dashed_pattern'].append(99.0)
+    with SetTempRc(**THEME):
+        assert mpl.rcParams['lines.dashed_pattern'] == [4.0, 2.0]
+
+
+def test_backend_is_restored_exactly():
+    raw = mpl.rcParams._get('backend')
+    with SetTempRc(backend='agg'):
+        assert mpl.rcParams._get('backend') == 'agg'
+    assert mpl.rcParams._get('backend') is raw or mpl.rcParams._get('backend') == raw
@@ -0,0 +1,60 @@
+"""散点插值目标网格只覆盖子区域的显示范围, 网格点数与显示像素数一致"""
+import numpy as np
+import pytest
+
+from xyplot.Regrid import regrid, target_grid
+from xyplot.utils import CallRecorder
+from xyplot.xyplotBuilder import XyPlotDirector, new_figure
+
+RNG = np.random.default_rng(0)
+PX, PY = RNG.uniform(-10, 10, (2, 4000))
+VALUES = np.sin(PX) * np.cos(PY)
+
+
+def _regrid_result(**axes_cfg):
+    config = dict(
+        set_fig=dict(width=4, height=3, dpi=50),
+        axes=dict(Branch=dict(contourf=dict(init=dict(levels=10), regrid=dict(points=(PX, PY), values=VALUES))),
+                  **axes_cfg),
+    )
+    with CallRecorder() as recorder:
+        XyPlotDirector(**config).close()
+    return next(ret for path, (_, _, _, ret) in recorder.records.items() if path.endswith('contourf.regrid'))
+
+
+def test_grid_covers_configured_limits():
+    X, Y, Z = _regrid_result(xlim=dict(args=(-2, 2)), ylim=dict(args=(-1, 3)))
+    assert (X.min(), X.max()) == (-2, 2)
+    assert (Y.min(), Y.max()) == (-1, 3)
+    assert np.isfinite(Z).all()
+
+
+def test_grid_covers_data_without_limits():
+    X, Y, _ = _regrid_result()
+    assert X.min() == pytest.approx(PX.min()) and X.max() == pytest.approx(PX.max())
+    assert Y.min() == pytest.approx(PY.min()) and Y.max() == pytest.approx(PY.max())
+
+
+def test_limits_are_kept_after_drawing():
+    contourf = dict(init=dict(levels=10), regrid=dict(points=(PX, PY), values=VALUES))
+    with XyPlotDirector(axes=dict(Branch=dict(contourf=contourf),
+                                  xlim=dict(args=(-2, 2)), ylim=dict(args=(3, -1)))) as director:
+        axes = director.figure.axes[0]
+        assert axes.get_xlim() == (-2, 2)
+        assert axes.get_ylim() == (3, -1)
+
+
+def test_grid_shape_follows_visible_pixels():
+    figure = new_figure(figsize=(4, 3), dpi=50)
+    axes = figure.add_axes((0, 0, 1, 1))
+    axes.set_xlim(-5, 5)
+    X, Y = target_grid(axes, (0, 10, -10, 10))
+    # 数据范围与显示范围的交集 x∈[0, 5] 占宽度的一半
+    assert (X.min(), X.max()) == (0, 5)
+    assert X.shape == (150, 100)
+
+
+def test_regrid_matches_linear_interpolation():
+    from scipy.interpolate import griddata
+    xi = np.meshgrid(np.linspace(-5, 5, 20), np.linspace(-5, 5, 20))
+    np.testing.assert_allclose(regrid((PX, PY), VALUES, xi), griddata((PX, PY), VALUES, tuple(xi)), atol=1e-12)
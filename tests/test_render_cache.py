@@ -0,0 +1,85 @@
+"""按内容寻址的绘图结果缓存: 命中/未命中、源代码版本、写入失败与共享目录的大小上限"""
+import os
+
+import numpy as np
+import pytest
+
+import xyplot.RenderCache as RenderCache_module
+from xyplot.RenderCache import RenderCache, fingerprint
+
+CONFIG = dict(axes=dict(plot=dict(args=(np.arange(5.0), np.arange(5.0) ** 2))))
+
+
+def test_hit_and_miss(tmp_path):
+    cache = RenderCache(tmp_path)
+    first = cache.render(CONFIG, dpi=50)
+    assert first.startswith(b'\x89PNG')
+    assert cache.render(CONFIG, dpi=50) == first
+    assert cache.render(CONFIG, dpi=60) != first
+    assert (cache.stats['hits'], cache.stats['misses']) == (1, 2)
+    # 数组内容变化时不命中
+    changed = dict(axes=dict(plot=dict(args=(np.arange(5.0), np.arange(5.0) ** 3))))
+    assert fingerprint(changed, dpi=50) != fingerprint(CONFIG, dpi=50)
+    assert cache.info()['entries'] == 2
+
+
+def test_key_depends_on_source(monkeypatch):
+    key = fingerprint(CONFIG)
+    monkeypatch.setattr(RenderCache_module, 'source_hash', lambda: 'changed')
+    assert fingerprint(CONFIG) != key
+
+
+def test_uncacheable_config(tmp_path):
+    cache = RenderCache(tmp_path)
+    config = dict(axes=dict(plot=dict(args=([0, 1], ), gid=object())))
+    assert cache.render(config).startswith(b'\x89PNG')
+    assert cache.stats['uncacheable'] == 1 and not os.listdir(tmp_path)
+
+
+def test_write_error_returns_render(tmp_path):
+    blocker = tmp_path / 'cache'
+    blocker.write_bytes(b'')     # 缓存目录位置是一个文件, 无法创建子目录
+    cache = RenderCache(blocker)
+    assert cache.render(CONFIG).startswith(b'\x89PNG')
+    assert cache.stats['write_errors'] == 1
+    assert cache.put('0' * 32, b'data') is False
+
+
+def _put(cache, key, size, mtime):
+    assert cache.put(key, bytes(size))
+    os.utime(cache.path(key), (mtime, mtime))
+
+
+def test_lru_eviction(tmp_path):
+    cache = RenderCache(tmp_path, max_bytes=250)
+    keys = [f"{i:032x}" for i in range(3)]
+    for i, key in enumerate(keys[:2]):
+        _put(cache, key, 100, 1000 + i)
+    # 读取后最近使用时间更新, 淘汰最久未使用的结果
+    assert cache.get(keys[0]) == bytes(100)
+    _put(cache, keys[2], 100, 2000)
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) is not None and cache.get(keys[2]) is not None
+    assert cache.stats['evictions'] == 1
+    assert cache.info()['bytes'] <= 250
+
+
+def test_limit_applies_to_shared_directory(tmp_path):
+    # 两个进程(实例)共享同一目录, 各自的索引只包含部分结果
+    a, b = RenderCache(tmp_path, max_bytes=300), RenderCache(tmp_path, max_bytes=300)
+    a.info(), b.info()
+    for i in range(3):
+        _put(a, f"a{i:031x}", 100, 1000 + i)
+        _put(b, f"b{i:031x}", 100, 1010 + i)
+    sizes = [os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(tmp_path) for name in names]
+    assert sum(sizes) <= 300
+    assert b.get(f"b{2:031x}") is not None
+
+
+@pytest.mark.parametrize('config', [CONFIG, dict(axes=dict(plot=dict(args=([0, 1], [1, 0]))))])
+def test_save(tmp_path, config):
+    cache = RenderCache(tmp_path / 'cache')
+    out = tmp_path / 'out.svg'
+    assert cache.save(config, str(out)) is False
+    assert cache.save(config, str(out)) is True
+    assert out.read_bytes().lstrip().startswith(b'<?xml')
@@ -0,0 +1,47 @@
+"""save_all 只布局一次保存多个文件, 结果与分别调用 save 逐像素一致"""
+import matplotlib.image as mpimg
+import numpy as np
+import pytest
+
+from xyplot.xyplotBuilder import XyPlotDirector
+
+CONFIG = dict(
+    set_fig=dict(dpi=100, title='Overview'),
+    axes=dict(
+        init=(121, 122),
+        axes=(
+            dict(plot=dict(args=([0, 1, 2], [3, 1, 2])), title='left', xlabel='time [s]', ylabel='value'),
+            dict(scatter=dict(args=([0, 1, 2], [1, 2, 0])), title='right', xlabel='x', ylabel='y'),
+        ),
+    ),
+)
+
+
+def director(engine):
+    xyplt = XyPlotDirector(**CONFIG)
+    xyplt.figure.set_layout_engine(engine)
+    return xyplt
+
+
+@pytest.mark.parametrize('engine', ['constrained', 'tight', None])
+@pytest.mark.parametrize('dpi', [60, 100, 173])
+@pytest.mark.parametrize('bbox_inches', [None, 'tight'])
+def test_pixels_equal_save(tmp_path, engine, dpi, bbox_inches):
+    with director(engine) as xyplt:
+        (file, ) = xyplt.save_all([tmp_path / 'all.png'], dpi=dpi, bbox_inches=bbox_inches)
+    with director(engine) as xyplt:
+        xyplt.save(tmp_path / 'one.png', dpi=dpi, bbox_inches=bbox_inches)
+    expected = mpimg.imread(tmp_path / 'one.png')
+    np.testing.assert_array_equal(mpimg.imread(file), expected)
+
+
+def test_single_path(tmp_path):
+    with director('constrained') as xyplt:
+        assert xyplt.save_all(str(tmp_path / 'a.png')) == [str(tmp_path / 'a.png')]
+        assert xyplt.save_all(tmp_path / 'b.svg') == [tmp_path / 'b.svg']
+        base = tmp_path / 'c'
+        assert xyplt.save_all(base, formats=('png', 'pdf')) == [f"{base}.png", f"{base}.pdf"]
+        # 保存后恢复画布原有的布局引擎与分辨率
+        assert xyplt.figure.get_layout_engine().__class__.__name__ == 'ConstrainedLayoutEngine'
+        assert xyplt.figure.dpi == 100
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['a.png', 'b.svg', 'c.pdf', 'c.png']
@@ -0,0 +1,188 @@
+import http.client
+import json
+import os
+import socket
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from xyplot.serve import (RenderError, RenderServer, RenderTimeout, ServerBusy, WorkerPool, confine_refs,
+                          resolve_refs)
+
+PNG = b'\x89PNG'
+CONFIG = dict(axes=dict(plot=dict(args=([0, 1], [0, 1]))))
+TECPLOT = b'TITLE="t"\nVARIABLES="X","Y"\nZONE T="z" I=2, J=2, F=POINT\n0 0\n1 0\n0 1\n1 1\n'
+
+
+class SlowArray:
+    """在工作进程中转换为数组时等待指定时间, 用于模拟耗时的绘图"""
+    def __init__(self, seconds):
+        self.seconds = seconds
+
+    def __array__(self, dtype=None, copy=None):
+        time.sleep(self.seconds)
+        return np.array([0.0, 1.0], dtype=dtype)
+
+
+def slow_config(seconds):
+    return dict(axes=dict(plot=dict(args=(SlowArray(seconds), [0, 1]))))
+
+
+def wait_for(predicate, timeout=60):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.05)
+
+
+@pytest.fixture
+def data_root(tmp_path):
+    root = tmp_path / 'data'
+    root.mkdir()
+    np.save(root / 'z.npy', np.arange(4.0))
+    (root / 'grid.dat').write_bytes(TECPLOT)
+    (tmp_path / 'secret.npy').write_bytes(b'')
+    return root
+
+
+def test_confine_refs_inside_root(data_root):
+    config = dict(a=[dict(b={'$npy': 'z.npy'})], c={'$tecplot': str(data_root / 'grid.dat'), 'var': 'X'})
+    confined = confine_refs(config, str(data_root))
+    assert confined['a'][0]['b']['$npy'] == os.path.realpath(data_root / 'z.npy')
+    assert confined['c'] == {'$tecplot': os.path.realpath(data_root / 'grid.dat'), 'var': 'X'}
+    # 原配置不被修改
+    assert config['a'][0]['b']['$npy'] == 'z.npy'
+
+
+@pytest.mark.parametrize('file', ['../secret.npy', '/etc/passwd', 'sub/../../secret.npy', 'link.npy'])
+def test_confine_refs_rejects_outside_root(data_root, file):
+    os.symlink(data_root.parent / 'secret.npy', data_root / 'link.npy')
+    with pytest.raises(ValueError, match='outside the data root'):
+        confine_refs({'$npy': file}, str(data_root))
+    with pytest.raises(ValueError, match='outside the data root'):
+        resolve_refs({'$npy': file}, data_root=str(data_root))
+
+
+def test_file_refs_disabled_without_root(data_root):
+    with pytest.raises(ValueError, match='--data-root'):
+        confine_refs(dict(x={'$npy': str(data_root / 'z.npy')}), None)
+    with pytest.raises(ValueError, match='--data-root'):
+        resolve_refs(dict(x={'$tecplot': str(data_root / 'grid.dat'), 'var': 'X'}))
+    # 不含文件引用的配置不受影响
+    assert confine_refs(CONFIG, None) == CONFIG
+
+
+def test_tecplot_cache_written_only_when_enabled(data_root):
+    ref = {'$tecplot': 'grid.dat', 'var': 'X', 'grid': False}
+    np.testing.assert_array_equal(resolve_refs(ref, data_root=str(data_root)), [0, 1, 0, 1])
+    assert sorted(os.listdir(data_root)) == ['grid.dat', 'z.npy']
+    resolve_refs(ref, data_root=str(data_root), tecplot_cache=True)
+    assert any('.xycache' in name for name in os.listdir(data_root))
+
+
+def test_render_and_errors(data_root):
+    with WorkerPool(processes=1, max_queue=0, timeout=60, data_root=str(data_root)) as pool:
+        assert pool.render(CONFIG).startswith(PNG)
+        assert pool.render(dict(axes=dict(plot=dict(args=[{'$npy': 'z.npy'}]))), 'svg').startswith(b'<?xml')
+        with pytest.raises(RenderError, match='outside the data root'):
+            pool.render(dict(axes=dict(plot=dict(args=[{'$npy': '../secret.npy'}]))))
+        with pytest.raises(RenderError):
+            pool.render(dict(axes=dict(no_such_key=1)))
+        # 出错后工作进程仍可继续绘图
+        assert pool.render(CONFIG).startswith(PNG)
+        health = pool.health()
+        assert (health['rendered'], health['errors'], health['workers']) == (3, 2, 1)
+
+
+def test_backpressure():
+    with WorkerPool(processes=1, max_queue=0, timeout=60) as pool:
+        results = []
+        thread = threading.Thread(target=lambda: results.append(pool.render(slow_config(2))))
+        thread.start()
+        wait_for(lambda: pool.health()['idle'] == 0)
+        with pytest.raises(ServerBusy):
+            pool.render(CONFIG)
+        thread.join()
+        assert results[0].startswith(PNG)
+        assert pool.health()['rejected'] == 1
+        # 工作进程空闲后重新接受请求
+        assert pool.render(CONFIG).startswith(PNG)
+
+
+def test_timeout_replaces_worker():
+    with WorkerPool(processes=1, max_queue=0, timeout=60) as pool:
+        (old, ) = pool._workers
+        start = time.monotonic()
+        with pytest.raises(RenderTimeout):
+            pool.render(slow_config(30), timeout=1)
+        assert time.monotonic() - start < 10
+        assert not old.process.is_alive()
+        assert pool.health()['timeouts'] == 1
+        # 超时的工作进程被终止, 由新的工作进程替换
+        assert pool.render(CONFIG).startswith(PNG)
+        assert old not in pool._workers and len(pool._workers) == 1
+
+
+def test_recycling_after_max_renders():
+    with WorkerPool(processes=1, max_queue=0, timeout=60, max_renders=2) as pool:
+        (first, ) = pool._workers
+        pids = {first.process.pid}
+        for _ in range(5):
+            assert pool.render(CONFIG).startswith(PNG)
+            pids.update(worker.process.pid for worker in pool._workers)
+        assert pool.health()['recycled'] == 2
+        assert not first.process.is_alive()
+        assert len(pids) == 3
+
+
+def request(server, method, path, body=None):
+    conn = http.client.HTTPConnection(*server.server_address[:2], timeout=60)
+    try:
+        conn.request(method, path, body=None if body is None else json.dumps(body))
+        response = conn.getresponse()
+        return response.status, dict(response.getheaders()), response.read()
+    finally:
+        conn.close()
+
+
+def test_http_server(data_root):
+    with WorkerPool(processes=1, max_queue=0, timeout=60, data_root=str(data_root)) as pool:
+        server = RenderServer(('127.0.0.1', 0), pool)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            status, headers, body = request(server, 'POST', '/render', dict(config=CONFIG))
+            assert (status, headers['Content-Type'], body[:4]) == (200, 'image/png', PNG)
+            status, _, body = request(server, 'POST', '/render',
+                                      dict(config=dict(axes=dict(plot=dict(args=[{'$npy': '/etc/passwd'}])))))
+            assert status == 400 and b'outside the data root' in body
+            status, _, _ = request(server, 'GET', '/missing')
+            assert status == 404
+            status, headers, body = request(server, 'GET', '/health')
+            health = json.loads(body)
+            assert status == 200 and headers['Content-Type'] == 'application/json'
+            assert health['workers'] == 1 and health['rendered'] >= 1
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+def test_request_body_limit():
+    with WorkerPool(processes=1, max_queue=0, timeout=60) as pool:
+        server = RenderServer(('127.0.0.1', 0), pool, max_body=1024)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            status, headers, body = request(server, 'POST', '/render', dict(config=CONFIG, pad='x' * 2048))
+            assert status == 413 and headers['Connection'] == 'close' and b'exceeds the limit' in body
+            # 只声明了很大的 Content-Length, 不发送请求体, 也直接拒绝而不等待读取
+            with socket.create_connection(server.server_address[:2], timeout=10) as sock:
+                sock.sendall(b'POST /render HTTP/1.1\r\nHost: x\r\nContent-Length: 1000000000000\r\n\r\n')
+                assert sock.recv(64).startswith(b'HTTP/1.1 413')
+            status, _, body = request(server, 'POST', '/render', dict(config=CONFIG))
+            assert status == 200 and body[:4] == PNG
+        finally:
+            server.shutdown()
+            server.server_close()
@@ -0,0 +1,172 @@
+"""共享数组句柄: 零拷贝视图、__array__ 拷贝语义、工作进程映射与共享数据的释放"""
+import os
+import pickle
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context, resource_tracker, shared_memory
+
+import numpy as np
+import pytest
+
+from xyplot.RenderCache import fingerprint
+from xyplot.Shared import SharedArray, detach_all, shared_config
+from xyplot.serve import WorkerPool, resolve_refs
+
+ARRAY = np.linspace(0, 1, 2 ** 18).reshape(512, 512)   # 2 MB
+
+
+def segment_exists(handle):
+    return os.path.exists(os.path.join('/dev/shm', handle.name.lstrip('/')))
+
+
+def attached_sum(handle):
+    """工作进程中: 映射共享数组并求和, 返回后解除映射"""
+    try:
+        view = handle.array
+        return float(view.sum()), view.flags.writeable
+    finally:
+        detach_all()
+
+
+def test_handle_pickles_without_data():
+    with SharedArray.create(ARRAY) as handle:
+        assert len(pickle.dumps(handle)) < 500
+        copy = pickle.loads(pickle.dumps(handle))
+        assert copy._owner is None
+        np.testing.assert_array_equal(copy.array, ARRAY)
+
+
+def test_zero_copy_and_read_only_view():
+    with SharedArray.create(ARRAY) as handle:
+        view = np.asarray(handle)
+        assert view is handle.array and not view.flags.writeable
+        with pytest.raises(ValueError):
+            view[0, 0] = 1
+        assert np.shares_memory(np.asarray(handle, copy=False), view)
+
+
+def test_array_copy_semantics():
+    with SharedArray.create(ARRAY) as handle:
+        copied = np.array(handle)
+        assert copied.flags.writeable and not np.shares_memory(copied, handle.array)
+        copied[0, 0] = 5
+        assert handle.array[0, 0] == 0
+        assert handle.__array__(copy=True) is not handle.array
+        converted = np.asarray(handle, dtype=np.float32)
+        assert converted.dtype == np.float32
+        np.testing.assert_allclose(converted, ARRAY, rtol=1e-6)
+        # 需要转换数据类型时无法避免拷贝
+        with pytest.raises(ValueError):
+            handle.__array__(np.float32, copy=False)
+        assert handle.__array__(np.float64, copy=False) is handle.array
+
+
+def test_shared_config_releases_segments():
+    config = dict(axes=dict(plot=dict(args=(ARRAY, ARRAY, [0, 1]))))
+    with shared_config(config) as shared:
+        x, y, small = shared['axes']['plot']['args']
+        # 同一数组只共享一次, 小数组保持原样
+        assert x is y and isinstance(x, SharedArray) and small == [0, 1]
+        assert segment_exists(x)
+    assert not segment_exists(x)
+
+
+def test_mmap_backend_removes_file(tmp_path):
+    with shared_config(dict(z=ARRAY), backend='mmap', directory=tmp_path) as shared:
+        handle = shared['z']
+        assert os.path.dirname(handle.name) == str(tmp_path)
+        np.testing.assert_array_equal(np.asarray(handle), ARRAY)
+    assert not os.listdir(tmp_path)
+
+
+def test_worker_process_attach():
+    with SharedArray.create(ARRAY) as handle:
+        with ProcessPoolExecutor(2, mp_context=get_context('spawn')) as pool:
+            results = list(pool.map(attached_sum, [handle] * 4))
+        assert results == [(float(ARRAY.sum()), False)] * 4
+        # 工作进程只解除映射, 共享内存由所有者删除
+        assert segment_exists(handle)
+    assert not segment_exists(handle)
+
+
+def test_worker_pool_shm_reference():
+    with WorkerPool(processes=1, max_queue=0, timeout=60) as pool, SharedArray.create(ARRAY[0]) as handle:
+        ref = {'$shm': handle.name, 'shape': list(handle.shape), 'dtype': handle.dtype}
+        assert pool.render(dict(axes=dict(plot=dict(args=[ref])))).startswith(b'\x89PNG')
+        assert segment_exists(handle)
+    assert not segment_exists(handle)
+
+
+def test_concurrent_attach_in_threads():
+    register = resource_tracker.register
+    handles = [SharedArray.create(ARRAY * i) for i in range(8)]
+    try:
+        copies = [pickle.loads(pickle.dumps(h)) for h in handles]
+        barrier = threading.Barrier(len(copies))
+        sums = dict()
+
+        def attach(i, handle):
+            barrier.wait()
+            sums[i] = float(handle.array.sum())
+
+        threads = [threading.Thread(target=attach, args=item) for item in enumerate(copies)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert sums == {i: float((ARRAY * i).sum()) for i in range(8)}
+        assert resource_tracker.register is register
+    finally:
+        detach_all()
+        for handle in handles:
+            handle.release()
+
+
+@pytest.mark.skipif(sys.version_info >= (3, 13), reason="SharedMemory(track=False) does not touch resource_tracker")
+def test_attach_does_not_skip_registration_in_other_threads(monkeypatch):
+    owner = SharedArray.create(ARRAY)
+    registered = []
+    monkeypatch.setattr(resource_tracker, 'register', lambda name, rtype: registered.append(name))
+    original, swapped = shared_memory.SharedMemory, threading.Event()
+
+    def slow_attach(*args, **kwargs):
+        # 映射期间 register 被替换, 在此停留以便另一个线程同时创建共享内存
+        if not kwargs.get('create') and resource_tracker.register.__name__ == '_skip_register':
+            swapped.set()
+            time.sleep(0.5)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(shared_memory, 'SharedMemory', slow_attach)
+    try:
+        thread = threading.Thread(target=lambda: pickle.loads(pickle.dumps(owner)).array)
+        thread.start()
+        assert swapped.wait(10)
+        created = SharedArray.create(ARRAY)
+        thread.join()
+        monkeypatch.undo()
+        # 创建的共享内存仍注册到 resource_tracker(所有者进程异常退出时由其删除)
+        assert created._owner._name in registered
+        resource_tracker.register(created._owner._name, 'shared_memory')
+        created.release()
+    finally:
+        monkeypatch.undo()
+        detach_all()
+        owner.release()
+
+
+def test_shm_reference_rejects_mmap_backend(tmp_path):
+    np.save(tmp_path / 'secret.npy', ARRAY)
+    ref = {'$shm': str(tmp_path / 'secret.npy'), 'shape': [512, 512], 'dtype': '<f8', 'backend': 'mmap'}
+    with pytest.raises(ValueError, match="'shm' backend"):
+        resolve_refs(dict(x=ref))
+    with pytest.raises(ValueError, match="'shm' backend"):
+        fingerprint(dict(x=ref))
+
+
+def test_fingerprint_by_content():
+    with SharedArray.create(ARRAY) as a, SharedArray.create(ARRAY.copy()) as b:
+        ref = {'$shm': a.name, 'shape': list(a.shape), 'dtype': a.dtype}
+        assert fingerprint(dict(x=a)) == fingerprint(dict(x=b)) == fingerprint(dict(x=ARRAY))
+        assert fingerprint(dict(x=ref)) == fingerprint(dict(x=dict(ref, **{'$shm': b.name})))
@@ -0,0 +1,99 @@
+"""流线几何缓存: 与 axes.streamplot 一致、仅修改样式时命中缓存、只读数组不重复哈希、多线程访问"""
+from concurrent.futures import ThreadPoolExecutor
+
+import matplotlib as mpl
+import numpy as np
+import pytest
+from matplotlib.figure import Figure
+
+import xyplot.Streamline as Streamline
+
+x = np.linspace(-2, 2, 30)
+y = np.linspace(-1, 1, 20)
+X, Y = np.meshgrid(x, y)
+U, V = 1 - X ** 2, -Y + 0.3 * X
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    Streamline.clear_cache()
+    yield
+    Streamline.clear_cache()
+
+
+@pytest.fixture
+def integrations(monkeypatch):
+    calls = []
+    integrate = Streamline._integrate
+
+    def counted(*args):
+        calls.append(args)
+        return integrate(*args)
+
+    monkeypatch.setattr(Streamline, '_integrate', counted)
+    return calls
+
+
+def test_matches_axes_streamplot():
+    reference = Figure().add_subplot().streamplot(x, y, U, V, density=1.5)
+    axes = Figure().add_subplot()
+    result = Streamline.streamplot(axes, x, y, U, V, density=1.5)
+    expected, actual = reference.lines.get_segments(), result.lines.get_segments()
+    assert len(actual) == len(expected)
+    for a, b in zip(actual, expected):
+        np.testing.assert_allclose(a, b)
+    np.testing.assert_array_equal(result.lines.get_colors(), reference.lines.get_colors())
+    # 箭头位置一致
+    ref_arrows = [p for p in reference.lines.axes.patches]
+    assert [p._posA_posB for p in axes.patches] == [p._posA_posB for p in ref_arrows]
+
+
+def test_default_color_follows_prop_cycle():
+    colors = mpl.rcParams['axes.prop_cycle'].by_key()['color']
+    axes = Figure().add_subplot()
+    axes.plot([0, 1], [0, 1])
+    first = Streamline.streamplot(axes, x, y, U, V)
+    second = Streamline.streamplot(axes, x, y, U, V)
+    assert mpl.colors.same_color(first.lines.get_colors()[0], colors[1])
+    assert mpl.colors.same_color(second.lines.get_colors()[0], colors[2])
+    # 流线不显示在图例中
+    assert axes.get_legend_handles_labels() == ([], [])
+
+
+def test_cache_hit_on_style_change(integrations):
+    axes = Figure().add_subplot()
+    first = Streamline.streamplot(axes, x, y, U, V, color='r')
+    second = Streamline.streamplot(axes, x, y, U, V, color=np.hypot(U, V), linewidth=2, arrowsize=2)
+    assert len(integrations) == 1
+    assert len(second.lines.get_segments()) >= len(first.lines.get_segments())
+    # 数据或积分参数变化时重新计算
+    Streamline.streamplot(axes, x, y, U * 2 + 1, V, color='r')
+    Streamline.streamplot(axes, x, y, U, V, color='r', density=2)
+    assert len(integrations) == 3
+
+
+def test_readonly_arrays_hashed_once(monkeypatch):
+    u, v = U.copy(), V.copy()
+    u.flags.writeable = v.flags.writeable = False
+    hashed = []
+    hash_array = Streamline._hash_array
+    monkeypatch.setattr(Streamline, '_hash_array', lambda arr: hashed.append(arr) or hash_array(arr))
+    key = Streamline._fingerprint((x, y, u, v, None), ())
+    assert len(hashed) == 4
+    assert Streamline._fingerprint((x, y, u, v, None), ()) == key
+    # 可写数组可能被原地修改, 每次重新计算; 只读数组使用缓存的哈希值
+    assert len(hashed) == 6
+    assert Streamline._fingerprint((x, y, u.copy(), v, None), ()) == key
+    del u, hashed[:]
+    assert len(Streamline._DIGESTS) == 1
+
+
+def test_concurrent_threads(integrations):
+    def draw(_):
+        axes = Figure().add_subplot()
+        return len(Streamline.streamplot(axes, x, y, U, V, density=0.5, color='k').lines.get_segments())
+
+    with ThreadPoolExecutor(4) as pool:
+        counts = list(pool.map(draw, range(8)))
+    assert len(set(counts)) == 1
+    assert len(Streamline._CACHE) == 1 and len(integrations) <= 4
@@ -0,0 +1,78 @@
+"""tecplot ASCII 读取: 随仓库提供的数据文件、省略 E 的指数、非有限值与 BLOCK 排列"""
+import os
+
+import numpy as np
+import pytest
+
+from xyplot.io import parse_tecplot, read_tecplot
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE = os.path.join(ROOT, 'P-L1-IMM-SWMF_20221018004619_0005M_SWMF.dat')
+
+
+def test_sample_file():
+    dataset = read_tecplot(SAMPLE)
+    assert dataset.title == 'RCM-BATSRUS: T=0000:09:00'
+    assert len(dataset.variables) == 27 and dataset.variables[:2] == ['X [R]', 'Y [R]']
+    (zone, ) = dataset.zones
+    assert (zone.i, zone.j) == (78, 49) and zone.shape == (49, 78)
+    assert zone.auxdata['TIME'] == '0000:09:00'
+    assert zone.data.shape == (27, 49 * 78) and zone.data.flags.c_contiguous
+    x, i, j = zone.grid('X [R]', 'I', 'J')
+    assert x.shape == (49, 78)
+    # 索引变量 I/J 按有序网格排列
+    np.testing.assert_array_equal(i[0], i[-1])
+    np.testing.assert_array_equal(j[:, 0], j[:, -1])
+    assert np.isfinite(zone.data).all()
+
+
+def test_sample_file_matches_line_by_line_parse():
+    with open(SAMPLE) as f:
+        lines = [line.split() for line in f if line[:1] in ' 0123456789+-.' and line.strip()]
+    expected = np.array([[float(_repair(v)) for v in line] for line in lines])
+    np.testing.assert_array_equal(read_tecplot(SAMPLE)[0].data, expected.T)
+
+
+def _repair(text):
+    """逐值补充省略的 E"""
+    for pos in range(1, len(text)):
+        if text[pos] in '+-' and (text[pos - 1].isdigit() or text[pos - 1] == '.'):
+            return text[:pos] + 'E' + text[pos:]
+    return text
+
+
+def test_missing_exponent_marker():
+    raw = b'VARIABLES="A","B","C"\nZONE I=2, F=POINT\n9.324-132 1.5+005 -2.0\n1.0E-3 -7.25-010 3.\n'
+    zone = parse_tecplot(raw)[0]
+    np.testing.assert_array_equal(zone.data, [[9.324e-132, 1.0e-3], [1.5e5, -7.25e-10], [-2.0, 3.0]])
+
+
+@pytest.mark.parametrize('first', [b'NaN', b'nan', b'Inf', b'-inf'])
+def test_rows_starting_with_nonfinite_values(first):
+    raw = (b'VARIABLES="A","B"\nZONE T="z" I=3, F=POINT\n' + first + b' 1.0\n2.0 NaN\n' + first + b' 3.0\n'
+           b'ZONE T="w" I=1, F=POINT\n4.0 5.0\n')
+    dataset = parse_tecplot(raw)
+    assert [zone.title for zone in dataset] == ['z', 'w']
+    a, b = dataset[0]['A'], dataset[0]['B']
+    expected = float(first)
+    np.testing.assert_array_equal(a, [expected, 2.0, expected])
+    np.testing.assert_array_equal(b, [1.0, np.nan, 3.0])
+    np.testing.assert_array_equal(dataset[1].data, [[4.0], [5.0]])
+
+
+def test_block_packing_with_uneven_lines():
+    # BLOCK 排列按行折叠, 每行数值个数不同(回退到按空白分隔解析)
+    raw = (b'TITLE = "blk"\nVARIABLES = X, Y\n"V"\nZONE T="b", I=3, J=2, DATAPACKING=BLOCK\n'
+           b'AUXDATA Step="7"\n1 2 3 4\n5 6\n# comment\n10 20 30\n40 50 6.0-001\n7 8 9 10 11 12\n')
+    dataset = parse_tecplot(raw)
+    zone = dataset[0]
+    assert dataset.variables == ['X', 'Y', 'V'] and dataset.title == 'blk'
+    assert zone.auxdata == {'Step': '7'} and zone.shape == (2, 3)
+    np.testing.assert_array_equal(zone.grid('X'), [[1, 2, 3], [4, 5, 6]])
+    np.testing.assert_array_equal(zone['Y'], [10, 20, 30, 40, 50, 0.6])
+    np.testing.assert_array_equal(zone['V'], [7, 8, 9, 10, 11, 12])
+
+
+def test_wrong_value_count():
+    with pytest.raises(ValueError, match='expects 3 points'):
+        parse_tecplot(b'VARIABLES="A"\nZONE I=3\n1\n2\n')
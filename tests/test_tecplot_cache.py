@@ -0,0 +1,86 @@
+"""tecplot 二进制缓存: 往返一致、源文件修改后失效、内存映射加载"""
+import os
+
+import numpy as np
+import pytest
+
+import xyplot.io.tecplot as tecplot
+from xyplot.io import read_tecplot
+from xyplot.io.cache import cache_paths
+
+HEADER = b'TITLE="t"\nVARIABLES="X","Y","V"\n'
+
+
+def _zone(title, values):
+    rows = b''.join(b'%r %r %r\n' % tuple(v) for v in values)
+    return b'ZONE T="%s" I=%d, J=1, F=POINT\n' % (title.encode(), len(values)) + rows
+
+
+def _write(path, *zones, mtime=None):
+    path.write_bytes(HEADER + b''.join(zones))
+    if mtime is not None:
+        os.utime(path, ns=(mtime, mtime))
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / 'data.dat'
+    _write(path, _zone('a', [(0.0, 1.0, 2.0), (3.0, 4.0, 5.0)]), _zone('b', [(6.0, 7.0, 8.0)]), mtime=10 ** 18)
+    return path
+
+
+def test_round_trip(source):
+    parsed = read_tecplot(source)
+    written = read_tecplot(source, cache=True)
+    cached = read_tecplot(source, cache=True)
+    for dataset in (written, cached):
+        assert dataset.title == parsed.title and dataset.variables == parsed.variables
+        assert len(dataset) == 2
+        for zone, expected in zip(dataset, parsed):
+            assert (zone.title, zone.i, zone.j, zone.k) == (expected.title, expected.i, expected.j, expected.k)
+            np.testing.assert_array_equal(zone.data, expected.data)
+    # 缓存以只读内存映射方式加载
+    assert all(isinstance(zone.data, np.memmap) and not zone.data.flags.writeable for zone in cached)
+
+
+def test_cache_dir(source, tmp_path):
+    cache_dir = tmp_path / 'cache'
+    read_tecplot(source, cache=True, cache_dir=str(cache_dir))
+    header_path, _ = cache_paths(str(source), str(cache_dir))
+    assert os.path.exists(header_path)
+    assert sorted(os.listdir(source.parent)) == ['cache', 'data.dat']
+    np.testing.assert_array_equal(read_tecplot(source, cache=True, cache_dir=str(cache_dir))[1]['V'], [8.0])
+
+
+def test_invalidated_when_source_changes(source):
+    read_tecplot(source, cache=True)
+    # 大小不变、只有修改时间变化时也重新解析
+    _write(source, _zone('a', [(0.0, 1.0, 2.0), (3.0, 4.0, 9.0)]), _zone('b', [(6.0, 7.0, 8.0)]),
+           mtime=10 ** 18 + 1)
+    np.testing.assert_array_equal(read_tecplot(source, cache=True)[0]['V'], [2.0, 9.0])
+    np.testing.assert_array_equal(read_tecplot(source, cache=True)[0]['V'], [2.0, 9.0])
+
+
+def test_change_during_parse_is_not_cached(source, monkeypatch):
+    parse = tecplot.parse_tecplot
+
+    def parse_while_modified(raw, dtype):
+        # 读取源文件之后、写入缓存之前源文件被修改
+        _write(source, _zone('a', [(1.0, 1.0, 1.0)]), mtime=10 ** 18 + 5)
+        return parse(raw, dtype)
+
+    monkeypatch.setattr(tecplot, 'parse_tecplot', parse_while_modified)
+    assert len(read_tecplot(source, cache=True)) == 2
+    monkeypatch.setattr(tecplot, 'parse_tecplot', parse)
+    dataset = read_tecplot(source, cache=True)
+    assert len(dataset) == 1
+    np.testing.assert_array_equal(dataset[0]['V'], [1.0])
+
+
+def test_stale_zone_files_removed(source):
+    read_tecplot(source, cache=True)
+    _, prefix = cache_paths(str(source))
+    assert os.path.exists(f"{prefix}.1.npy")
+    _write(source, _zone('a', [(0.0, 0.0, 0.0)]), mtime=10 ** 18 + 2)
+    assert len(read_tecplot(source, cache=True)) == 1
+    assert os.path.exists(f"{prefix}.0.npy") and not os.path.exists(f"{prefix}.1.npy")
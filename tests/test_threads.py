@@ -0,0 +1,78 @@
+"""调度记录器、配置路径与性能分析器按线程隔离, 多个线程可同时绘图"""
+import threading
+
+import numpy as np
+
+from xyplot import Profiler
+from xyplot.utils import CallRecorder
+from xyplot.xyplotBuilder import XyPlotDirector
+
+X = np.linspace(0, 1, 50)
+
+
+def _config(title):
+    return dict(
+        axes=dict(plot=dict(args=(X, X ** 2)), scatter=dict(args=(X, X)), title=title),
+        set_fig=dict(title='figure'),
+    )
+
+
+class _Background:
+    """在后台线程中持续绘图, 直到 with 语句块结束"""
+    def __enter__(self):
+        self.stop = threading.Event()
+        self.renders = 0
+        self.errors = []
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        return self
+
+    def _run(self):
+        try:
+            while not self.stop.is_set():
+                with XyPlotDirector(incremental=True, **_config('background')) as director:
+                    director.to_bytes('png', dpi=20)
+                self.renders += 1
+        except Exception as e:  # noqa: 在主线程中断言
+            self.errors.append(e)
+
+    def __exit__(self, *exc):
+        self.stop.set()
+        self.thread.join(60)
+
+
+def _paths(config):
+    with CallRecorder() as recorder:
+        XyPlotDirector(**config).close()
+    return set(recorder.records)
+
+
+def test_recorder_ignores_other_threads():
+    expected = _paths(_config('main'))
+    with _Background() as background:
+        for _ in range(20):
+            assert _paths(_config('main')) == expected
+    assert not background.errors
+    assert background.renders > 0
+
+
+def test_incremental_update_while_other_threads_render():
+    with _Background() as background:
+        for i in range(10):
+            with XyPlotDirector(incremental=True, **_config('main')) as director:
+                assert 'axes[0].plot' in director.artists
+                director.update({'axes[0].plot': (X, X * i)})
+                line = director.artists['axes[0].plot'][3][0]
+                np.testing.assert_allclose(line.get_ydata(), X * i)
+    assert not background.errors
+
+
+def test_profiler_only_counts_own_thread():
+    with Profiler() as alone:
+        XyPlotDirector(**_config('main')).close()
+    with _Background() as background:
+        with Profiler() as profiler:
+            XyPlotDirector(**_config('main')).close()
+    assert not background.errors
+    assert set(profiler.stats) == set(alone.stats)
+    assert all(stat[0] == alone.stats[path][0] for path, stat in profiler.stats.items())
@@ -0,0 +1,43 @@
+"""渲染到内存: to_bytes 与保存文件的结果一致, to_rgba 与 PNG 的像素一致"""
+import io
+
+import numpy as np
+import pytest
+from matplotlib.backend_bases import FigureCanvasBase
+from matplotlib.image import imread
+
+from xyplot.xyplotBuilder import XyPlotDirector
+
+x = np.linspace(0, 6, 40)
+CONFIG = dict(set_fig=dict(width=4, height=3), axes=dict(plot=dict(args=(x, np.sin(x))), title='memory'))
+
+
+@pytest.mark.parametrize('format, magic', [('png', b'\x89PNG'), ('svg', b'<?xml'), ('pdf', b'%PDF')])
+def test_to_bytes_matches_save(tmp_path, format, magic):
+    with XyPlotDirector(**CONFIG) as director:
+        data = director.to_bytes(format, dpi=50)
+        file = tmp_path / f"out.{format}"
+        director.save(file, dpi=50)
+    assert data.startswith(magic) and file.read_bytes().startswith(magic)
+    # PNG 不含时间戳等元数据, 结果逐字节一致
+    if format == 'png':
+        assert data == file.read_bytes()
+
+
+def test_to_rgba_matches_png():
+    with XyPlotDirector(**CONFIG) as director:
+        dpi = director.figure.dpi
+        rgba = director.to_rgba(dpi=40)
+        assert rgba.shape == (120, 160, 4) and rgba.dtype == np.uint8
+        png = imread(io.BytesIO(director.to_bytes('png', dpi=40)))
+        np.testing.assert_array_equal(rgba, np.round(png * 255).astype(np.uint8))
+        # 画布分辨率恢复
+        assert director.figure.dpi == dpi
+        assert director.to_rgba().shape[:2] == (int(3 * dpi), int(4 * dpi))
+
+
+def test_to_rgba_without_agg_canvas():
+    with XyPlotDirector(**CONFIG) as director:
+        expected = director.to_rgba(dpi=40).copy()
+        FigureCanvasBase(director.figure)
+        np.testing.assert_array_equal(director.to_rgba(dpi=40), expected)
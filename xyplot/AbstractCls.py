@@ -1,6 +1,6 @@
 from abc import ABCMeta, abstractmethod
 from .cfg_names import BRANCH_NAME, INIT_NAME
-from .utils import method_call
+from .utils import method_call, call_path
 
 __author__ = 'Rookie'
 __all__ = [
@@ -10,6 +10,9 @@ __all__ = [
 
 
 class ModuleSetter(metaclass=ABCMeta):
+    _plan_trace = True  # 编译渲染计划时可使用代理对象展开调度
+    early_keys = ()     # 在分支(Branch)之前执行的 native_api 键, 如分支绘图需要取得的显示范围
+
     def __init__(self, module, **kwargs):
         self.module = module
         if len(kwargs):
@@ -19,11 +22,16 @@ class ModuleSetter(metaclass=ABCMeta):
         # 如果存在INIT_NAME, 代表此模块的调度的实际是传入模块被初始化后返回的模块对象
         init = None if INIT_NAME not in kwargs else kwargs.pop(INIT_NAME)
         if init is not None:
-            module = method_call(module, init)
+            with call_path(INIT_NAME):
+                module = method_call(module, init)
         # 分支, 一般用于自定义组合设置
         branch = None if BRANCH_NAME not in kwargs else kwargs.pop(BRANCH_NAME)
+        early = {k: kwargs.pop(k) for k in self.early_keys if k in kwargs} if branch is not None else None
+        if early:
+            self.native_api(module, **early)
         if branch is not None:
-            self.branch_api(module, **branch)
+            with call_path(BRANCH_NAME):
+                self.branch_api(module, **branch)
         self.native_api(module, **kwargs)
 
     @abstractmethod
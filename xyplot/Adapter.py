@@ -1,8 +1,15 @@
+from .Plan import PlanTarget
+
 
 class XyPlotAdapter:
     """
     绘图对象适配器
+    编译渲染计划时(module 为 PlanTarget 代理对象), 可追踪的设置类/方法(_plan_trace 为True)直接展开调度,
+    其余对象(如 ContourfDirector、绘制几何图形的方法)记录为延迟调用, 在执行渲染计划时才真正调用
     """
     def __init__(self, *args, **kwargs):
         adapt_obj, module = args[:2]
-        adapt_obj(module, **kwargs)
+        if isinstance(module, PlanTarget) and not getattr(adapt_obj, '_plan_trace', False):
+            module.defer(adapt_obj, kwargs)
+        else:
+            adapt_obj(module, **kwargs)
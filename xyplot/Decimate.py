@@ -0,0 +1,249 @@
+"""
+长序列折线/散点的降采样绘制
+    折线: 按子区域像素宽度分桶, 每个桶保留最小值与最大值点(minmax), 或使用 LTTB(Largest-Triangle-Three-Buckets) 算法,
+          降采样后的折线在屏幕分辨率下与原始数据几乎无法区分, 绘制耗时不再随数据量增长
+    散点: 点数超过阈值时按像素分箱统计密度(或分箱内颜色值的平均值), 以图像方式绘制
+"""
+import numpy as np
+import matplotlib as mpl
+
+from .Plan import PlanTarget
+
+__author__ = 'Rookie'
+__all__ = [
+    'plot',             # 支持 decimate 参数的 axes.plot
+    'scatter',          # 支持 decimate 参数的 axes.scatter
+    'minmax_indices',   # minmax 降采样保留点的索引
+    'lttb_indices',     # LTTB 降采样保留点的索引
+    'density_grid',     # 散点的分箱密度统计
+    'axes_pixels',      # 子区域的像素尺寸
+]
+
+OVERSAMPLE = 2  # 每个像素对应的分桶个数, 为之后调整画布尺寸/分辨率预留余量
+SCATTER_THRESHOLD = 100000  # 散点个数超过该值时才进行密度分箱
+
+
+def plot(axes, *args, decimate=None, **kwargs):
+    """
+    等同于 axes.plot, 增加 decimate 参数
+    Parameters
+    ----------
+    axes: 子区域对象
+    args: 与 axes.plot 一致, 仅支持单条折线 (y, [fmt]) 或 (x, y, [fmt])
+    decimate: 降采样设置, 为None/False时不降采样
+        True 或 'minmax': 按像素宽度分桶, 保留每个桶的最小值与最大值点, 能够保留所有峰值
+        'lttb': Largest-Triangle-Three-Buckets 算法, 保留视觉形状
+        dict: dict(method='minmax'/'lttb', n=分桶个数, 为None时根据子区域像素宽度与分辨率确定)
+    kwargs: 与 axes.plot 一致
+    """
+    if not decimate:
+        return axes.plot(*args, **kwargs)
+    if isinstance(axes, PlanTarget):
+        # 编译渲染计划时数据尚未确定, 延迟到执行时再降采样
+        return axes.defer(plot, dict(kwargs, decimate=decimate), args)
+    options = _options(decimate, 'minmax')
+    series = _split_plot_args(args)
+    if series is None or 'data' in kwargs:
+        return axes.plot(*args, **kwargs)
+    x, y, rest = series
+    n = options.get('n') or OVERSAMPLE * axes_pixels(axes)[0]
+    if options['method'] == 'minmax':
+        index = minmax_indices(x, y, n)
+    elif options['method'] == 'lttb':
+        index = lttb_indices(x, y, 2 * n)
+    else:
+        raise ValueError(
+            f"Unsupported decimate method {options['method']!r}, Optional values include 'minmax'、'lttb'"
+        )
+    if index is not None:
+        x, y = x[index], y[index]
+    return axes.plot(x, y, *rest, **kwargs)
+
+
+def scatter(axes, *args, decimate=None, **kwargs):
+    """
+    等同于 axes.scatter, 增加 decimate 参数
+    Parameters
+    ----------
+    axes: 子区域对象
+    args: 与 axes.scatter 一致, (x, y, [s], [c])
+    decimate: 降采样设置, 为None/False时不降采样
+        True 或 'density': 点数超过阈值时按像素分箱, 以图像方式绘制分箱内的点数(指定数组 c 时为分箱内 c 的平均值)
+        dict: dict(method='density', threshold=点数阈值, bins=(x方向箱数, y方向箱数))
+    kwargs: 与 axes.scatter 一致, 密度图像只使用其中的 cmap/norm/vmin/vmax/alpha/zorder/label
+    """
+    if not decimate:
+        return axes.scatter(*args, **kwargs)
+    if isinstance(axes, PlanTarget):
+        return axes.defer(scatter, dict(kwargs, decimate=decimate), args)
+    options = _options(decimate, 'density')
+    if options['method'] != 'density':
+        raise ValueError(
+            f"Unsupported decimate method {options['method']!r}, Optional values include 'density'"
+        )
+    x, y = (np.ravel(v) for v in args[:2])
+    if x.size <= options.get('threshold', SCATTER_THRESHOLD) or 'data' in kwargs:
+        return axes.scatter(*args, **kwargs)
+    c = args[3] if len(args) > 3 else kwargs.get('c')
+    weights = np.ravel(c) if c is not None and np.size(c) == x.size and np.ndim(c) <= 1 and \
+        not isinstance(c, str) else None
+    bins = options.get('bins') or axes_pixels(axes)
+    grid, extent = density_grid(x, y, bins, weights)
+    image_kwargs = {k: kwargs[k] for k in ('cmap', 'norm', 'vmin', 'vmax', 'alpha', 'zorder', 'label') if k in kwargs}
+    return axes.imshow(grid, extent=extent, origin='lower', aspect='auto', interpolation='nearest', **image_kwargs)
+
+
+def minmax_indices(x, y, n):
+    """
+    minmax 降采样: 将数据分为 n 个桶(x 单调递增时按 x 等间距分桶, 否则按索引等分), 保留每个桶中最小值与最大值点
+    以及首尾点, 桶中含有 NaN 时保留一个 NaN 点以保留折线的断开位置
+    Returns
+    -------
+    保留点的索引(递增), 数据量不超过 2n 时返回None
+    """
+    size = y.shape[0]
+    if size <= 2 * n:
+        return None
+    fx = _as_float(x)
+    if np.all(fx[1:] >= fx[:-1]) and fx[-1] > fx[0]:
+        bucket = ((fx - fx[0]) * (n / (fx[-1] - fx[0]))).astype(np.int64)
+    else:
+        bucket = np.arange(size) * n // size
+    starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    segment = np.repeat(np.arange(starts.size), np.diff(np.r_[starts, size]))
+    idx = np.arange(size)
+    y = np.asarray(y, dtype=np.float64)
+    # fmin/fmax 忽略 NaN; 桶内先找到极值, 再取极值首次出现的位置
+    lo = np.fmin.reduceat(y, starts)
+    hi = np.fmax.reduceat(y, starts)
+    i_lo = np.minimum.reduceat(np.where(y == lo[segment], idx, size), starts)
+    i_hi = np.minimum.reduceat(np.where(y == hi[segment], idx, size), starts)
+    i_nan = np.minimum.reduceat(np.where(np.isnan(y), idx, size), starts)
+    keep = np.unique(np.concatenate(([0, size - 1], i_lo, i_hi, i_nan)))
+    return keep[keep < size]
+
+
+def lttb_indices(x, y, n_out):
+    """
+    LTTB(Largest-Triangle-Three-Buckets) 降采样: 首尾点之间等分为 n_out - 2 个桶,
+    每个桶中选取与上一个选中点、下一个桶平均点构成的三角形面积最大的点
+    每个桶的选择依赖上一个桶的选中点, 这里对所有桶同时计算, 之后只重新计算上一个选中点发生变化的桶, 直到不再变化;
+    第 k 次计算后前 k 个桶的结果已确定, 结果与逐桶计算完全一致, 通常数次计算即可收敛
+    Returns
+    -------
+    保留点的索引(递增), 数据量不超过 n_out 时返回None
+    """
+    size = y.shape[0]
+    if size <= n_out or n_out < 3:
+        return None
+    fx = _as_float(x)
+    fy = np.asarray(y, dtype=np.float64)
+    edges = np.linspace(1, size - 1, n_out - 1).astype(np.int64)
+    # 各桶的平均点(作为前一个桶的三角形第三个顶点), 最后一个桶之后为末尾点
+    counts = np.diff(edges)
+    avg_x = np.r_[np.add.reduceat(fx[:-1], edges[:-1])[:counts.size] / counts, fx[-1]]
+    avg_y = np.r_[np.add.reduceat(fy[:-1], edges[:-1])[:counts.size] / counts, fy[-1]]
+    # 各桶中的点排列为 (桶个数, 最大点数) 的矩阵, 不足部分在计算面积时排除
+    offset = np.arange(counts.max())
+    members = np.minimum(edges[:-1, None] + offset, size - 1)
+    padding = offset >= counts[:, None]
+    keep = np.r_[0, edges[:-1], size - 1]
+    rows = np.arange(counts.size)
+    while rows.size:
+        a = keep[rows]
+        ax, ay = fx[a, None], fy[a, None]
+        cx, cy = avg_x[rows + 1, None], avg_y[rows + 1, None]
+        px, py = fx[members[rows]], fy[members[rows]]
+        area = np.abs((ax - cx) * (py - ay) - (ax - px) * (cy - ay))
+        # NaN 与填充位置不参与比较, 全部为 NaN 的桶选取第一个点
+        area[np.isnan(area) | padding[rows]] = -np.inf
+        chosen = members[rows, np.argmax(area, axis=1)]
+        changed = chosen != keep[rows + 1]
+        keep[rows + 1] = chosen
+        rows = rows[changed] + 1
+        rows = rows[rows < counts.size]
+    return keep
+
+
+def density_grid(x, y, bins, weights=None):
+    """
+    散点分箱统计
+    Parameters
+    ----------
+    x, y: 散点坐标
+    bins: (x方向箱数, y方向箱数)
+    weights: 各点的数值, 为None时统计点数, 否则计算分箱内数值的平均值
+
+    Returns
+    -------
+    (shape 为 (y方向箱数, x方向箱数) 的掩码数组, 无数据的分箱被掩码; 图像范围 (xmin, xmax, ymin, ymax))
+    """
+    x, y = _as_float(x), _as_float(y)
+    valid = np.isfinite(x) & np.isfinite(y)
+    if weights is not None:
+        weights = np.asarray(weights, dtype=np.float64)
+        valid &= np.isfinite(weights)
+        weights = weights[valid]
+    x, y = x[valid], y[valid]
+    nx, ny = (max(1, int(b)) for b in bins)
+    extent = (x.min(), x.max(), y.min(), y.max())
+    # 与 np.histogram2d 等价, 直接计算扁平化的分箱序号后使用 bincount
+    ix = np.minimum(((x - extent[0]) * (nx / ((extent[1] - extent[0]) or 1))).astype(np.int64), nx - 1)
+    iy = np.minimum(((y - extent[2]) * (ny / ((extent[3] - extent[2]) or 1))).astype(np.int64), ny - 1)
+    flat = iy * nx + ix
+    counts = np.bincount(flat, minlength=nx * ny).reshape(ny, nx)
+    if weights is None:
+        grid = counts.astype(np.float64)
+    else:
+        sums = np.bincount(flat, weights=weights, minlength=nx * ny).reshape(ny, nx)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            grid = sums / counts
+    return np.ma.masked_where(counts == 0, grid), extent
+
+
+def axes_pixels(axes):
+    """
+    子区域的像素尺寸 (宽, 高), 按画布分辨率与保存分辨率(rcParams['savefig.dpi'])中的较大者计算
+    """
+    figure = axes.figure
+    dpi = figure.dpi
+    savefig_dpi = mpl.rcParams['savefig.dpi']
+    if savefig_dpi != 'figure':
+        dpi = max(dpi, float(savefig_dpi))
+    scale = dpi / figure.dpi
+    return max(1, int(axes.bbox.width * scale)), max(1, int(axes.bbox.height * scale))
+
+
+def _options(decimate, method):
+    """解析 decimate 设置为字典"""
+    if decimate is True:
+        return dict(method=method)
+    if isinstance(decimate, str):
+        return dict(method=decimate)
+    if isinstance(decimate, dict):
+        return dict(decimate, method=decimate.get('method', method))
+    raise TypeError(
+        f"Optional types of 'decimate' include bool、str、dict"
+    )
+
+
+def _split_plot_args(args):
+    """拆分 axes.plot 的参数为 (x, y, 其余参数), 不是单条一维折线时返回None"""
+    if len(args) >= 2 and not isinstance(args[1], str):
+        x, y, rest = np.asarray(args[0]), np.asarray(args[1]), args[2:]
+    elif len(args) >= 1:
+        y, rest = np.asarray(args[0]), args[1:]
+        x = np.arange(y.shape[0]) if y.ndim else None
+    else:
+        return None
+    if len(rest) > 1 or (rest and not isinstance(rest[0], str)) or y.ndim != 1 or x.shape != y.shape:
+        return None
+    return x, y, rest
+
+
+def _as_float(values):
+    """转换为浮点数组, 日期时间类型按整数时间戳转换"""
+    values = np.asarray(values)
+    if np.issubdtype(values.dtype, np.datetime64) or np.issubdtype(values.dtype, np.timedelta64):
+        values = values.astype(np.int64)
+    return values.astype(np.float64, copy=False)
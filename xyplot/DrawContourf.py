@@ -1,15 +1,40 @@
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+
+import matplotlib as mpl
+import numpy as np
+from matplotlib.colors import BoundaryNorm, LinearSegmentedColormap
+from matplotlib.contour import ContourSet
+from matplotlib.ticker import MaxNLocator
+
 from .AbstractCls import AbstractDrawCls, ModuleSetter
-from .utils import method_call, xy_call
+from .utils import method_call, xy_call, call_path, _freeze
 from .Adapter import XyPlotAdapter
-from .cfg_names import INIT_NAME
+from .cfg_names import INIT_NAME, BRANCH_NAME, ARGS_NAME
+from .Plan import Placeholder
+from .Shared import resolve_handles
 
 __author__ = 'Rookie'
 __all__ = [
     'ContourfDirector',     # 绘制contourf等高线填色图(该模块的顶层设置者)
+    'PcolormeshDirector',   # 绘制pcolormesh网格填色图
     'ColorMapBuilder',      # 色阶颜色映射 colormap 构建设置类
     'DrawColorBar',         # 色卡构建设置类对象
+    'SharedColormap',       # 颜色映射缓存中共享的只读颜色映射
+    'register_colormap',    # 将颜色映射注册到 matplotlib, 以便通过名称引用
+    'clear_colormap_cache',  # 清空颜色映射缓存
+    'precompute_contours',  # 多子区域时在线程池中预先计算各子区域的等值线几何
 ]
 
+_COLORMAP_CACHE = OrderedDict()     # 颜色映射缓存(LRU): {(init 配置, 其它设置): colormap}
+_COLORMAP_CACHE_SIZE = 64
+_COLORMAP_LOCK = threading.Lock()   # 多个线程同时绘图(见 precompute_contours、增量模式)时保护颜色映射缓存
+CONTOUR_WORKERS = None  # 预先计算等值线几何的线程数, 为None时为 CPU 核数
+
 
 class ContourfDirector(AbstractDrawCls):
     """
@@ -20,35 +45,307 @@ class ContourfDirector(AbstractDrawCls):
     kwargs:
         init: 初始化创建`axes.contourf 对象
         cbar: 创建对应的色卡
+        regrid: 散点数据插值设置, 与 Regrid.regrid_to_axes 的参数一致, 如 dict(points=(x, y), values=v);
+            设置后根据子区域的像素尺寸、分辨率与显示范围生成目标网格, 插值与等值线计算只在可见区域、以显示分辨率进行,
+            插值结果替换 init 中的 args
+        mode: 绘制方式, 'vector'(默认)使用 axes.contourf 等计算等值线多边形;
+            'raster' 使用 BoundaryNorm 按 levels 分级后以栅格方式绘制(规则网格使用 imshow, 其余网格使用 pcolormesh),
+            levels/extend/cmap 的含义与 contourf 一致, 适用于稠密网格, 绘制耗时与输出文件大小显著降低
 
     Returns
     -------
 
     """
+    draw_name = 'contourf'  # 绘制时调度的 axes 方法名
+
     def __init__(self, axes, **kwargs):
         self.axes = axes
         self._draw(axes, **kwargs)
 
-    @staticmethod
-    def _draw(axes, **kwargs):
+    def _draw(self, axes, **kwargs):
         # 进行绘制
+        # 配置信息只读取不修改, 需要替换的项通过浅拷贝生成新的字典
         if INIT_NAME in kwargs:
-            # 取出颜色映射配置并进行设置
-            if 'cmap' in kwargs[INIT_NAME]:
-                kwargs[INIT_NAME]['cmap'] = ColorMapBuilder(kwargs[INIT_NAME]['cmap'])()
-            cset = method_call(axes.contourf, kwargs[INIT_NAME])
+            init = kwargs[INIT_NAME]
+            if 'regrid' in kwargs:
+                from .Regrid import regrid_to_axes
+                with call_path('regrid'):
+                    init = dict(init, args=method_call(regrid_to_axes, kwargs['regrid'], axes))
+            with call_path(INIT_NAME):
+                # 取出颜色映射配置并进行设置
+                if 'cmap' in init:
+                    with call_path('cmap'):
+                        init = dict(init, cmap=ColorMapBuilder(init['cmap'])())
+                draw = self.draw_raster if kwargs.get('mode', 'vector') == 'raster' else getattr(axes, self.draw_name)
+                precomputed = _find_precomputed(kwargs[INIT_NAME])
+                if precomputed is not None and draw == axes.contourf:
+                    # 使用多子区域预先计算的等值线几何
+                    draw = partial(self.draw_precomputed, precomputed)
+                cset = method_call(draw, init)
             # 绘制对应的色卡
             if 'cbar' in kwargs:
                 if isinstance(kwargs['cbar'], dict):
                     # 将axes 对象添加到 cbar 的配置参数中去（使其能够放置在cbar旁边）
-                    kwargs['cbar'][INIT_NAME] = dict(mappable=cset, **kwargs['cbar'][INIT_NAME], ax=axes)
+                    cbar = dict(kwargs['cbar'])
+                    cbar[INIT_NAME] = dict(mappable=cset, **cbar[INIT_NAME], ax=axes)
                     # 创建并设置colorbar
-                    DrawColorBar(axes.figure.colorbar, **kwargs['cbar'])
+                    with call_path('cbar'):
+                        DrawColorBar(axes.figure.colorbar, **cbar)
+
+    def draw_precomputed(self, precomputed, *args, **kwargs):
+        """
+        等同于 axes.contourf, 数据与预先计算时一致时使用预先计算的等值线几何创建 ContourSet(见 precompute_contours),
+        否则(如增量模式下更新了数据)正常计算
+        """
+        if not args or args[-1] is not precomputed.z:
+            return self.axes.contourf(*args, **kwargs)
+        kwargs = {k: v for k, v in kwargs.items() if k not in ('algorithm', 'corner_mask')}
+        cset = ContourSet(self.axes, kwargs.pop('levels'), precomputed.allsegs, precomputed.allkinds, filled=True,
+                          **kwargs)
+        # 显示范围与 axes.contourf 一致, 按网格范围而非多边形范围确定
+        x0, x1, y0, y1 = precomputed.bounds
+        cset.sticky_edges.x[:] = [x0, x1]
+        cset.sticky_edges.y[:] = [y0, y1]
+        self.axes.update_datalim([(x0, y0), (x1, y1)])
+        self.axes.autoscale_view(tight=True)
+        return cset
+
+    def draw_raster(self, *args, levels=None, extend='neither', cmap=None, norm=None, vmin=None, vmax=None,
+                    **kwargs):
+        """
+        以栅格方式绘制分级填色图
+        Parameters
+        ----------
+        args: 与 contourf 一致, (Z) 或 (X, Y, Z)
+        levels: 分级边界, 为整数或None时与 contourf 一样通过 MaxNLocator 在数据范围内自动选取
+        extend: 超出分级范围的数据是否使用 under/over 颜色填充, 可选 'neither'、'both'、'min'、'max';
+            与 contourf 一致, 不填充的一侧超出范围的数据留空
+        cmap, norm, vmin, vmax: 颜色映射设置, 指定 norm 时不再根据 levels 构建 BoundaryNorm
+        kwargs: 其它参数, 传递给 imshow 或 pcolormesh
+
+        Returns
+        -------
+        AxesImage 或 QuadMesh
+        """
+        X, Y, Z = args if len(args) == 3 else (None, None, args[0])
+        Z = np.ma.masked_invalid(Z)
+        if levels is None or isinstance(levels, int):
+            levels = _auto_levels(Z, levels, extend, vmin, vmax)
+        levels = np.asarray(levels, dtype=np.float64)
+        if norm is None:
+            cmap = mpl.colormaps[cmap or mpl.rcParams['image.cmap']] if not hasattr(cmap, 'N') else cmap
+            norm = BoundaryNorm(levels, cmap.N, extend=extend)
+        # 与 contourf 一致: 低于最低分级/高于最高分级的数据只在 extend 包括该侧时填充, 否则留空
+        outside = np.zeros(Z.shape, dtype=bool)
+        if extend not in ('min', 'both'):
+            outside |= (Z < levels[0]).filled(False)
+        if extend not in ('max', 'both'):
+            outside |= (Z > levels[-1]).filled(False)
+        if outside.any():
+            Z = np.ma.masked_where(outside, Z)
+        if X is None:
+            X, Y = np.arange(Z.shape[1]), np.arange(Z.shape[0])
+        extent = _regular_extent(X, Y)
+        if extent is not None:
+            return self.axes.imshow(Z, extent=extent, origin='lower', aspect='auto', interpolation='nearest',
+                                    cmap=cmap, norm=norm, **kwargs)
+        X, Y = np.broadcast_arrays(*np.meshgrid(X, Y)) if np.ndim(X) == 1 else (X, Y)
+        return self.axes.pcolormesh(_cell_corners(X), _cell_corners(Y), Z, shading='flat', cmap=cmap, norm=norm,
+                                    **kwargs)
+
+
+def _auto_levels(Z, n, extend, vmin=None, vmax=None):
+    """
+    与 contourf 一致地在数据范围内自动选取分级边界: MaxNLocator 选取后去掉多余的边界,
+    extend 包括的一侧再去掉一个边界; 数据全部无效时数据范围取 0
+    Parameters
+    ----------
+    Z: 数据(掩码数组)
+    n: 目标分级数, 为None时为 7
+    extend: 见 ContourfDirector.draw_raster
+    vmin, vmax: 代替数据范围的最小值、最大值
+    """
+    valid = Z.count() > 0
+    z_min = (float(Z.min()) if valid else 0.0) if vmin is None else vmin
+    z_max = (float(Z.max()) if valid else 0.0) if vmax is None else vmax
+    lev = MaxNLocator((7 if n is None else n) + 1, min_n_ticks=1).tick_values(z_min, z_max)
+    under = np.nonzero(lev < z_min)[0]
+    i0 = under[-1] if len(under) else 0
+    over = np.nonzero(lev > z_max)[0]
+    i1 = over[0] + 1 if len(over) else len(lev)
+    if extend in ('min', 'both'):
+        i0 += 1
+    if extend in ('max', 'both'):
+        i1 -= 1
+    if i1 - i0 < 3:
+        i0, i1 = 0, len(lev)
+    return lev[i0:i1]
+
+
+def _regular_extent(X, Y):
+    """
+    网格为等间距规则网格时返回 imshow 的图像范围(像素中心位于网格点上), 否则返回None
+    """
+    X, Y = np.asarray(X), np.asarray(Y)
+    if X.ndim == 2 and Y.ndim == 2:
+        if not (np.all(X == X[:1]) and np.all(Y == Y[:, :1])):
+            return None
+        X, Y = X[0], Y[:, 0]
+    if X.ndim != 1 or Y.ndim != 1 or X.size < 2 or Y.size < 2:
+        return None
+    dx, dy = np.diff(X), np.diff(Y)
+    if not (np.allclose(dx, dx[0]) and np.allclose(dy, dy[0])) or dx[0] == 0 or dy[0] == 0:
+        return None
+    return X[0] - dx[0] / 2, X[-1] + dx[0] / 2, Y[0] - dy[0] / 2, Y[-1] + dy[0] / 2
+
+
+def _cell_corners(X):
+    """
+    由网格点(单元中心)坐标计算单元角点坐标, 适用于曲线网格: 向外线性外推一圈后对相邻 2x2 个点取平均
+    Returns
+    -------
+    shape 为 (行数 + 1, 列数 + 1) 的角点坐标
+    """
+    X = np.asarray(X, dtype=np.float64)
+    X = np.vstack((2 * X[:1] - X[1:2], X, 2 * X[-1:] - X[-2:-1]))
+    X = np.hstack((2 * X[:, :1] - X[:, 1:2], X, 2 * X[:, -1:] - X[:, -2:-1]))
+    return (X[:-1, :-1] + X[1:, :-1] + X[:-1, 1:] + X[1:, 1:]) / 4
+
+
+class _Precomputed:
+    """预先计算的等值线几何, 按 init 配置对象本身(而非其 id)匹配"""
+    def __init__(self, init, z, bounds, allsegs, allkinds):
+        self.init = init    # contourf 的 init 配置
+        self.z = z  # 数据数组, 绘制时检查数据是否仍为同一对象
+        self.bounds = bounds    # 网格范围 (xmin, xmax, ymin, ymax)
+        self.allsegs = allsegs  # 各分级区间的多边形顶点列表
+        self.allkinds = allkinds    # 各分级区间的多边形路径编码列表
+
+
+class _PrecomputedState(threading.local):
+    """当前线程中预先计算的等值线几何"""
+    def __init__(self):
+        self.entries = []
+
+
+_PRECOMPUTED = _PrecomputedState()
+
+
+def _find_precomputed(init):
+    return next((entry for entry in _PRECOMPUTED.entries if entry.init is init), None)
+
+
+@contextmanager
+def precompute_contours(cfg_lst):
+    """
+    多子区域绘图时, 在线程池中使用 contourpy 预先计算各子区域 contourf 的等值线几何(计算在 C++ 扩展中进行),
+    之后各子区域依次创建 ContourSet 时直接使用计算结果, 多子区域的总耗时取决于最慢的子区域而非各子区域之和
+    只对 init 中给出数据(args)与分级边界数组(levels)、extend 为 'neither'、使用默认坐标变换与线性色阶的
+    contourf 配置进行预先计算, 其余配置仍由 axes.contourf 计算
+    Parameters
+    ----------
+    cfg_lst: 各子区域的 SetAxes 配置列表
+    """
+    inits = [init for cfg in cfg_lst for init in _contourf_inits(cfg)]
+    workers = min(CONTOUR_WORKERS or os.cpu_count() or 1, len(inits))
+    if workers < 2:
+        # 只有一个子区域或单核时没有并行收益, 由 axes.contourf 依次计算
+        yield
+        return
+    # rcParams 在主线程中读取, 工作线程中只进行计算
+    rc = {k: mpl.rcParams[k] for k in ('contour.algorithm', 'contour.corner_mask')}
+    with ThreadPoolExecutor(workers) as pool:
+        entries = [entry for entry in pool.map(lambda init: _contour_geometry(init, rc), inits) if entry is not None]
+    _PRECOMPUTED.entries.extend(entries)
+    try:
+        yield
+    finally:
+        for entry in entries:
+            _PRECOMPUTED.entries.remove(entry)
+
+
+def _contourf_inits(cfg):
+    """取出子区域配置中可以预先计算的 contourf init 配置"""
+    branch = cfg.get(BRANCH_NAME) if isinstance(cfg, dict) else None
+    contourf = branch.get('contourf') if isinstance(branch, dict) else None
+    contourf = [contourf] if isinstance(contourf, dict) else contourf or []
+    inits = []
+    for c in contourf:
+        init = c.get(INIT_NAME) if isinstance(c, dict) else None
+        if not isinstance(init, dict) or c.get('mode', 'vector') != 'vector' or 'regrid' in c:
+            continue
+        args = init.get(ARGS_NAME)
+        levels = init.get('levels')
+        if not isinstance(args, (list, tuple)) or len(args) not in (1, 3) or \
+                any(isinstance(a, Placeholder) for a in args) or levels is None or np.ndim(levels) != 1 or \
+                init.get('extend', 'neither') != 'neither' or \
+                any(k in init for k in ('norm', 'locator', 'transform', 'origin', 'extent')):
+            continue
+        inits.append(init)
+    return inits
+
+
+def _contour_geometry(init, rc):
+    """
+    使用 contourpy 计算各分级区间的填色等值线几何(与 axes.contourf 使用相同的算法与参数)
+    Returns
+    -------
+    _Precomputed, 所有分级区间均为空时返回None(由 axes.contourf 处理)
+    """
+    import contourpy
+    # 共享数组句柄与 method_call 一样解析为同一数组视图, 绘制时的数据一致性检查才能匹配
+    args = [resolve_handles(v) for v in init[ARGS_NAME]]
+    z = np.ma.masked_invalid(np.ma.asarray(args[-1]), copy=False)
+    if len(args) == 3:
+        x, y = np.asarray(args[0]), np.asarray(args[1])
+        if x.ndim == 1:
+            x, y = np.meshgrid(x, y)
+    else:
+        x, y = np.meshgrid(np.arange(z.shape[1]), np.arange(z.shape[0]))
+    algorithm = init.get('algorithm') or rc['contour.algorithm']
+    corner_mask = init.get('corner_mask')
+    if corner_mask is None:
+        corner_mask = False if algorithm == 'mpl2005' else rc['contour.corner_mask']
+    generator = contourpy.contour_generator(
+        x, y, z, name=algorithm, corner_mask=corner_mask, fill_type=contourpy.FillType.OuterCode,
+        chunk_size=init.get('nchunk', 0))
+    levels = np.asarray(init['levels'], dtype=np.float64)
+    lowers, uppers = levels[:-1].copy(), levels[1:]
+    if z.min() == lowers[0]:
+        # 与 contourf 一致, 最小值等于最低分级边界时也填充在最低分级区间内
+        lowers[0] -= 1
+    pieces = [generator.filled(lo, hi) for lo, hi in zip(lowers, uppers)]
+    if not any(len(segs) for segs, _ in pieces):
+        return None
+    bounds = (float(np.min(x)), float(np.max(x)), float(np.min(y)), float(np.max(y)))
+    return _Precomputed(init, args[-1], bounds, [segs for segs, _ in pieces], [kinds for _, kinds in pieces])
+
+
+class PcolormeshDirector(ContourfDirector):
+    """
+    pcolormesh网格填色图绘制对象, 配置方式与 ContourfDirector 一致
+    适用于直接绘制有序(曲线)网格数据, 例如 TecplotZone.grid 取出的 (J, I) 数组, 无需先插值到规则网格
+    Parameters
+    ----------
+    axes: 子区域·matplotlib.Axes对象
+    kwargs:
+        init: 初始化创建`axes.pcolormesh 对象
+        cbar: 创建对应的色卡
+
+    Returns
+    -------
+
+    """
+    draw_name = 'pcolormesh'
 
 
 class ColorMapBuilder:
     """
     建造颜色映射
+        字典配置创建的颜色映射按 (name, colors, N, method, under, over 等) 缓存, 相同配置返回同一共享的颜色映射对象,
+        under/over 不同时基于同一基础颜色映射拷贝后再设置; 共享的颜色映射对象只读(见 SharedColormap),
+        需要修改时使用 copy() 或 with_extremes() 得到的副本;
+        配置 register=True 时将颜色映射注册到 matplotlib, 之后的配置可直接通过名称引用
     """
     def __init__(self, parameter):
         # 默认色卡映射为jet
@@ -58,26 +355,57 @@ class ColorMapBuilder:
             self.colormap = parameter
         # 当传入cmap设置信息为字典时, 如下
         elif isinstance(parameter, dict):
-            if INIT_NAME not in parameter and not isinstance(parameter[INIT_NAME], dict):
+            if INIT_NAME not in parameter or not isinstance(parameter[INIT_NAME], dict):
                 raise Exception(
                     f"{INIT_NAME!r} must exist and is of dict type"
                 )
             else:
-                init = parameter.pop(INIT_NAME)
-                self.colormap = self.create_colormap(**init)
-                self.native_api(self.colormap, **parameter)
+                options = {k: v for k, v in parameter.items() if k not in (INIT_NAME, 'register')}
+                self.colormap = self.get_colormap(parameter[INIT_NAME], options)
+                if parameter.get('register', False):
+                    register_colormap(self.colormap)
         else:
             raise TypeError()
 
     def __call__(self, *args, **kwargs):
         return self.colormap
 
+    def get_colormap(self, init: dict, options: dict):
+        """从缓存中获取颜色映射, 不存在时创建; 配置无法哈希时不缓存"""
+        key = _freeze((init, options))
+        if key is not None:
+            with _COLORMAP_LOCK:
+                if key in _COLORMAP_CACHE:
+                    _COLORMAP_CACHE.move_to_end(key)
+                    return _COLORMAP_CACHE[key]
+        if options:
+            # 基于(缓存的)基础颜色映射拷贝后再进行设置, 不修改共享的基础颜色映射
+            colormap = self.get_colormap(init, dict()).copy()
+            self.native_api(colormap, **options)
+        else:
+            with call_path(INIT_NAME):
+                colormap = self.create_colormap(**init)
+        if key is not None:
+            if type(colormap) is LinearSegmentedColormap:
+                # 缓存中的颜色映射在多次绘图间共享, 使用只读的副本
+                colormap = SharedColormap.from_colormap(colormap)
+            with _COLORMAP_LOCK:
+                # 其它线程已创建同一颜色映射时使用先缓存的对象
+                colormap = _COLORMAP_CACHE.setdefault(key, colormap)
+                _COLORMAP_CACHE.move_to_end(key)
+                while len(_COLORMAP_CACHE) > _COLORMAP_CACHE_SIZE:
+                    _COLORMAP_CACHE.popitem(last=False)
+        return colormap
+
     @staticmethod
     def create_colormap(**kwargs):
-        method = 'linear' if 'method' not in kwargs else kwargs['method']
+        method = kwargs.get('method', 'linear')
+        kwargs = {k: v for k, v in kwargs.items() if k != 'method'}
         if method == 'linear':
-            from matplotlib.colors import LinearSegmentedColormap
             return method_call(LinearSegmentedColormap.from_list, kwargs)
+        raise ValueError(
+            f"Unsupported colormap method {method!r}, Optional values include 'linear'"
+        )
 
     @xy_call()
     def native_api(self, colormap, **kwargs):
@@ -87,6 +415,56 @@ class ColorMapBuilder:
         )
 
 
+def register_colormap(colormap, name=None):
+    """
+    将颜色映射注册到 matplotlib 的颜色映射注册表, 之后可在配置中通过名称引用, 如 cmap='chaos'
+    同名的颜色映射已由本函数以同一对象注册过时不重复注册
+    """
+    name = colormap.name if name is None else name
+    if _REGISTERED.get(name) is not colormap:
+        mpl.colormaps.register(colormap, name=name, force=True)
+        _REGISTERED[name] = colormap
+    return name
+
+
+_REGISTERED = dict()    # 已注册的 {名称: 颜色映射}
+
+
+def clear_colormap_cache():
+    """清空颜色映射缓存"""
+    with _COLORMAP_LOCK:
+        _COLORMAP_CACHE.clear()
+
+
+class SharedColormap(LinearSegmentedColormap):
+    """
+    颜色映射缓存中共享的颜色映射(只读): set_bad/set_under/set_over/set_extremes 抛出异常,
+    copy()、with_extremes()、reversed()、resampled() 返回可修改的普通颜色映射
+    """
+    def _read_only(self, *args, **kwargs):
+        raise TypeError(
+            f"Colormap {self.name!r} is shared by the colormap cache and is read-only, "
+            f"use copy() or with_extremes() to modify a copy"
+        )
+
+    set_bad = set_under = set_over = set_extremes = _read_only
+
+    @classmethod
+    def from_colormap(cls, colormap: LinearSegmentedColormap):
+        """由普通颜色映射创建只读的副本"""
+        return _as_type(colormap.copy(), cls)
+
+    def __copy__(self):
+        return _as_type(super().__copy__(), LinearSegmentedColormap)
+
+
+def _as_type(colormap, cls):
+    """以 cls 类型创建与(刚拷贝出的)颜色映射属性相同的对象"""
+    result = cls.__new__(cls)
+    result.__dict__.update(colormap.__dict__)
+    return result
+
+
 class DrawColorBar(ModuleSetter):
     """设置色卡"""
 
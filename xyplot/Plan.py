@@ -0,0 +1,189 @@
+"""
+渲染计划: 将绘图配置预先编译为扁平的调用步骤列表
+    编译时使用 PlanTarget 代理对象代替真实的画布/子区域等对象, 完整走一遍 SetFigure、SetAxes、SetAxis、
+    SetPatches 等配置调度流程(包括配置键的合法性检查), 记录下每一次实际的方法调用;
+    执行时只需按顺序回放这些调用, 不再重复进行配置解析与调度
+"""
+from operator import attrgetter, itemgetter
+
+from .cfg_names import SET_RC_NAME, AXES_NAME, SUBPLOT_NAME, SUBPLOT2GRID_NAME, ADD_AXES_NAME, INCREMENTAL_NAME
+
+__author__ = 'Rookie'
+__all__ = [
+    'Placeholder',  # 渲染计划中的数据占位符
+    'PlanTarget',   # 编译时代替真实对象的代理对象
+    'RenderPlan',   # 渲染计划
+]
+
+
+class Placeholder:
+    """
+    数据占位符, 在配置中代替实际数据, 执行渲染计划时通过同名关键字参数传入
+    Example
+        >>> plan = XyPlot.compile(axes=dict(plot=dict(args=(Placeholder('x'), Placeholder('y')))))
+        >>> plan(x=x, y=y).save('test.png')
+    """
+    def __init__(self, name: str):
+        self.name = name
+
+    def __repr__(self):
+        return f"Placeholder({self.name!r})"
+
+
+class PlanTarget:
+    """
+    编译时代替真实对象的代理对象
+    属性访问和索引操作返回新的代理对象, 调用操作会在渲染计划中记录一个步骤并返回代表其返回值的代理对象
+    Parameters
+    ----------
+    plan: 所属的渲染计划
+    slot: 基础对象在执行时对象表中的序号
+    path: 对象路径, 例如 axes[0].spines['top']
+    getters: 从基础对象取得该对象的属性/索引操作序列
+    """
+    def __init__(self, plan, slot: int, path: str, getters: tuple = ()):
+        self._plan = plan
+        self._slot = slot
+        self._path = path
+        self._getters = getters
+
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        return PlanTarget(self._plan, self._slot, f"{self._path}.{name}", self._getters + (attrgetter(name), ))
+
+    def __getitem__(self, key):
+        return PlanTarget(self._plan, self._slot, f"{self._path}[{key!r}]", self._getters + (itemgetter(key), ))
+
+    def __call__(self, *args, **kwargs):
+        return self._plan.record(self, self._path, args, kwargs)
+
+    def __repr__(self):
+        return f"<PlanTarget {self._path}>"
+
+    def defer(self, func, kwargs, args=()):
+        """记录一个以该代理对象为首个参数的延迟调用: func(module, *args, **kwargs), 在执行时才真正调用"""
+        name = getattr(func, '__qualname__', repr(func))
+        return self._plan.record(func, f"{name}({self._path})", (self, *args), kwargs)
+
+
+class RenderPlan:
+    """
+    渲染计划, 通过 XyPlotDirector.compile 创建, 可针对不同的数据多次执行
+    Parameters
+    ----------
+    kwargs: 与 XyPlotDirector 相同的绘图配置, 配置中的数据可使用 Placeholder 占位
+    """
+    def __init__(self, **kwargs):
+        from .xyplotBuilder import XyPlotDirector
+        if not any(key in kwargs for key in (AXES_NAME, SUBPLOT_NAME, SUBPLOT2GRID_NAME, ADD_AXES_NAME)):
+            raise TypeError(
+                f"Figure is not created, You need to create at least one axes object to create a canvas"
+            )
+        self.steps = []     # (调用对象, args, kwargs, 返回值序号, 是否需要解析代理对象/占位符, 步骤描述)
+        self.placeholders = set()
+        self.rc = kwargs.get(SET_RC_NAME)
+        self.n_slots = 1    # 序号 0 为画布对象
+        director = XyPlotDirector()
+        director.figure = PlanTarget(self, 0, 'figure')
+        director.execute(**{k: v for k, v in kwargs.items() if k not in (SET_RC_NAME, INCREMENTAL_NAME)})
+
+    def record(self, func, path, args, kwargs):
+        """记录一个调用步骤, 返回代表其返回值的代理对象"""
+        slot = self.n_slots
+        self.n_slots += 1
+        if isinstance(func, PlanTarget):
+            func = (func._slot, func._getters)
+        self.steps.append((func, args, kwargs, slot, self._scan((args, kwargs)), path))
+        return PlanTarget(self, slot, f"{path}()")
+
+    def _scan(self, value):
+        """检查参数中是否包含代理对象或占位符, 并收集占位符名称"""
+        if isinstance(value, Placeholder):
+            self.placeholders.add(value.name)
+            return True
+        if isinstance(value, PlanTarget):
+            return True
+        if isinstance(value, dict):
+            value = value.values()
+        elif not isinstance(value, (list, tuple)):
+            return False
+        found = False
+        for v in value:
+            found = self._scan(v) or found
+        return found
+
+    def execute(self, figure=None, **data):
+        """
+        执行渲染计划
+        Parameters
+        ----------
+        figure: 画布对象, 如果传入为None, 则自动创建
+        data: 占位符对应的数据
+
+        Returns
+        -------
+        画布对象
+        """
+        missing = self.placeholders.difference(data)
+        if missing:
+            raise KeyError(
+                f"Missing data for placeholders {sorted(missing)!r}"
+            )
+        from .xyplotBuilder import SetTempRc, new_figure
+        from .utils import _STATE, call_path
+        profilers = _STATE.profilers    # 当前线程中生效的性能分析器
+        tmp_rc = SetTempRc(**self.rc) if self.rc else None
+        try:
+            slots = [None] * self.n_slots
+            slots[0] = new_figure() if figure is None else figure
+            for func, args, kwargs, slot, resolve, path in self.steps:
+                if isinstance(func, tuple):
+                    base, getters = func
+                    func = slots[base]
+                    for getter in getters:
+                        func = getter(func)
+                if resolve:
+                    args = _resolve(args, slots, data)
+                    kwargs = _resolve(kwargs, slots, data)
+                if profilers:
+                    # 性能分析时以步骤描述作为配置路径计时
+                    with call_path(path):
+                        slots[slot] = func(*args, **kwargs)
+                else:
+                    slots[slot] = func(*args, **kwargs)
+        finally:
+            if tmp_rc is not None:
+                tmp_rc.revert()
+        return slots[0]
+
+    def __call__(self, figure=None, **data):
+        """执行渲染计划, 返回 XyPlotDirector 对象"""
+        from .xyplotBuilder import XyPlotDirector
+        director = XyPlotDirector()
+        director.figure = self.execute(figure, **data)
+        return director
+
+    def __len__(self):
+        return len(self.steps)
+
+    def __repr__(self):
+        lines = [f"<RenderPlan steps={len(self.steps)} placeholders={sorted(self.placeholders)!r}>"]
+        lines.extend(f"  {step[5]}" for step in self.steps)
+        return '\n'.join(lines)
+
+
+def _resolve(value, slots, data):
+    """将参数中的代理对象替换为执行时的真实对象, 占位符替换为对应数据"""
+    if isinstance(value, PlanTarget):
+        obj = slots[value._slot]
+        for getter in value._getters:
+            obj = getter(obj)
+        return obj
+    if isinstance(value, Placeholder):
+        return data[value.name]
+    if isinstance(value, dict):
+        return {k: _resolve(v, slots, data) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return type(value)(_resolve(v, slots, data) for v in value)
+    return value
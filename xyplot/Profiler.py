@@ -0,0 +1,131 @@
+"""
+按配置路径统计绘图耗时
+    在 with 语句块内, 配置路径的每一层(如 axes[0].Branch.contourf.init、set_fig.title、savefig)进入与退出时计时,
+    统计各配置路径的调用次数、总耗时、自身耗时(不含下一层)以及(可选)内存峰值, 可输出汇总表格与 Chrome trace 文件;
+    不使用时配置路径不被维护, 没有额外开销
+"""
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+from .utils import CallRecorder, _STATE
+
+__author__ = 'Rookie'
+__all__ = [
+    'Profiler',     # 按配置路径统计耗时的性能分析器
+]
+
+
+class Profiler(CallRecorder):
+    """
+    性能分析器
+    Parameters
+    ----------
+    memory: 是否统计内存峰值(使用 tracemalloc, 会明显降低运行速度), 统计值为各配置路径执行期间已分配内存的峰值
+        与进入时已分配内存的差值(包括执行期间分配后又释放的内存), 多次调用时取最大值
+    -------
+    Example
+        >>> with Profiler() as profiler:
+        >>>     XyPlot(**cfg).save('test.png')
+        >>> print(profiler.summary())
+        >>> profiler.to_chrome_trace('trace.json')   # 在 chrome://tracing 或 https://ui.perfetto.dev 中查看
+    """
+    def __init__(self, memory: bool = False):
+        super().__init__()
+        self.memory = memory
+        self.stats = dict()     # {配置路径: [调用次数, 总耗时, 自身耗时, 内存峰值]}
+        self.events = []        # (配置路径, 开始时间, 耗时, 内存峰值)
+        self._stack = []        # [开始时间, 开始时已分配内存, 下一层的总耗时, 已知的已分配内存峰值]
+        self._origin = None
+        self._thread = None     # 只统计进入 with 语句块的线程中的绘图
+        self._tracing = False
+
+    def __enter__(self):
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._tracing = True
+        self._origin = time.perf_counter()
+        self._thread = threading.get_ident()
+        _STATE.profilers.append(self)
+        return super().__enter__()
+
+    def __exit__(self, *exc):
+        _STATE.profilers.remove(self)
+        if self._tracing:
+            tracemalloc.stop()
+            self._tracing = False
+        return super().__exit__(*exc)
+
+    def record(self, path, obj, args, kwargs, ret_obj):
+        """不保存调用对象与参数, 只统计耗时"""
+
+    def push(self):
+        """进入配置路径的下一层"""
+        memory = 0
+        if self.memory:
+            memory, peak = tracemalloc.get_traced_memory()
+            if self._stack:
+                # 重置峰值前先将当前层已达到的峰值记录下来
+                self._stack[-1][3] = max(self._stack[-1][3], peak)
+            tracemalloc.reset_peak()
+        self._stack.append([time.perf_counter(), memory, 0.0, memory])
+
+    def pop(self, path):
+        """退出配置路径的当前层"""
+        start, memory, children, peak = self._stack.pop()
+        duration = time.perf_counter() - start
+        if self.memory:
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+            if self._stack:
+                self._stack[-1][3] = max(self._stack[-1][3], peak)
+            memory = peak - memory
+        else:
+            memory = 0
+        if self._stack:
+            self._stack[-1][2] += duration
+        stat = self.stats.setdefault(path, [0, 0.0, 0.0, 0])
+        stat[0] += 1
+        stat[1] += duration
+        stat[2] += duration - children
+        stat[3] = max(stat[3], memory)
+        self.events.append((path, start - self._origin, duration, memory))
+
+    def summary(self, sort: str = 'total', limit=None) -> str:
+        """
+        汇总表格
+        Parameters
+        ----------
+        sort: 排序方式, 可选 'total'(总耗时)、'self'(自身耗时)、'calls'(调用次数)、'memory'(内存峰值)、'path'(配置路径)
+        limit: 最多输出的行数, 为None时输出全部
+        """
+        column = dict(calls=0, total=1, self=2, memory=3)
+        if sort == 'path':
+            rows = sorted(self.stats.items())
+        elif sort in column:
+            rows = sorted(self.stats.items(), key=lambda item: item[1][column[sort]], reverse=True)
+        else:
+            raise ValueError(
+                f"Unsupported sort {sort!r}, Optional values include {list(column) + ['path']!r}"
+            )
+        width = max([len(path) for path, _ in rows] + [4])
+        lines = [f"{'path':<{width}}{'calls':>8}{'total ms':>12}{'self ms':>12}" +
+                 ('' if not self.memory else f"{'peak KB':>12}")]
+        for path, (calls, total, self_time, memory) in rows[:limit]:
+            lines.append(f"{path:<{width}}{calls:>8}{total * 1e3:>12.2f}{self_time * 1e3:>12.2f}" +
+                         ('' if not self.memory else f"{memory / 1024:>12.1f}"))
+        return '\n'.join(lines)
+
+    def to_chrome_trace(self, file):
+        """
+        导出 Chrome trace(JSON) 文件, 可在 chrome://tracing 或 https://ui.perfetto.dev 中按时间线查看各配置路径的嵌套耗时
+        """
+        pid, tid = os.getpid(), self._thread
+        events = [
+            dict(name=path, cat='xyplot', ph='X', ts=start * 1e6, dur=duration * 1e6, pid=pid, tid=tid,
+                 args=dict(peak_memory=memory) if self.memory else dict())
+            for path, start, duration, memory in self.events
+        ]
+        with open(file, 'w', encoding='utf-8') as f:
+            json.dump(dict(traceEvents=events, displayTimeUnit='ms'), f)
@@ -0,0 +1,106 @@
+"""
+矢量格式(PDF/SVG/EPS)输出时将数据量大的图层嵌入为图像
+    等值线填色图的多边形、大量流线线段与散点在矢量格式中逐个写为路径, 文件体积大且打开缓慢;
+    对这些图层设置 rasterized 后, 保存矢量格式时按保存分辨率(dpi)栅格化为图像嵌入, 文字、坐标轴等仍保持矢量
+"""
+from matplotlib.artist import Artist, allow_rasterization
+
+from .Plan import PlanTarget
+
+__author__ = 'Rookie'
+__all__ = [
+    'rasterize_above',  # 将子区域中点数超过阈值的绘图对象设置为栅格化
+    'count_points',     # 统计绘图对象的顶点/数据点个数
+    'PatchLayer',       # 将多个图形作为一个可栅格化的图层绘制
+]
+
+
+def rasterize_above(axes, threshold: int):
+    """
+    将子区域中点数超过阈值的绘图对象(折线、散点、等值线、流线、网格、图像等)设置为栅格化, 对 PNG 等位图格式没有影响;
+    图形(patches, 如流线的大量箭头)单个点数很少, 作为一个图层统计总点数, 超过阈值时全部栅格化;
+    FancyArrowPatch 等不支持栅格化的图形合并为一个 PatchLayer 图层后栅格化
+    Parameters
+    ----------
+    axes: 子区域对象
+    threshold: 点数阈值
+
+    Returns
+    -------
+    被设置为栅格化的绘图对象列表
+    """
+    if isinstance(axes, PlanTarget):
+        # 编译渲染计划时绘图对象尚未创建, 延迟到执行时再统计
+        return axes.defer(rasterize_above, dict(), (threshold, ))
+    rasterized = []
+    for artist in (*axes.lines, *axes.collections, *axes.images):
+        if not artist.get_rasterized() and count_points(artist) > threshold:
+            artist.set_rasterized(True)
+            rasterized.append(artist)
+    patches = [patch for patch in axes.patches if not patch.get_rasterized()]
+    total = 0
+    for patch in patches:
+        total += count_points(patch)
+        if total > threshold:
+            rasterized.extend(_rasterize_patches(axes, patches))
+            break
+    return rasterized
+
+
+class PatchLayer(Artist):
+    """
+    将多个图形作为一个图层绘制; 用于 FancyArrowPatch 等本身不支持栅格化的图形, 整个图层作为一张图像嵌入矢量格式
+    """
+    def __init__(self, patches):
+        super().__init__()
+        self.patches = list(patches)
+        self.set_zorder(max(patch.get_zorder() for patch in self.patches))
+
+    @allow_rasterization
+    def draw(self, renderer):
+        if not self.get_visible():
+            return
+        for patch in self.patches:
+            patch.draw(renderer)
+        self.stale = False
+
+
+def _rasterize_patches(axes, patches) -> list:
+    """设置图形栅格化; 不支持栅格化的图形从子区域中移出, 合并为一个栅格化的 PatchLayer"""
+    direct = [patch for patch in patches if getattr(patch.draw, '_supports_rasterization', False)]
+    for patch in direct:
+        patch.set_rasterized(True)
+    grouped = [patch for patch in patches if not getattr(patch.draw, '_supports_rasterization', False)]
+    if not grouped:
+        return direct
+    layer = PatchLayer(grouped)
+    for patch in grouped:
+        patch.remove()
+    axes.add_artist(layer)
+    layer.set_rasterized(True)
+    return [*direct, layer]
+
+
+def count_points(artist) -> int:
+    """
+    统计绘图对象的点数: 折线为数据点个数; 散点等使用同一标记的集合为标记个数; 其余集合为各路径的顶点数之和;
+    图像为像素个数; 图形为路径的顶点数
+    """
+    from matplotlib.collections import Collection
+    from matplotlib.image import AxesImage
+    from matplotlib.lines import Line2D
+    from matplotlib.patches import Patch
+    if isinstance(artist, Line2D):
+        return len(artist.get_xydata())
+    if isinstance(artist, Collection):
+        paths = artist.get_paths()
+        offsets = artist.get_offsets()
+        if len(paths) <= 1 and len(offsets) > 1:
+            return len(offsets)
+        return sum(len(path.vertices) for path in paths)
+    if isinstance(artist, AxesImage):
+        array = artist.get_array()
+        return 0 if array is None else int(array.shape[0] * array.shape[1])
+    if isinstance(artist, Patch):
+        return len(artist.get_path().vertices)
+    return 0
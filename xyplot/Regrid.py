@@ -0,0 +1,241 @@
+"""
+散点数据插值到网格(线性插值)
+    同一组散点坐标与目标网格只进行一次 Delaunay 三角剖分与重心坐标计算, 得到稀疏插值权重矩阵,
+    之后每个变量的插值只需一次稀疏矩阵与向量的乘法
+"""
+import hashlib
+import os
+from collections import OrderedDict
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.spatial import Delaunay
+
+__author__ = 'Rookie'
+__all__ = [
+    'Regridder',        # 散点到网格的线性插值器(缓存插值权重)
+    'get_regridder',    # 获取(带缓存的)插值器
+    'regrid',           # 与 scipy.interpolate.griddata 用法一致的线性插值
+    'set_cache_size',   # 设置内存缓存的插值器个数
+    'clear_cache',      # 清空内存缓存
+    'target_grid',      # 按子区域像素尺寸与显示范围生成目标网格
+    'regrid_to_axes',   # 将散点数据插值到子区域可见范围内、与显示分辨率一致的网格
+]
+
+_CACHE = OrderedDict()  # 内存中的插值器缓存(LRU)
+_CACHE_SIZE = 8
+
+
+class Regridder:
+    """
+    散点到网格的线性插值器, 结果与 griddata(method='linear') 一致
+    Parameters
+    ----------
+    points: 散点坐标, shape 为 (n, 2)
+    xi: 目标点坐标, shape 为 (..., 2), 插值结果的shape为 xi.shape[:-1]
+    fill_value: 位于散点凸包之外的目标点的填充值
+    """
+    def __init__(self, points, xi, fill_value=np.nan):
+        points = np.asarray(points, dtype=np.float64)
+        xi = np.asarray(xi, dtype=np.float64)
+        self.shape = xi.shape[:-1]
+        self.n_points = points.shape[0]
+        self.fill_value = fill_value
+        self.weights, self.outside = self.create_weights(points, xi.reshape(-1, 2))
+
+    @staticmethod
+    def create_weights(points, targets):
+        """
+        构建稀疏插值权重矩阵
+        Returns
+        -------
+        (权重矩阵 csr_matrix, shape 为 (目标点数, 散点数); 凸包外目标点的布尔掩码)
+        """
+        tri = Delaunay(points)
+        simplex = tri.find_simplex(targets)
+        inside = simplex >= 0
+        simplex = simplex[inside]
+        # 重心坐标: 前两个分量由仿射变换得到, 第三个分量为 1 减去前两者之和
+        transform = tri.transform[simplex]
+        bary = np.einsum('ijk,ik->ij', transform[:, :2], targets[inside] - transform[:, 2])
+        weights = np.column_stack((bary, 1 - bary.sum(axis=1)))
+        # 直接构建CSR结构: 凸包内的目标点各对应3个非零元素
+        indptr = np.concatenate(([0], np.cumsum(inside * 3)))
+        indices = tri.simplices[simplex].ravel()
+        matrix = csr_matrix((weights.ravel(), indices, indptr), shape=(targets.shape[0], points.shape[0]))
+        return matrix, ~inside
+
+    def __call__(self, *values, fill_value=None):
+        """
+        对一个或多个变量进行插值, 多个变量合并为一次稀疏矩阵乘法
+        fill_value 为None时使用插值器的默认填充值
+        Returns
+        -------
+        单个变量时返回插值后的数组, 多个变量时返回数组列表
+        """
+        stacked = np.column_stack([np.asarray(v, dtype=np.float64).ravel() for v in values])
+        if stacked.shape[0] != self.n_points:
+            raise ValueError(
+                f"Values have {stacked.shape[0]} points, but the regridder was built for {self.n_points} points"
+            )
+        result = self.weights @ stacked
+        result[self.outside] = self.fill_value if fill_value is None else fill_value
+        grids = [result[:, i].reshape(self.shape) for i in range(result.shape[1])]
+        return grids[0] if len(grids) == 1 else grids
+
+    def save(self, file):
+        """将插值权重保存到 .npz 文件"""
+        np.savez(file, data=self.weights.data, indices=self.weights.indices, indptr=self.weights.indptr,
+                 n_points=self.n_points, shape=np.asarray(self.shape), outside=self.outside)
+
+    @classmethod
+    def load(cls, file, fill_value=np.nan):
+        """从 .npz 文件加载插值权重"""
+        with np.load(file) as f:
+            obj = cls.__new__(cls)
+            obj.shape = tuple(int(n) for n in f['shape'])
+            obj.n_points = int(f['n_points'])
+            obj.fill_value = fill_value
+            obj.outside = f['outside']
+            obj.weights = csr_matrix((f['data'], f['indices'], f['indptr']),
+                                     shape=(obj.outside.size, obj.n_points))
+        return obj
+
+
+def _fingerprint(points, xi):
+    """散点坐标与目标网格的哈希值"""
+    h = hashlib.blake2b(digest_size=16)
+    for arr in (points, xi):
+        arr = np.ascontiguousarray(arr, dtype=np.float64)
+        h.update(str(arr.shape).encode())
+        h.update(arr.data)
+    return h.hexdigest()
+
+
+def get_regridder(points, xi, cache_dir=None):
+    """
+    获取插值器, 相同散点坐标与目标网格的插值器会被缓存复用
+    Parameters
+    ----------
+    points: 散点坐标, 可为 (x, y) 元组或 shape 为 (n, 2) 的数组
+    xi: 目标网格坐标, 可为 (X, Y) 元组或 shape 为 (..., 2) 的数组
+    cache_dir: 插值权重的磁盘缓存目录, 为None时仅使用内存缓存
+
+    Returns
+    -------
+    Regridder
+    """
+    points = _as_coords(points)
+    xi = _as_coords(xi)
+    key = _fingerprint(points, xi)
+    regridder = _CACHE.get(key)
+    if regridder is not None:
+        _CACHE.move_to_end(key)
+    else:
+        path = None if cache_dir is None else os.path.join(cache_dir, f"regrid-{key}.npz")
+        if path is not None and os.path.exists(path):
+            regridder = Regridder.load(path)
+        else:
+            regridder = Regridder(points, xi)
+            if path is not None:
+                os.makedirs(cache_dir, exist_ok=True)
+                tmp = f"{path}.{os.getpid()}.tmp.npz"
+                regridder.save(tmp)
+                os.replace(tmp, path)
+        _CACHE[key] = regridder
+        while len(_CACHE) > _CACHE_SIZE:
+            _CACHE.popitem(last=False)
+    return regridder
+
+
+def regrid(points, values, xi, fill_value=np.nan, cache_dir=None):
+    """
+    线性插值, 用法与 scipy.interpolate.griddata(points, values, xi, method='linear') 一致
+    values 为数组的列表/元组时, 对多个变量共用同一插值权重并返回数组列表
+    """
+    regridder = get_regridder(points, xi, cache_dir)
+    if isinstance(values, (list, tuple)):
+        result = regridder(*values, fill_value=fill_value)
+        return result if len(values) > 1 else [result]
+    return regridder(values, fill_value=fill_value)
+
+
+def set_cache_size(size: int):
+    """设置内存中缓存的插值器个数"""
+    global _CACHE_SIZE
+    _CACHE_SIZE = size
+    while len(_CACHE) > _CACHE_SIZE:
+        _CACHE.popitem(last=False)
+
+
+def clear_cache():
+    """清空内存中的插值器缓存"""
+    _CACHE.clear()
+
+
+def target_grid(axes, extent, oversample=1.0, max_shape=None):
+    """
+    根据子区域的像素尺寸、分辨率以及设置的显示范围生成插值目标网格, 网格只覆盖可见区域, 网格点数与可见区域的像素数一致
+    Parameters
+    ----------
+    axes: 子区域对象
+    extent: 数据范围 (xmin, xmax, ymin, ymax); 子区域已设置显示范围(xlim/ylim, 不再自动缩放)时取两者的交集
+    oversample: 每个像素对应的网格点数
+    max_shape: 网格的最大 (行数, 列数), 为None时不限制
+
+    Returns
+    -------
+    (X, Y) 网格坐标, shape 为 (行数, 列数)
+    """
+    from .Decimate import axes_pixels
+    x0, x1, y0, y1 = extent
+    width, height = axes_pixels(axes)
+    frac_x = frac_y = 1.0
+    if not axes.get_autoscalex_on():
+        lo, hi = sorted(axes.get_xlim())
+        x0, x1 = max(x0, lo), min(x1, hi)
+        frac_x = (x1 - x0) / (hi - lo)
+    if not axes.get_autoscaley_on():
+        lo, hi = sorted(axes.get_ylim())
+        y0, y1 = max(y0, lo), min(y1, hi)
+        frac_y = (y1 - y0) / (hi - lo)
+    if x1 <= x0 or y1 <= y0:
+        raise ValueError(
+            f"Data extent {tuple(extent)!r} does not intersect the visible region of the axes"
+        )
+    rows = max(2, int(np.ceil(height * frac_y * oversample)))
+    cols = max(2, int(np.ceil(width * frac_x * oversample)))
+    if max_shape is not None:
+        rows, cols = min(rows, max_shape[0]), min(cols, max_shape[1])
+    return np.meshgrid(np.linspace(x0, x1, cols), np.linspace(y0, y1, rows))
+
+
+def regrid_to_axes(axes, points, values, extent=None, oversample=1.0, max_shape=None, fill_value=np.nan,
+                   cache_dir=None):
+    """
+    将散点数据插值到子区域可见范围内、与显示分辨率一致的网格(见 target_grid), 用于 contourf 等需要规则网格的绘图
+    Parameters
+    ----------
+    axes: 子区域对象
+    points: 散点坐标, 可为 (x, y) 元组或 shape 为 (n, 2) 的数组
+    values: 散点数值, 多个变量时为数组列表
+    extent: 网格范围 (xmin, xmax, ymin, ymax), 为None时使用散点坐标的范围
+    oversample, max_shape: 见 target_grid
+    fill_value, cache_dir: 见 regrid
+
+    Returns
+    -------
+    (X, Y, 插值结果), 多个变量时插值结果为数组列表
+    """
+    points = _as_coords(points)
+    if extent is None:
+        extent = (points[:, 0].min(), points[:, 0].max(), points[:, 1].min(), points[:, 1].max())
+    X, Y = target_grid(axes, extent, oversample, max_shape)
+    return X, Y, regrid(points, values, (X, Y), fill_value, cache_dir)
+
+
+def _as_coords(coords):
+    """将 (x, y) 元组转换为 shape 为 (..., 2) 的坐标数组"""
+    if isinstance(coords, (list, tuple)):
+        return np.stack([np.asarray(c, dtype=np.float64) for c in coords], axis=-1)
+    return np.asarray(coords, dtype=np.float64)
@@ -0,0 +1,298 @@
+"""
+按内容寻址的绘图结果缓存
+    以规范化后的绘图配置(数组按内容哈希)、输入数据的标识(数据引用对应文件的路径、大小与修改时间)以及输出参数
+    计算指纹, 指纹相同的请求直接返回之前绘制的结果, 不再重复读取、插值、绘制与保存;
+    结果按指纹保存在磁盘目录中, 总大小超过上限时按最近使用时间淘汰
+"""
+import hashlib
+import os
+import threading
+import types
+from functools import lru_cache
+
+import numpy as np
+
+from .Plan import Placeholder
+from .Shared import SharedArray
+
+__author__ = 'Rookie'
+__all__ = [
+    'RenderCache',      # 绘图结果的磁盘缓存
+    'fingerprint',      # 计算绘图配置与输出参数的指纹
+]
+
+CACHE_VERSION = 1   # 缓存格式版本, 指纹规则变化时递增以使旧缓存失效
+DATA_REFS = ('$tecplot', '$npy')    # 以文件标识代替内容的数据引用(见 serve.resolve_refs)
+
+
+def fingerprint(config, **options) -> str:
+    """
+    计算绘图配置与输出参数的指纹
+    Parameters
+    ----------
+    config: 绘图配置, 其中的数组按内容哈希, 数据引用按文件的路径、大小与修改时间计算
+    options: 输出参数, 如 format、dpi, 以及输入文件等其它影响结果的标识
+
+    Returns
+    -------
+    32位十六进制字符串, 配置中含有无法稳定区分的对象(如 lambda、默认 repr 的对象)时返回None
+    """
+    import matplotlib as mpl
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"xyplot-render-{CACHE_VERSION}-{source_hash()}-mpl-{mpl.__version__}".encode())
+    try:
+        _update(h, config)
+        _update(h, options)
+    except _Unhashable:
+        return None
+    return h.hexdigest()
+
+
+@lru_cache(maxsize=None)
+def source_hash() -> str:
+    """xyplot 源代码的哈希, 参与指纹计算, 代码变化后旧的绘图结果不再命中"""
+    h = hashlib.blake2b(digest_size=8)
+    package = os.path.dirname(os.path.abspath(__file__))
+    for root, dirs, files in os.walk(package):
+        dirs[:] = sorted(d for d in dirs if d != '__pycache__')
+        for name in sorted(files):
+            if name.endswith('.py'):
+                path = os.path.join(root, name)
+                h.update(os.path.relpath(path, package).encode())
+                with open(path, 'rb') as f:
+                    h.update(f.read())
+    return h.hexdigest()
+
+
+def file_identity(file):
+    """文件的标识: 绝对路径、大小与修改时间"""
+    stat = os.stat(file)
+    return os.path.abspath(file), stat.st_size, stat.st_mtime_ns
+
+
+class _Unhashable(Exception):
+    """配置中含有无法稳定区分的对象"""
+
+
+def _update(h, value):
+    """将规范化后的值写入哈希对象"""
+    if isinstance(value, dict):
+        if '$shm' in value:
+            # 共享内存的内容可能被创建者改写, 按内容区分(见 serve.resolve_refs)
+            with SharedArray.from_ref(value) as handle:
+                _update(h, handle.array)
+            return
+        ref = next((k for k in DATA_REFS if k in value), None)
+        if ref is not None:
+            h.update(repr((ref, file_identity(value[ref]))).encode())
+            value = {k: v for k, v in value.items() if k != ref}
+        h.update(b'{%d' % len(value))
+        for k in sorted(value, key=repr):
+            h.update(repr(k).encode())
+            _update(h, value[k])
+        h.update(b'}')
+    elif isinstance(value, (list, tuple)):
+        h.update(b'[%d' % len(value) if isinstance(value, list) else b'(%d' % len(value))
+        for v in value:
+            _update(h, v)
+        h.update(b']')
+    elif isinstance(value, (set, frozenset)):
+        _update(h, sorted(value, key=repr))
+    elif isinstance(value, np.ndarray):
+        h.update(f"a{value.dtype.str}{value.shape}".encode())
+        if value.dtype.hasobject:
+            for v in value.ravel():
+                _update(h, v)
+        else:
+            h.update(np.ascontiguousarray(value).data)
+        if isinstance(value, np.ma.MaskedArray):
+            h.update(np.ascontiguousarray(np.ma.getmaskarray(value)).data)
+    elif isinstance(value, SharedArray):
+        # 共享数组句柄的名称每次创建时不同, 按内容区分
+        _update(h, value.array)
+    elif isinstance(value, Placeholder):
+        h.update(f"P{value.name}".encode())
+    elif _named_callable(value):
+        h.update(f"f{value.__module__}.{value.__qualname__}".encode())
+    else:
+        # 字符串、数值等按 repr 区分类型与取值; 默认 repr 中的内存地址可能被其它对象复用, 不能作为标识
+        text = repr(value)
+        if ' at 0x' in text:
+            raise _Unhashable(text)
+        h.update(text.encode())
+
+
+def _named_callable(value):
+    """是否为按名称区分的类或模块级函数(lambda、闭包与绑定方法除外)"""
+    if not isinstance(value, (type, types.FunctionType, types.BuiltinFunctionType)):
+        return False
+    owner = getattr(value, '__self__', None)
+    return '<' not in value.__qualname__ and isinstance(owner, (type(None), types.ModuleType))
+
+
+class RenderCache:
+    """
+    绘图结果的磁盘缓存(LRU)
+    Parameters
+    ----------
+    directory: 缓存目录, 可由多个进程共享
+    max_bytes: 缓存目录的总大小上限(字节), 超过时按最近使用时间(文件修改时间)淘汰, 为None时不限制;
+        淘汰前重新扫描目录, 多个进程共享同一目录时上限作用于目录总大小
+
+    Example
+        >>> cache = RenderCache('render_cache', max_bytes=2 ** 30)
+        >>> png = cache.render(dict(axes=dict(plot=dict(args=(x, y)))), format='png', dpi=150)
+        >>> cache.stats
+    """
+    def __init__(self, directory, max_bytes=512 * 2 ** 20):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.stats = dict(hits=0, misses=0, evictions=0, uncacheable=0, write_errors=0)
+        self._lock = threading.Lock()
+        self._index = None  # {指纹: [文件大小, 最近使用时间]}, 首次使用时扫描目录建立
+
+    def path(self, key):
+        return os.path.join(self.directory, key[:2], key)
+
+    def _load_index(self, rescan=False):
+        if self._index is None or rescan:
+            self._index = dict()
+            for root, _, files in os.walk(self.directory):
+                for name in files:
+                    if len(name) == 32:
+                        try:
+                            stat = os.stat(os.path.join(root, name))
+                        except OSError:     # 已被其它进程淘汰
+                            continue
+                        self._index[name] = [stat.st_size, stat.st_mtime]
+        return self._index
+
+    def get(self, key):
+        """
+        读取缓存结果并更新其最近使用时间, 不存在时返回None
+        """
+        path = self.path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path)
+        except OSError:
+            data = None
+        with self._lock:
+            index = self._load_index()
+            if data is None:
+                index.pop(key, None)
+                self.stats['misses'] += 1
+            else:
+                index[key] = [len(data), os.path.getmtime(path)]
+                self.stats['hits'] += 1
+        return data
+
+    def put(self, key, data: bytes) -> bool:
+        """
+        写入缓存结果(先写入临时文件再原子替换), 并淘汰超出大小上限的最久未使用结果
+        写入失败(如磁盘已满、目录只读)时只计数, 不影响已完成的绘图
+        Returns
+        -------
+        是否写入成功
+        """
+        path = self.path(key)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, path)
+            mtime = os.path.getmtime(path)
+        except OSError:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            with self._lock:
+                self.stats['write_errors'] += 1
+            return False
+        with self._lock:
+            index = self._load_index()
+            index[key] = [len(data), mtime]
+            self._evict(keep=key)
+        return True
+
+    def _evict(self, keep=None):
+        if self.max_bytes is None:
+            return
+        # 重新扫描目录, 包括共享该目录的其它进程写入的结果
+        self._load_index(rescan=True)
+        total = sum(size for size, _ in self._index.values())
+        for key in sorted(self._index, key=lambda k: self._index[k][1]):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            try:
+                os.remove(self.path(key))
+            except OSError:
+                pass
+            total -= self._index.pop(key)[0]
+            self.stats['evictions'] += 1
+
+    def render(self, config: dict, format: str = 'png', dpi=None, key_extra=None, **kwargs) -> bytes:
+        """
+        返回绘图结果, 缓存未命中时使用 XyPlotDirector 绘制并写入缓存
+        Parameters
+        ----------
+        config: 与 XyPlotDirector 相同的绘图配置
+        format, dpi, kwargs: 与 XyPlotDirector.to_bytes 一致
+        key_extra: 配置之外影响结果的标识(例如输入文件), 参与指纹计算
+        """
+        return self._render(config, format, dpi, key_extra, kwargs)[0]
+
+    def save(self, config: dict, file, format=None, dpi=None, key_extra=None, **kwargs) -> bool:
+        """
+        将绘图结果写入文件, 格式默认由文件扩展名确定, 其余参数与 render 一致
+        Returns
+        -------
+        是否命中缓存
+        """
+        format = format or os.path.splitext(file)[1][1:].lower() or 'png'
+        data, hit = self._render(config, format, dpi, key_extra, kwargs)
+        with open(file, 'wb') as f:
+            f.write(data)
+        return hit
+
+    def _render(self, config, format, dpi, key_extra, kwargs):
+        """返回 (绘图结果, 是否命中缓存)"""
+        key = fingerprint(config, format=format, dpi=dpi, extra=key_extra, **kwargs)
+        data = self.lookup(key)
+        if data is not None:
+            return data, True
+        from .xyplotBuilder import XyPlotDirector
+        with XyPlotDirector(**config) as director:
+            data = director.to_bytes(format, dpi, **kwargs)
+        if key is not None:
+            self.put(key, data)
+        return data, False
+
+    def lookup(self, key):
+        """与 get 一致, 指纹为None(无法缓存)时只计数并返回None"""
+        if key is None:
+            with self._lock:
+                self.stats['uncacheable'] += 1
+            return None
+        return self.get(key)
+
+    def info(self) -> dict:
+        """命中/未命中/淘汰次数与当前缓存的结果个数、总大小"""
+        with self._lock:
+            index = self._load_index()
+            return dict(self.stats, entries=len(index), bytes=sum(size for size, _ in index.values()))
+
+    def clear(self):
+        """删除全部缓存结果"""
+        with self._lock:
+            for key in list(self._load_index()):
+                try:
+                    os.remove(self.path(key))
+                except OSError:
+                    pass
+            self._index.clear()
@@ -1,12 +1,17 @@
 """
 对 axes 进行相应的设置
 """
+from functools import partial
+
 from .AbstractCls import ModuleSetter
 from .utils import xy_call
 from .Adapter import XyPlotAdapter
-import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.collections import PatchCollection
+from matplotlib.figure import Figure
+from matplotlib.patches import Circle, Ellipse, Rectangle, Arc, Wedge
 from .SetAxis import SetAxis
-from .DrawContourf import ContourfDirector
+from . import Decimate, Rasterize, Streamline
 
 __author__ = 'Rookie'
 __all__ = ['SetFigure',     # 设置画布
@@ -20,12 +25,12 @@ class SetFigure(ModuleSetter):
     功能: 用于对 matplotlib 的 figure 进行设置操作
     """
     @xy_call()
-    def native_api(self, figure: plt.Figure, **kwargs):
+    def native_api(self, figure: Figure, **kwargs):
         """
         通过画布对象figure的方法来对画布进行修改
         Parameters
         ----------
-        figure: 画布对象plt.Figure
+        figure: 画布对象Figure
         kwargs: 相应的设置项, 具体包括:
             height: 设置画布高度, 对应的方法接口对象为fig.set_figheight
             width: 设置画布宽度, 对应的方法接口对象为fig.set_figwidth
@@ -57,7 +62,7 @@ class SetFigure(ModuleSetter):
         )
 
     @xy_call(XyPlotAdapter)
-    def branch_api(self, figure: plt.Figure, **kwargs):
+    def branch_api(self, figure: Figure, **kwargs):
         return dict()
 
 
@@ -71,15 +76,18 @@ class SetAxes(ModuleSetter):
         contourf:
             API: `matplotlib.Axes.contourf
             功能: 绘制等高线填充图
+        pcolormesh:
+            API: `matplotlib.Axes.pcolormesh
+            功能: 绘制(曲线)网格填色图
         streamplot:
             API: `matplotlib.Axes.streamplot
-            功能: 绘制流线
+            功能: 绘制流线, 流线几何按数据与积分参数缓存, 仅修改样式时无需重新积分, 详见 Streamline.streamplot
         plot:
             API: `matplotlib.Axes.plot
-            功能: 绘制折线
+            功能: 绘制折线, 可通过 decimate 参数按子区域像素宽度降采样(minmax/lttb), 详见 Decimate.plot
         scatter:
             API: `matplotlib.Axes.scatter
-            功能: 绘制散点
+            功能: 绘制散点, 可通过 decimate 参数在点数超过阈值时按像素分箱绘制密度图像, 详见 Decimate.scatter
         fill:
             API: `matplotlib.Axes.fill
             功能: 绘制散点
@@ -96,8 +104,9 @@ class SetAxes(ModuleSetter):
             API: `matplotlib.Axes.set_xlim
             功能: 设置x轴数值显示范围
         ylim:
-            API: `matplotlib.Axes.set_xlim
+            API: `matplotlib.Axes.set_ylim
             功能: 设置y轴数值显示范围
+            xlim/ylim 在 Branch 之前设置, 填色图插值(regrid)等能够取得设置的显示范围
         xticks:
             API: `matplotlib.Axes.set_xticks
             功能: 设置x轴上的刻度位置
@@ -146,18 +155,24 @@ class SetAxes(ModuleSetter):
         tick_params:
             API: `matplotlib.Axes.tick_params
             功能: 设置刻度标签、刻度线、网格线等
+        rasterize_above:
+            API: `Rasterize.rasterize_above
+            功能: 在其它设置完成后, 将该子区域中点数超过阈值的绘图对象设置为栅格化, 保存 PDF/SVG 时嵌入为图像,
+                 单个绘图对象也可直接使用 rasterized=True 参数
     Returns
     -------
 
     """
+    early_keys = ('xlim', 'ylim')  # 显示范围在分支绘图(如 contourf 的 regrid)之前设置
 
     @xy_call()
     def native_api(self, axes, **kwargs):
         return dict(
             contourf=axes.contourf,  # 绘制等高线填充图
-            streamplot=axes.streamplot,    # 绘制流线
-            plot=axes.plot,  # 绘制折线
-            scatter=axes.scatter,  # 绘制散点
+            pcolormesh=axes.pcolormesh,  # 绘制(曲线)网格填色图
+            streamplot=partial(Streamline.streamplot, axes),    # 绘制流线(流线几何带缓存)
+            plot=partial(Decimate.plot, axes),  # 绘制折线(支持 decimate 降采样)
+            scatter=partial(Decimate.scatter, axes),  # 绘制散点(支持 decimate 密度分箱)
             fill=axes.fill,
 
             title=axes.set_title,  # 添加图形内容的标题
@@ -179,18 +194,30 @@ class SetAxes(ModuleSetter):
             axvline=axes.axvline,  # 绘制垂直于x轴的竖直参考线
             aspect=axes.set_aspect,    # 设置子区域的横纵比
             tick_params=axes.tick_params,   # 设置刻度标签、刻度线、网格线等
+            # 栅格化数据量大的绘图对象, 需要在其它绘图对象创建完成后执行, 保持在最后
+            rasterize_above=partial(Rasterize.rasterize_above, axes),
         )
 
     @xy_call(XyPlotAdapter)
     def branch_api(self, axes, **kwargs):
+        # 填色图模块在首次使用分支设置时才导入
+        from .DrawContourf import ContourfDirector, PcolormeshDirector
         return dict(
             contourf=(ContourfDirector, axes),  # 绘制带色卡的填色图
+            pcolormesh=(PcolormeshDirector, axes),  # 绘制带色卡的网格填色图
             patches=(SetPatches, axes),     # 绘制几何图形
             axis=(SetAxis, axes)    # 设置坐标轴: 包括轴脊、刻度线、刻度标签等
         )
 
 
 class SetPatches(ModuleSetter):
+    # 批量绘制时支持的几何图形: {名称: (图形类, 几何参数)}
+    collection_kinds = dict(
+        circle=(Circle, ('xy', 'radius')),
+        ellipse=(Ellipse, ('xy', 'width', 'height', 'angle')),
+        rectangle=(Rectangle, ('xy', 'width', 'height', 'angle')),
+        wedge=(Wedge, ('center', 'r', 'theta1', 'theta2', 'width')),
+    )
 
     @xy_call(XyPlotAdapter)
     def native_api(self, axes, **kwargs):
@@ -205,6 +232,8 @@ class SetPatches(ModuleSetter):
             rectangle: 绘制矩形, 对应的方法接口对象为matplotlib.patches.Rectangle
             arc: 绘制圆弧, 对应的方法接口对象为matplotlib.patches.Arc
             wedge: 绘制楔形, 对应的方法接口对象为matplotlib.patches.Wedge
+            collection: 批量绘制同一类几何图形, 合并为一个 matplotlib.collections.PatchCollection 绘图对象,
+                大量图形(如数千个站点标记)时绘制速度远快于逐个添加, 详见 SetPatches.draw_collection
         Returns
         -------
 
@@ -215,6 +244,7 @@ class SetPatches(ModuleSetter):
             rectangle=(self.draw_rectangle, axes),  # 绘制矩形
             arc=(self.draw_arc, axes),  # 绘制圆弧
             wedge=(self.draw_wedge, axes),  # 绘制楔形
+            collection=(self.draw_collection, axes),    # 批量绘制同一类几何图形
         )
 
     def branch_api(self, module, **kwargs): ...
@@ -222,29 +252,66 @@ class SetPatches(ModuleSetter):
     @staticmethod
     def draw_circle(axes, **kwargs):
         """绘制圆形"""
-        from matplotlib.patches import Circle
         axes.add_patch(Circle(**kwargs))
 
     @staticmethod
     def draw_ellipse(axes, **kwargs):
         """绘制椭圆"""
-        from matplotlib.patches import Ellipse
         axes.add_patch(Ellipse(**kwargs))
 
     @staticmethod
     def draw_rectangle(axes, **kwargs):
         """绘制矩形"""
-        from matplotlib.patches import Rectangle
         axes.add_patch(Rectangle(**kwargs))
 
     @staticmethod
     def draw_arc(axes, **kwargs):
         """绘制圆弧"""
-        from matplotlib.patches import Arc
         axes.add_patch(Arc(**kwargs))
 
     @staticmethod
     def draw_wedge(axes, **kwargs):
         """绘制楔形"""
-        from matplotlib.patches import Wedge
         axes.add_patch(Wedge(**kwargs))
+
+    @classmethod
+    def draw_collection(cls, axes, kind, patches=None, **kwargs):
+        """
+        批量绘制同一类几何图形, 合并为一个 PatchCollection
+        Parameters
+        ----------
+        axes: plt.Axes 对象
+        kind: 几何图形类型, 可选 circle、ellipse、rectangle、wedge
+        patches: 各个图形的几何参数字典列表, 如 [dict(xy=(0, 0), radius=1), ...];
+            为None时几何参数直接以数组形式给出, 如 xy=(n, 2) 数组、radius=(n, ) 数组, 标量参数广播到所有图形
+        kwargs: 除几何参数外的其余参数传递给 PatchCollection,
+            facecolors/edgecolors/linewidths 等可为逐个图形的数组, 也可通过 array + cmap/norm 按数值映射颜色
+
+        Returns
+        -------
+        PatchCollection
+        Example
+            >>> patches = dict(collection=dict(kind='circle', xy=np.column_stack((x, y)), radius=0.1,
+            >>>                                facecolors=colors, edgecolors='k'))
+        """
+        if kind not in cls.collection_kinds:
+            raise KeyError(
+                f"For kind {kind!r}, Optional kinds include:\n {list(cls.collection_kinds)!r}"
+            )
+        patch_cls, names = cls.collection_kinds[kind]
+        geometry = {k: kwargs.pop(k) for k in names if k in kwargs}
+        if patches is None:
+            # 以坐标参数(xy/center)确定图形个数, 其余几何参数广播到相同长度
+            point_name = names[0]
+            if point_name not in geometry:
+                raise KeyError(
+                    f"{point_name!r} must be given for a {kind!r} collection"
+                )
+            points = np.asarray(geometry.pop(point_name), dtype=float).reshape(-1, 2)
+            values = [np.broadcast_to(np.asarray(v), points.shape[:1]) for v in geometry.values()]
+            patches = [patch_cls(tuple(p), **dict(zip(geometry, v))) for p, *v in zip(points, *values)]
+        else:
+            patches = [patch_cls(**dict(geometry, **p)) for p in patches]
+        collection = PatchCollection(patches, **kwargs)
+        axes.add_collection(collection)
+        return collection
@@ -0,0 +1,240 @@
+"""
+多进程绘图时的零拷贝数据共享
+    将大数组放入共享内存(multiprocessing.shared_memory)或内存映射文件, 在绘图配置中以 SharedArray 句柄代替数组;
+    句柄序列化时只包含名称、形状与数据类型, 传递给工作进程不再拷贝数组内容, 工作进程中 method_call 调度时
+    将句柄解析为直接映射共享数据的只读 numpy 视图
+    生命周期: 创建句柄的进程(所有者)负责释放, 通过 shared_config 的 with 语句块在绘图完成后统一释放;
+    工作进程中映射的视图在绘图完成后通过 detach_all 解除映射
+"""
+import os
+import threading
+import uuid
+from contextlib import contextmanager
+
+__author__ = 'Rookie'
+__all__ = [
+    'SharedArray',      # 共享数组句柄
+    'shared_config',    # 将绘图配置中的大数组替换为共享数组句柄, 退出时释放
+    'resolve_handles',  # 将参数中的共享数组句柄解析为数组视图
+    'detach_all',       # 解除当前进程中映射的全部共享数组
+]
+
+SHARE_MIN_BYTES = 2 ** 20   # shared_config 默认只共享不小于该字节数的数组
+_ATTACHED = dict()  # 当前进程中已映射的共享数组 {名称: (共享内存对象或None, 数组视图)}
+_LOCK = threading.Lock()    # 映射/创建共享内存时加锁(见 _attach), 多个线程同时解析句柄时互不影响
+
+
+class SharedArray:
+    """
+    共享数组句柄, 通过 SharedArray.create 创建; 可直接用于需要数组的地方(实现了 __array__ 协议)
+    Parameters
+    ----------
+    name: 共享内存名称(backend 为 'shm')或内存映射文件路径(backend 为 'mmap')
+    shape: 数组形状
+    dtype: 数据类型字符串, 如 '<f8'
+    backend: 'shm' 共享内存 或 'mmap' 内存映射文件
+    """
+    def __init__(self, name: str, shape: tuple, dtype: str, backend: str = 'shm'):
+        if backend not in ('shm', 'mmap'):
+            raise ValueError(
+                f"Unsupported backend {backend!r}, Optional values include 'shm'、'mmap'"
+            )
+        self.name = name
+        self.shape = tuple(shape)
+        self.dtype = dtype
+        self.backend = backend
+        self._owner = None  # 所有者进程中的共享内存对象(backend 为 'shm')或 True(backend 为 'mmap')
+
+    @classmethod
+    def from_ref(cls, value: dict):
+        """
+        由请求中的共享内存引用 {"$shm": 名称, "shape": 形状, "dtype": 数据类型} 创建句柄
+        只接受 'shm' 共享内存, 引用中不能指定内存映射文件(否则可读取任意路径的文件)
+        """
+        if value.get('backend', 'shm') != 'shm':
+            raise ValueError("Shared array references only support the 'shm' backend")
+        return cls(value['$shm'], value['shape'], value['dtype'], 'shm')
+
+    @classmethod
+    def create(cls, array, backend: str = 'shm', directory=None):
+        """
+        将数组拷贝到共享内存或内存映射文件中(只拷贝这一次), 返回所有者句柄
+        Parameters
+        ----------
+        array: 数组
+        backend: 'shm' 共享内存 或 'mmap' 内存映射文件
+        directory: backend 为 'mmap' 时文件所在目录, 为None时使用系统临时目录
+        """
+        import numpy as np
+        array = np.ascontiguousarray(array)
+        if backend == 'shm':
+            from multiprocessing import shared_memory
+            with _LOCK:
+                segment = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+            handle = cls(segment.name, array.shape, array.dtype.str, backend)
+            np.ndarray(array.shape, array.dtype, buffer=segment.buf)[...] = array
+            handle._owner = segment
+        elif backend == 'mmap':
+            import tempfile
+            directory = tempfile.gettempdir() if directory is None else directory
+            path = os.path.join(directory, f"xyplot-{uuid.uuid4().hex}.npy")
+            np.save(path, array)
+            handle = cls(path, array.shape, array.dtype.str, backend)
+            handle._owner = True
+        else:
+            raise ValueError(
+                f"Unsupported backend {backend!r}, Optional values include 'shm'、'mmap'"
+            )
+        return handle
+
+    @property
+    def array(self):
+        """映射共享数据的只读 numpy 视图(不拷贝), 同一进程中重复访问返回同一视图"""
+        attached = _ATTACHED.get(self.name)
+        if attached is None:
+            import numpy as np
+            with _LOCK:
+                attached = _ATTACHED.get(self.name)
+                if attached is None:
+                    if self.backend == 'mmap':
+                        segment, view = None, np.load(self.name, mmap_mode='r')
+                    else:
+                        segment = self._owner if self._owner is not None else _attach(self.name)
+                        view = np.ndarray(self.shape, np.dtype(self.dtype), buffer=segment.buf)
+                        view.flags.writeable = False
+                    attached = _ATTACHED[self.name] = (segment, view)
+        return attached[1]
+
+    def __array__(self, dtype=None, copy=None):
+        import numpy as np
+        array = self.array
+        if copy:
+            return np.array(array, dtype=dtype, copy=True)
+        if copy is False and dtype is not None and np.dtype(dtype) != array.dtype:
+            raise ValueError(
+                f"Unable to avoid copy while converting shared array from {array.dtype} to {np.dtype(dtype)}"
+            )
+        return np.asarray(array, dtype=dtype)
+
+    @property
+    def nbytes(self):
+        import numpy as np
+        return int(np.prod(self.shape)) * np.dtype(self.dtype).itemsize
+
+    def release(self):
+        """释放共享数据: 所有者删除共享内存/内存映射文件, 其它进程中只解除映射"""
+        _detach(self.name, close=self._owner is None)
+        if self._owner is None:
+            return
+        if self.backend == 'shm':
+            _close(self._owner)
+            self._owner.unlink()
+        else:
+            try:
+                os.remove(self.name)
+            except OSError:
+                pass
+        self._owner = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+
+    def __getstate__(self):
+        # 序列化时只传递名称、形状与数据类型, 反序列化后的句柄不是所有者
+        return dict(self.__dict__, _owner=None)
+
+    def __repr__(self):
+        return f"SharedArray({self.name!r}, shape={self.shape!r}, dtype={self.dtype!r}, backend={self.backend!r})"
+
+
+@contextmanager
+def shared_config(config, min_bytes: int = SHARE_MIN_BYTES, backend: str = 'shm', directory=None):
+    """
+    将绘图配置中不小于 min_bytes 的数组替换为共享数组句柄(同一数组只共享一次), 退出 with 语句块时全部释放
+    Parameters
+    ----------
+    config: 绘图配置(dict/list/tuple 嵌套)
+    min_bytes: 共享的最小数组字节数
+    backend, directory: 见 SharedArray.create
+
+    Example
+        >>> with shared_config(dict(axes=dict(Branch=dict(contourf=dict(init=dict(args=(X, Y, Z))))))) as cfg:
+        >>>     pool.submit(render, cfg).result()
+    """
+    handles = dict()
+    try:
+        yield _share(config, handles, min_bytes, backend, directory)
+    finally:
+        for handle in handles.values():
+            handle.release()
+
+
+def _share(value, handles, min_bytes, backend, directory):
+    """递归替换配置中的大数组"""
+    import numpy as np
+    if isinstance(value, dict):
+        return {k: _share(v, handles, min_bytes, backend, directory) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return type(value)(_share(v, handles, min_bytes, backend, directory) for v in value)
+    if isinstance(value, np.ndarray) and not isinstance(value, np.ma.MaskedArray) and \
+            not value.dtype.hasobject and value.nbytes >= min_bytes:
+        if id(value) not in handles:
+            handles[id(value)] = SharedArray.create(value, backend, directory)
+        return handles[id(value)]
+    return value
+
+
+def resolve_handles(value):
+    """将参数(列表/元组)中的共享数组句柄解析为数组视图, 不含句柄时返回原对象"""
+    if isinstance(value, SharedArray):
+        return value.array
+    if isinstance(value, (list, tuple)) and any(isinstance(v, SharedArray) for v in value):
+        return type(value)(v.array if isinstance(v, SharedArray) else v for v in value)
+    return value
+
+
+def detach_all():
+    """解除当前进程中映射的全部共享数组(不删除共享数据), 工作进程在每次绘图完成后调用"""
+    for name in list(_ATTACHED):
+        _detach(name, close=True)
+
+
+def _attach(name):
+    """映射已有的共享内存, 不交由 resource_tracker 管理(由所有者进程负责删除), 调用时需持有 _LOCK"""
+    from multiprocessing import shared_memory
+    try:
+        return shared_memory.SharedMemory(name, track=False)
+    except TypeError:
+        # Python 3.13 之前没有 track 参数, 映射时会注册到 resource_tracker(进程退出时被删除);
+        # 子进程与所有者共用 resource_tracker, 事后取消注册会同时移除所有者的注册, 因此映射期间跳过注册;
+        # 替换的是整个进程的 register, 因此与创建共享内存一样在 _LOCK 内进行
+        from multiprocessing import resource_tracker
+        register = resource_tracker.register
+        resource_tracker.register = _skip_register
+        try:
+            return shared_memory.SharedMemory(name)
+        finally:
+            resource_tracker.register = register
+
+
+def _skip_register(name, rtype):
+    """映射共享内存时代替 resource_tracker.register"""
+
+
+def _detach(name, close):
+    """移除当前进程中的映射记录, close 为True时关闭共享内存映射"""
+    with _LOCK:
+        attached = _ATTACHED.pop(name, None)
+    if attached is not None and close and attached[0] is not None:
+        _close(attached[0])
+
+
+def _close(segment):
+    """关闭共享内存映射, 仍有数组视图引用时由垃圾回收在视图释放后关闭"""
+    try:
+        segment.close()
+    except BufferError:
+        pass
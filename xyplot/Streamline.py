@@ -0,0 +1,261 @@
+"""
+流线绘制(带流线几何缓存)
+    流线的积分计算与样式无关: 相同的网格、矢量场与积分参数(density、start_points 等)只计算一次流线几何并缓存,
+    之后仅修改颜色、线宽、箭头等样式时直接使用缓存的几何绘制, 无需重新积分;
+    绘制结果与 axes.streamplot 一致, 为一个 LineCollection 以及流线上的箭头
+"""
+import hashlib
+import threading
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+import matplotlib as mpl
+
+from .Plan import PlanTarget
+
+__author__ = 'Rookie'
+__all__ = [
+    'streamplot',           # 等同于 axes.streamplot, 流线几何带缓存
+    'compute_streamlines',  # 计算(带缓存的)流线几何
+    'draw_streamlines',     # 使用流线几何绘制流线与箭头
+    'clear_cache',          # 清空流线几何缓存
+]
+
+_CACHE = OrderedDict()  # 流线几何缓存(LRU): {指纹: 流线几何}
+_CACHE_SIZE = 16
+_CACHE_LOCK = threading.Lock()  # 多线程绘图时保护 _CACHE 与 _DIGESTS
+_DIGESTS = {}  # 只读数组的内容哈希: {id(数组): (数组的弱引用, 哈希值)}
+
+
+def streamplot(axes, x, y, u, v, density=1, linewidth=None, color=None, cmap=None, norm=None, arrowsize=1,
+               arrowstyle='-|>', transform=None, zorder=None, start_points=None, num_arrows=1, workers=None,
+               rasterized=False, **kwargs):
+    """
+    等同于 axes.streamplot, 流线几何按 (x, y, u, v, density, start_points 以及其它积分参数) 的指纹缓存
+    Parameters
+    ----------
+    axes: 子区域对象
+    x, y, u, v, density, linewidth, color, cmap, norm, arrowsize, arrowstyle, transform, zorder, start_points,
+    num_arrows: 与 axes.streamplot 一致, 其中 color/linewidth 为数组时按网格插值到流线上, 同样不需要重新积分
+    workers: 指定 start_points 时, 将起始点分配到多个进程中并行积分, 为None时不并行;
+        各进程中的流线互不避让, 结果与串行计算时略有不同
+    rasterized: 是否将流线与箭头栅格化, 保存 PDF/SVG 等矢量格式时嵌入为图像
+    kwargs: 其它积分参数, 如 minlength、maxlength、integration_direction、broken_streamlines
+
+    Returns
+    -------
+    matplotlib.streamplot.StreamplotSet
+    """
+    if isinstance(axes, PlanTarget):
+        # 编译渲染计划时数据尚未确定, 延迟到执行时再计算
+        style = dict(density=density, linewidth=linewidth, color=color, cmap=cmap, norm=norm, arrowsize=arrowsize,
+                     arrowstyle=arrowstyle, transform=transform, zorder=zorder, start_points=start_points,
+                     num_arrows=num_arrows, workers=workers, rasterized=rasterized)
+        return axes.defer(streamplot, dict(kwargs, **style), (x, y, u, v))
+    trajectories = compute_streamlines(x, y, u, v, density, start_points, workers, **kwargs)
+    return draw_streamlines(axes, trajectories, x, y, linewidth, color, cmap, norm, arrowsize, arrowstyle,
+                            transform, zorder, num_arrows, rasterized)
+
+
+def compute_streamlines(x, y, u, v, density=1, start_points=None, workers=None, **kwargs):
+    """
+    计算流线几何(数据坐标下的各条流线折线), 相同参数的计算结果被缓存复用
+    Returns
+    -------
+    流线折线列表, 每条为 shape (n, 2) 的数组
+    """
+    key = _fingerprint((x, y, u, v, start_points), (density, sorted(kwargs.items())))
+    with _CACHE_LOCK:
+        trajectories = _CACHE.get(key)
+        if trajectories is not None:
+            _CACHE.move_to_end(key)
+            return trajectories
+    if start_points is not None and workers is not None and workers > 1 and len(start_points) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        from .Shared import shared_config
+        chunks = np.array_split(np.asarray(start_points, dtype=float), min(workers, len(start_points)))
+        # 大数组放入共享内存, 各进程只接收共享数组句柄, 不再逐个拷贝网格与速度场
+        with shared_config((x, y, u, v)) as data, ProcessPoolExecutor(len(chunks)) as pool:
+            futures = [pool.submit(_integrate, *data, density, chunk, kwargs) for chunk in chunks]
+            trajectories = [t for future in futures for t in future.result()]
+    else:
+        trajectories = _integrate(x, y, u, v, density, start_points, kwargs)
+    with _CACHE_LOCK:
+        # 其它线程可能已经计算了相同的流线, 使用先写入的结果
+        trajectories = _CACHE.setdefault(key, trajectories)
+        while len(_CACHE) > _CACHE_SIZE:
+            _CACHE.popitem(last=False)
+    return trajectories
+
+
+def draw_streamlines(axes, trajectories, x, y, linewidth=None, color=None, cmap=None, norm=None, arrowsize=1,
+                     arrowstyle='-|>', transform=None, zorder=None, num_arrows=1, rasterized=False):
+    """
+    使用流线几何绘制流线(一个 LineCollection)与箭头, 样式参数的含义与 axes.streamplot 一致
+    Returns
+    -------
+    matplotlib.streamplot.StreamplotSet
+    """
+    from matplotlib.collections import LineCollection, PatchCollection
+    from matplotlib.colors import Normalize
+    from matplotlib.lines import Line2D
+    from matplotlib.patches import FancyArrowPatch
+    from matplotlib.streamplot import StreamplotSet
+    zorder = Line2D.zorder if zorder is None else zorder
+    transform = axes.transData if transform is None else transform
+    color = _next_color(axes) if color is None else color
+    linewidth = mpl.rcParams['lines.linewidth'] if linewidth is None else linewidth
+    x, y = _grid_axes(x, y)
+    multicolor = isinstance(color, np.ndarray)
+    multiwidth = isinstance(linewidth, np.ndarray)
+    line_kw = dict(zorder=zorder, rasterized=rasterized)
+    arrow_kw = dict(arrowstyle=arrowstyle, mutation_scale=10 * arrowsize, zorder=zorder, rasterized=rasterized)
+    if multicolor:
+        color = np.ma.masked_invalid(color)
+        norm = Normalize(color.min(), color.max()) if norm is None else norm
+        cmap = mpl.colormaps[cmap or mpl.rcParams['image.cmap']] if not hasattr(cmap, 'N') else cmap
+    else:
+        line_kw['color'] = arrow_kw['color'] = color
+    if not multiwidth:
+        line_kw['linewidth'] = arrow_kw['linewidth'] = linewidth
+
+    segments, colors, widths, arrows = [], [], [], []
+    for points in trajectories:
+        tx, ty = points[:, 0], points[:, 1]
+        if multicolor or multiwidth:
+            # 颜色/线宽随位置变化时, 每条流线拆分为逐段的线段, 取值为各线段起点处的网格插值
+            segments.extend(np.stack((points[:-1], points[1:]), axis=1))
+            gx, gy = (tx - x[0]) / (x[1] - x[0]), (ty - y[0]) / (y[1] - y[0])
+            if multicolor:
+                colors.append(_interp_grid(color, gx, gy)[:-1])
+            if multiwidth:
+                widths.append(_interp_grid(linewidth, gx, gy)[:-1])
+        else:
+            segments.append(points)
+        # 沿流线等距离放置箭头, 与 axes.streamplot 一致
+        s = np.cumsum(np.hypot(np.diff(tx), np.diff(ty)))
+        for k in range(1, num_arrows + 1):
+            idx = np.searchsorted(s, s[-1] * (k / (num_arrows + 1)))
+            if multiwidth:
+                arrow_kw['linewidth'] = widths[-1][idx]
+            if multicolor:
+                arrow_kw['color'] = cmap(norm(colors[-1][idx]))
+            arrows.append(FancyArrowPatch((tx[idx], ty[idx]), (np.mean(tx[idx:idx + 2]), np.mean(ty[idx:idx + 2])),
+                                          transform=transform, **arrow_kw))
+
+    if multiwidth:
+        line_kw['linewidth'] = np.concatenate(widths) if widths else []
+    lines = LineCollection(segments, transform=transform, **line_kw)
+    lines.sticky_edges.x[:] = [x[0], x[-1]]
+    lines.sticky_edges.y[:] = [y[0], y[-1]]
+    if multicolor:
+        lines.set_array(np.ma.hstack([[]] + colors))
+        lines.set_cmap(cmap)
+        lines.set_norm(norm)
+    lines.set_label(_STREAM_LABEL)
+    axes.add_collection(lines)
+    for arrow in arrows:
+        axes.add_patch(arrow)
+    axes.autoscale_view()
+    return StreamplotSet(lines, PatchCollection(arrows))
+
+
+def clear_cache():
+    """清空流线几何缓存"""
+    with _CACHE_LOCK:
+        _CACHE.clear()
+        _DIGESTS.clear()
+
+
+_STREAM_LABEL = '_streamlines'  # 流线 LineCollection 的标签, 以下划线开头不显示在图例中
+
+
+def _next_color(axes):
+    """
+    未指定颜色时按 rcParams['axes.prop_cycle'] 依次取色: 子区域中每条折线与每组流线各占一个颜色,
+    子区域只包含 plot 折线时与 axes.streamplot 的取色一致
+    """
+    colors = mpl.rcParams['axes.prop_cycle'].by_key().get('color')
+    if not colors:
+        return mpl.rcParams['lines.color']
+    used = len(axes.lines) + sum(c.get_label() == _STREAM_LABEL for c in axes.collections)
+    return colors[used % len(colors)]
+
+
+def _integrate(x, y, u, v, density, start_points, kwargs):
+    """在临时的子区域上调用 streamplot 进行流线积分, 取出各条流线的折线(纯色、等线宽时每条流线为一条折线)"""
+    from matplotlib.figure import Figure
+    from .Shared import resolve_handles
+    x, y, u, v = resolve_handles((x, y, u, v))
+    scratch = Figure().add_subplot()
+    result = scratch.streamplot(x, y, u, v, density=density, start_points=start_points, color='k', linewidth=1,
+                                **kwargs)
+    return [np.asarray(points) for points in result.lines.get_segments()]
+
+
+def _grid_axes(x, y):
+    """取出(规则)网格的一维坐标"""
+    x, y = np.asarray(x), np.asarray(y)
+    return (x[0] if x.ndim == 2 else x), (y[:, 0] if y.ndim == 2 else y)
+
+
+def _interp_grid(a, xi, yi):
+    """网格坐标 (xi, yi) 处的双线性插值, 与 matplotlib.streamplot.interpgrid 一致"""
+    ny, nx = np.shape(a)
+    ix, iy = xi.astype(int), yi.astype(int)
+    ixn, iyn = np.clip(ix + 1, 0, nx - 1), np.clip(iy + 1, 0, ny - 1)
+    xt, yt = xi - ix, yi - iy
+    a0 = a[iy, ix] * (1 - xt) + a[iy, ixn] * xt
+    a1 = a[iyn, ix] * (1 - xt) + a[iyn, ixn] * xt
+    return a0 * (1 - yt) + a1 * yt
+
+
+def _fingerprint(arrays, params):
+    """数组内容与参数的哈希值"""
+    h = hashlib.blake2b(digest_size=16)
+    for arr in arrays:
+        h.update(b'None' if arr is None else _array_digest(arr))
+    h.update(repr(params).encode())
+    return h.hexdigest()
+
+
+def _array_digest(arr) -> bytes:
+    """
+    数组内容的哈希值; 只读数组(如内存映射缓存、共享内存数组)的内容不会改变, 哈希值按数组对象缓存,
+    重复绘制时不再重新计算; 可写数组可能被原地修改, 每次重新计算
+    """
+    if not _is_readonly(arr):
+        return _hash_array(arr)
+    with _CACHE_LOCK:
+        ref, digest = _DIGESTS.get(id(arr), (None, None))
+    if ref is not None and ref() is arr:
+        return digest
+    digest = _hash_array(arr)
+    key = id(arr)
+    ref = weakref.ref(arr, lambda _, key=key: _DIGESTS.pop(key, None))
+    with _CACHE_LOCK:
+        _DIGESTS[key] = (ref, digest)
+    return digest
+
+
+def _hash_array(arr) -> bytes:
+    """计算数组的形状、类型与内容的哈希值, 连续存储的数组直接哈希其内存, 不进行拷贝"""
+    h = hashlib.blake2b(digest_size=16)
+    if np.ma.isMaskedArray(arr):
+        arr = np.ma.filled(arr.astype(np.float64), np.nan)
+    arr = np.ascontiguousarray(arr)
+    h.update(f"{arr.shape}{arr.dtype.str}".encode())
+    h.update(arr.data if arr.dtype != object else repr(arr.tolist()).encode())
+    return h.digest()
+
+
+def _is_readonly(arr) -> bool:
+    """数组(非掩码数组)及其所有基数组均不可写"""
+    if not isinstance(arr, np.ndarray) or np.ma.isMaskedArray(arr):
+        return False
+    while isinstance(arr, np.ndarray):
+        if arr.flags.writeable:
+            return False
+        arr = arr.base
+    return True
@@ -1,2 +1,24 @@
-from .xyplotBuilder import XyPlotDirector as XyPlot
-from .Set import SetAxes, SetFigure
+from .Plan import Placeholder, RenderPlan
+from .Profiler import Profiler
+from .Shared import SharedArray, shared_config
+
+# 依赖 matplotlib 的绘图对象在首次访问时才导入, 使 import xyplot、xyplot.io、xyplot.batch 等不加载 matplotlib
+_LAZY = dict(
+    XyPlot=('.xyplotBuilder', 'XyPlotDirector'),
+    SetAxes=('.Set', 'SetAxes'),
+    SetFigure=('.Set', 'SetFigure'),
+)
+
+
+def __getattr__(name):
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+    module_name, attr = _LAZY[name]
+    obj = getattr(importlib.import_module(module_name, __name__), attr)
+    globals()[name] = obj
+    return obj
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
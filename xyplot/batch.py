@@ -0,0 +1,216 @@
+"""
+批量并行绘图: 使用进程池将同一绘图配置模板应用到多个输入文件
+    python -m xyplot.batch module:TEMPLATE "P-L1-IMM-SWMF_*.dat" -o "out/{stem}.png" -j 8
+"""
+import argparse
+import glob
+import importlib
+import importlib.util
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+
+from .Shared import shared_config
+
+__author__ = 'Rookie'
+__all__ = [
+    'render_batch',     # 批量并行绘图
+    'load_template',    # 根据 'module:attr' 加载绘图配置模板
+    'expand_files',     # 展开输入文件列表中的通配符
+]
+
+_WORKER = dict()    # 工作进程内的绘图配置模板、已编译的渲染计划等状态
+
+
+def load_template(spec: str):
+    """
+    根据 'module:attr' 或 'path/to/file.py:attr' 加载绘图配置模板
+    模板可以是:
+        1. dict, 与 XyPlotDirector 相同的绘图配置, 数据使用 Placeholder 占位, 占位符名称为 tecplot 变量名,
+           执行时从输入文件的第一个zone中按网格形状取出对应变量
+        2. callable, 接收输入文件路径并返回绘图配置
+    """
+    module_name, _, attr = spec.rpartition(':')
+    if not module_name or not attr:
+        raise ValueError(f"Template spec {spec!r} must be of the form 'module:attr' or 'file.py:attr'")
+    if module_name.endswith('.py'):
+        module_spec = importlib.util.spec_from_file_location(os.path.splitext(os.path.basename(module_name))[0],
+                                                             module_name)
+        module = importlib.util.module_from_spec(module_spec)
+        module_spec.loader.exec_module(module)
+    else:
+        module = importlib.import_module(module_name)
+    return getattr(module, attr)
+
+
+def expand_files(files):
+    """展开输入文件列表中的通配符, 保持输入顺序, 每个通配符内按文件名排序"""
+    if isinstance(files, str):
+        files = [files]
+    result = []
+    for pattern in files:
+        if glob.has_magic(pattern):
+            result.extend(sorted(glob.glob(pattern)))
+        else:
+            result.append(pattern)
+    return result
+
+
+def output_path(output: str, file: str, index: int):
+    """
+    输出文件路径, output 可以是目录(以路径分隔符结尾或已存在的目录)或包含 {stem}/{name}/{index} 的格式字符串
+    """
+    name = os.path.basename(file)
+    stem = os.path.splitext(name)[0]
+    if output.endswith(os.sep) or os.path.isdir(output):
+        return os.path.join(output, f"{stem}.png")
+    return output.format(stem=stem, name=name, index=index)
+
+
+def _init_pool_worker(*args):
+    """进程池中的工作进程初始化: 强制使用非交互式后端后同 _init_worker"""
+    import matplotlib
+    matplotlib.use('Agg', force=True)
+    _init_worker(*args)
+
+
+def _init_worker(template, save_kwargs, cache, render_cache=None):
+    """
+    加载模板并预先编译渲染计划
+    绘图使用显式的 Agg 画布(见 xyplotBuilder.new_figure), 在当前进程中执行时不切换 matplotlib 后端
+    """
+    from .xyplotBuilder import XyPlotDirector
+    if isinstance(template, str):
+        template = load_template(template)
+    _WORKER.update(
+        template=template,
+        plan=XyPlotDirector.compile(template) if isinstance(template, dict) else None,
+        save_kwargs=save_kwargs,
+        cache=cache,
+        render_cache=None,
+    )
+    if render_cache is not None and isinstance(template, dict):
+        from .RenderCache import RenderCache
+        _WORKER['render_cache'] = RenderCache(render_cache)
+
+
+def _render(file, out):
+    """在工作进程中绘制单个文件, 完成后关闭画布以释放内存"""
+    t = time.perf_counter()
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    plan, cache = _WORKER['plan'], _WORKER['render_cache']
+    if cache is not None:
+        # 模板、输入文件与输出参数均未变化时直接使用之前的绘图结果
+        from .RenderCache import fingerprint, file_identity
+        fmt = os.path.splitext(out)[1][1:].lower() or 'png'
+        key = fingerprint(_WORKER['template'], format=fmt, file=file_identity(file), **_WORKER['save_kwargs'])
+        data = cache.lookup(key)
+        if data is None:
+            with _build(file, plan) as director:
+                data = director.to_bytes(fmt, **_WORKER['save_kwargs'])
+            if key is not None:
+                cache.put(key, data)
+        with open(out, 'wb') as f:
+            f.write(data)
+    else:
+        with _build(file, plan) as director:
+            director.save(out, **_WORKER['save_kwargs'])
+    return out, time.perf_counter() - t
+
+
+def _build(file, plan):
+    """根据模板绘制单个文件, 返回 XyPlotDirector 对象"""
+    from .xyplotBuilder import XyPlotDirector
+    if plan is not None:
+        from .io import read_tecplot
+        zone = read_tecplot(file, cache=_WORKER['cache'])[0]
+        return plan(**{name: zone.grid(name) for name in plan.placeholders})
+    return XyPlotDirector(**_WORKER['template'](file))
+
+
+def render_batch(template, files, output='{stem}.png', processes=None, max_in_flight=None,
+                 save_kwargs=None, cache=False, report=print, render_cache=None):
+    """
+    批量并行绘图
+    Parameters
+    ----------
+    template: 绘图配置模板, 可以是 dict、callable 或 'module:attr' 字符串, 详见 load_template
+    files: 输入文件列表, 支持通配符
+    output: 输出路径, 目录或包含 {stem}/{name}/{index} 的格式字符串
+    processes: 工作进程数, 为None时使用CPU核数, 为1时在当前进程中依次绘制
+    max_in_flight: 同时提交到进程池中的最大任务数, 为None时为工作进程数的2倍
+    save_kwargs: 传递给 savefig 的参数, 例如 dict(dpi=150)
+    cache: 读取 tecplot 文件时是否使用二进制缓存
+    report: 进度输出函数, 按输入顺序逐个报告, 为None时不输出
+    render_cache: 绘图结果缓存目录(见 RenderCache), 模板为 dict 时, 模板、输入文件与输出参数均未变化的文件
+        直接使用之前的绘图结果, 为None时不使用
+
+    Returns
+    -------
+    按输入顺序排列的输出文件路径列表
+    """
+    files = expand_files(files)
+    save_kwargs = dict() if save_kwargs is None else save_kwargs
+    processes = (os.cpu_count() or 1) if processes is None else processes
+    max_in_flight = 2 * processes if max_in_flight is None else max(1, max_in_flight)
+    tasks = [(file, output_path(output, file, i)) for i, file in enumerate(files)]
+    results = []
+
+    def done(index, out, seconds):
+        results.append(out)
+        if report is not None:
+            report(f"[{index + 1}/{len(tasks)}] {tasks[index][0]} -> {out} ({seconds:.2f}s)")
+
+    if processes == 1:
+        _init_worker(template, save_kwargs, cache, render_cache)
+        try:
+            for i, task in enumerate(tasks):
+                done(i, *_render(*task))
+        finally:
+            _WORKER.clear()
+        return results
+
+    # 模板中的大数组放入共享内存, 各工作进程只接收共享数组句柄, 全部绘制完成后释放
+    with (shared_config(template) if isinstance(template, dict) else nullcontext(template)) as template, \
+            ProcessPoolExecutor(processes, initializer=_init_pool_worker,
+                                initargs=(template, save_kwargs, cache, render_cache)) as pool:
+        pending = deque()
+        for i, task in enumerate(tasks):
+            # 控制同时提交的任务数, 并按输入顺序等待最早提交的任务完成
+            if len(pending) >= max_in_flight:
+                index, future = pending.popleft()
+                done(index, *future.result())
+            pending.append((i, pool.submit(_render, *task)))
+        while pending:
+            index, future = pending.popleft()
+            done(index, *future.result())
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m xyplot.batch', description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('template', help="绘图配置模板, 'module:attr' 或 'file.py:attr'")
+    parser.add_argument('files', nargs='+', help='输入文件, 支持通配符')
+    parser.add_argument('-o', '--output', default='{stem}.png', help='输出目录或格式字符串, 默认 {stem}.png')
+    parser.add_argument('-j', '--processes', type=int, default=None, help='工作进程数, 默认为CPU核数')
+    parser.add_argument('--max-in-flight', type=int, default=None, help='同时提交的最大任务数')
+    parser.add_argument('--dpi', type=float, default=None, help='输出图片的分辨率')
+    parser.add_argument('--cache', action='store_true', help='读取 tecplot 文件时使用二进制缓存')
+    parser.add_argument('--render-cache', default=None, help='绘图结果缓存目录, 跳过未变化的文件')
+    args = parser.parse_args(argv)
+
+    import matplotlib
+    matplotlib.use('Agg', force=True)
+    save_kwargs = dict() if args.dpi is None else dict(dpi=args.dpi)
+    t = time.perf_counter()
+    results = render_batch(args.template, args.files, args.output, args.processes, args.max_in_flight,
+                           save_kwargs, args.cache, render_cache=args.render_cache)
+    print(f"Rendered {len(results)} files in {time.perf_counter() - t:.2f}s", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
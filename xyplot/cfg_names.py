@@ -7,3 +7,4 @@ INIT_NAME = 'init'  # 创建对象初始化信息配置命名
 AXES_NAME = 'axes'  # 子区域设定配置命名
 BRANCH_NAME = "Branch"  # 分支配置命名: 代指进入自定义配置组合结构
 ARGS_NAME = 'args'  # args 接口输入args参数的配置命名
+INCREMENTAL_NAME = 'incremental'  # 顶层设置是否开启增量模式(记录绘图对象以便后续更新数据)
@@ -0,0 +1,2 @@
+from .tecplot import read_tecplot, parse_tecplot, TecplotDataset, TecplotZone
+from .cache import load_cache, write_cache
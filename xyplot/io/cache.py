@@ -0,0 +1,125 @@
+"""
+tecplot 数据集的二进制缓存
+    每个数据集缓存为一个 json 头文件 + 每个zone一个 .npy 数组文件, 数组按 (变量个数, 点数) 存储,
+    加载时通过 np.load(mmap_mode='r') 以内存映射方式打开, 只有实际访问到的变量才会被读入内存
+"""
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from .tecplot import TecplotDataset, TecplotZone
+
+__author__ = 'Rookie'
+__all__ = [
+    'cache_paths',      # 获取缓存文件路径
+    'source_key',       # 获取源文件的缓存键
+    'load_cache',       # 加载缓存
+    'write_cache',      # 写入缓存
+]
+
+CACHE_VERSION = 1   # 缓存格式版本, 格式变化时递增以使旧缓存失效
+CACHE_SUFFIX = '.xycache'
+
+
+def source_key(file, dtype):
+    """源文件的缓存键: 路径、文件大小、修改时间以及数值类型"""
+    stat = os.stat(file)
+    return dict(
+        version=CACHE_VERSION,
+        source=os.path.abspath(file),
+        size=stat.st_size,
+        mtime_ns=stat.st_mtime_ns,
+        dtype=np.dtype(dtype).str,
+    )
+
+
+def cache_paths(file, cache_dir=None):
+    """
+    获取缓存文件路径
+    Parameters
+    ----------
+    file: 源文件路径
+    cache_dir: 缓存目录, 为None时缓存文件与源文件放在同一目录下;
+        指定目录时文件名附加源文件绝对路径的哈希值, 避免不同目录下同名文件冲突
+
+    Returns
+    -------
+    (json 头文件路径, zone 数组文件路径的前缀)
+    """
+    name = os.path.basename(file)
+    if cache_dir is None:
+        cache_dir = os.path.dirname(os.path.abspath(file))
+    else:
+        digest = hashlib.sha1(os.path.abspath(file).encode('utf-8')).hexdigest()[:12]
+        name = f"{name}-{digest}"
+    prefix = os.path.join(cache_dir, name + CACHE_SUFFIX)
+    return prefix + '.json', prefix
+
+
+def load_cache(file, dtype=np.float64, cache_dir=None):
+    """
+    加载缓存, 缓存不存在或已失效(源文件大小/修改时间变化)时返回None
+    Returns
+    -------
+    TecplotDataset or None
+    """
+    header_path, prefix = cache_paths(file, cache_dir)
+    try:
+        with open(header_path, 'r', encoding='utf-8') as f:
+            header = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if header.get('key') != source_key(file, dtype):
+        return None
+    zones = []
+    try:
+        for idx, zone in enumerate(header['zones']):
+            data = np.load(f"{prefix}.{idx}.npy", mmap_mode='r')
+            zones.append(TecplotZone(header['variables'], data, zone['title'], tuple(zone['ijk']),
+                                     zone['datapacking'], zone['auxdata']))
+    except (OSError, ValueError):
+        return None
+    return TecplotDataset(header['title'], header['variables'], zones, header['auxdata'])
+
+
+def write_cache(file, dataset: TecplotDataset, dtype=np.float64, cache_dir=None, key=None):
+    """
+    写入缓存: 先写入各zone的数组文件, 最后写入json头文件作为缓存完成的标志, 均通过临时文件原子替换;
+    删除源文件zone数减少后多余的zone数组文件
+    Parameters
+    ----------
+    key: 读取源文件之前获取的缓存键(见 source_key), 为None时使用源文件当前的缓存键
+    """
+    header_path, prefix = cache_paths(file, cache_dir)
+    os.makedirs(os.path.dirname(header_path), exist_ok=True)
+    for idx, zone in enumerate(dataset.zones):
+        _atomic_write(f"{prefix}.{idx}.npy", lambda f, data=zone.data: np.save(f, np.ascontiguousarray(data)))
+    header = dict(
+        key=source_key(file, dtype) if key is None else key,
+        title=dataset.title,
+        variables=dataset.variables,
+        auxdata=dataset.auxdata,
+        zones=[
+            dict(title=zone.title, ijk=[zone.i, zone.j, zone.k], datapacking=zone.datapacking, auxdata=zone.auxdata)
+            for zone in dataset.zones
+        ],
+    )
+    _atomic_write(header_path, lambda f: f.write(json.dumps(header, ensure_ascii=False).encode('utf-8')))
+    idx = len(dataset.zones)
+    while os.path.exists(f"{prefix}.{idx}.npy"):
+        os.remove(f"{prefix}.{idx}.npy")
+        idx += 1
+
+
+def _atomic_write(path, writer):
+    """写入临时文件后替换目标文件, 避免并发读取到写了一半的缓存"""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, 'wb') as f:
+            writer(f)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
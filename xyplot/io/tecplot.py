@@ -0,0 +1,276 @@
+"""
+读取 Tecplot ASCII 格式数据文件
+"""
+import io
+import re
+import warnings
+
+import numpy as np
+
+__author__ = 'Rookie'
+__all__ = [
+    'TecplotZone',      # 单个zone数据对象
+    'TecplotDataset',   # tecplot 数据集对象
+    'read_tecplot',     # 读取 tecplot ASCII 数据文件
+    'parse_tecplot',    # 解析 tecplot ASCII 文本内容
+]
+
+# 头部键值对: KEY=VALUE / KEY="VALUE" / KEY=(...)
+_PAIR_RE = re.compile(r'(\w+)\s*=\s*("[^"]*"|\([^)]*\)|[^,\s]+)')
+# 引号中的字符串
+_QUOTED_RE = re.compile(r'"([^"]*)"')
+# 数据块的结束位置: 下一条 ZONE/TEXT/GEOMETRY 记录(以换行符开头, 避免逐字节尝试行首匹配)
+_RECORD_RE = re.compile(rb'\n[ \t]*(?:[Zz][Oo][Nn][Ee]|[Tt][Ee][Xx][Tt]|[Gg][Ee][Oo][Mm][Ee][Tt][Rr][Yy])\b')
+# 数据块中的注释行
+_COMMENT_RE = re.compile(rb'^[ \t]*#.*$', re.MULTILINE)
+# 数据行的首字符
+_DATA_START = frozenset(b'0123456789+-.')
+# 以非有限值开头的数据行, 如 NaN、nan、Inf
+_NONFINITE_RE = re.compile(rb'(?:nan|inf(?:inity)?)(?:[\s,]|$)', re.IGNORECASE)
+
+
+class TecplotZone:
+    """
+    tecplot 单个zone的数据对象, 数据按列存储(每个变量对应一段连续内存)
+    Parameters
+    ----------
+    variables: 变量名列表
+    data: 二维数组, shape 为 (变量个数, 点数)
+    title: zone 标题
+    ijk: 有序zone的 (I, J, K) 维度
+    datapacking: 数据排列方式, POINT 或 BLOCK
+    auxdata: zone 的辅助数据(AUXDATA)
+    """
+    def __init__(self, variables, data, title=None, ijk=(1, 1, 1), datapacking='POINT', auxdata=None):
+        self.variables = list(variables)
+        self.data = data
+        self.title = title
+        self.i, self.j, self.k = ijk
+        self.datapacking = datapacking
+        self.auxdata = dict() if auxdata is None else auxdata
+        self._index = {name: idx for idx, name in enumerate(self.variables)}
+
+    def __getitem__(self, name):
+        """按变量名取出对应列(视图, 不拷贝)"""
+        if name not in self._index:
+            raise KeyError(
+                f"For key {name!r}, No corresponding variable, Optional key includes:\n {self.variables!r}"
+            )
+        return self.data[self._index[name]]
+
+    def __contains__(self, name):
+        return name in self._index
+
+    def __len__(self):
+        return self.data.shape[1]
+
+    def keys(self):
+        return list(self.variables)
+
+    @property
+    def shape(self):
+        """有序zone的数组维度, 按 (K, J, I) 顺序并去除长度为1的维度"""
+        return tuple(n for n in (self.k, self.j, self.i) if n > 1) or (len(self), )
+
+    def grid(self, *names):
+        """
+        按有序zone的维度取出变量的网格数组(视图, 不拷贝), 二维zone的shape为 (J, I)
+        可直接作为 contourf/pcolormesh 的曲线网格坐标与数据, 无需散点插值
+        Returns
+        -------
+        单个变量时返回数组, 多个变量时返回数组列表
+        """
+        grids = [self[name].reshape(self.shape) for name in names]
+        return grids[0] if len(grids) == 1 else grids
+
+
+class TecplotDataset:
+    """
+    tecplot 数据集对象
+    Parameters
+    ----------
+    title: 数据集标题
+    variables: 变量名列表
+    zones: TecplotZone 列表
+    auxdata: 数据集的辅助数据(DATASETAUXDATA)
+    """
+    def __init__(self, title, variables, zones, auxdata=None):
+        self.title = title
+        self.variables = list(variables)
+        self.zones = zones
+        self.auxdata = dict() if auxdata is None else auxdata
+
+    def __getitem__(self, key):
+        """整数索引取zone; 字符串索引取唯一zone中的变量"""
+        if isinstance(key, int):
+            return self.zones[key]
+        if len(self.zones) != 1:
+            raise KeyError(
+                f"Dataset contains {len(self.zones)} zones, select a zone by index before key {key!r}"
+            )
+        return self.zones[0][key]
+
+    def __len__(self):
+        return len(self.zones)
+
+    def __iter__(self):
+        return iter(self.zones)
+
+
+def read_tecplot(file, dtype=np.float64, cache=False, cache_dir=None):
+    """
+    读取 tecplot ASCII 数据文件
+    Parameters
+    ----------
+    file: 文件路径
+    dtype: 数值数据类型
+    cache: 是否使用二进制缓存. 为True时优先以内存映射方式加载有效的缓存(数组只读),
+        缓存不存在或源文件已修改时重新解析并写入缓存
+    cache_dir: 缓存目录, 为None时缓存文件与源文件放在同一目录下
+
+    Returns
+    -------
+    TecplotDataset
+    """
+    if cache:
+        from .cache import load_cache, write_cache, source_key
+        dataset = load_cache(file, dtype, cache_dir)
+        if dataset is not None:
+            return dataset
+        # 缓存键在读取前获取: 读取后源文件被修改时, 缓存键与新文件不一致, 下次读取时重新解析
+        key = source_key(file, dtype)
+    with open(file, 'rb') as f:
+        raw = f.read()
+    dataset = parse_tecplot(raw, dtype)
+    if cache:
+        try:
+            write_cache(file, dataset, dtype, cache_dir, key=key)
+        except OSError as e:
+            warnings.warn(f"Failed to write tecplot cache for {file!r}: {e}")
+    return dataset
+
+
+def parse_tecplot(raw: bytes, dtype=np.float64):
+    """
+    解析 tecplot ASCII 文本内容: 逐行解析头部记录, 数值块整体一次性解析
+    Parameters
+    ----------
+    raw: 文件的字节内容
+    dtype: 数值数据类型
+
+    Returns
+    -------
+    TecplotDataset
+    """
+    title, variables, zones, auxdata = None, [], [], dict()
+    zone_header = None  # 当前zone的头部信息
+    last_key = None
+    pos, size = 0, len(raw)
+    while pos < size:
+        end = raw.find(b'\n', pos)
+        end = size if end == -1 else end
+        line = raw[pos:end].strip()
+        if not line or line[:1] == b'#':
+            pos = end + 1
+            continue
+        # 数据块: 一直延续到下一条 ZONE/TEXT/GEOMETRY 记录
+        if line[0] in _DATA_START or _NONFINITE_RE.match(line):
+            if not variables:
+                raise ValueError(f"Data block at byte {pos} appears before 'VARIABLES' record")
+            match = _RECORD_RE.search(raw, pos)
+            stop = size if match is None else match.start() + 1
+            header = dict(params=dict(), auxdata=dict()) if zone_header is None else zone_header
+            zones.append(_build_zone(header, variables, raw[pos:stop], dtype))
+            zone_header, last_key = None, None
+            pos = stop
+            continue
+        text = line.decode('utf-8', 'replace')
+        key = text.split('=', 1)[0].split(None, 1)[0].upper() if text[0] != '"' else None
+        if key == 'TITLE' and zone_header is None:
+            quoted = _QUOTED_RE.findall(text)
+            title = quoted[0] if quoted else text.split('=', 1)[1].strip()
+        elif key == 'VARIABLES':
+            variables = _parse_variables(text.split('=', 1)[1])
+        elif key is None and last_key == 'VARIABLES':
+            # VARIABLES 记录跨越多行
+            variables.extend(_parse_variables(text))
+        elif key == 'ZONE':
+            zone_header = dict(params=_parse_pairs(text[4:]), auxdata=dict())
+        elif key in ('AUXDATA', 'DATASETAUXDATA'):
+            name, _, value = text.split(None, 1)[1].partition('=')
+            value = value.strip()
+            value = value[1:-1] if value[:1] == value[-1:] == '"' else value
+            target = zone_header['auxdata'] if key == 'AUXDATA' and zone_header is not None else auxdata
+            target[name.strip()] = value
+        if key is not None:
+            last_key = key
+        pos = end + 1
+
+    return TecplotDataset(title, variables, zones, auxdata)
+
+
+def _parse_variables(text):
+    """解析变量名列表, 支持带引号和不带引号两种写法"""
+    quoted = _QUOTED_RE.findall(text)
+    if quoted:
+        return quoted
+    return [name for name in re.split(r'[,\s]+', text) if name]
+
+
+def _parse_pairs(text):
+    """解析 KEY=VALUE 形式的参数, 键统一转换为大写"""
+    params = dict()
+    for k, v in _PAIR_RE.findall(text):
+        params[k.upper()] = v[1:-1] if v[:1] == '"' else v
+    return params
+
+
+def _parse_block(block: bytes, dtype):
+    """
+    一次性解析数值块
+    兼容 Fortran 输出中省略 E 的三位指数(如 9.324-132), 通过向量化定位后补充 E
+    """
+    if b'#' in block:
+        block = _COMMENT_RE.sub(b'', block)
+    if b',' in block:
+        block = block.replace(b',', b' ')
+    buf = np.frombuffer(block, dtype=np.uint8)
+    prev, cur = buf[:-1], buf[1:]
+    is_sign = (cur == ord('+')) | (cur == ord('-'))
+    after_digit = ((prev >= ord('0')) & (prev <= ord('9'))) | (prev == ord('.'))
+    missing_e = is_sign & after_digit
+    if missing_e.any():
+        block = np.insert(buf, np.flatnonzero(missing_e) + 1, ord('E')).tobytes()
+    try:
+        # 每行数值个数一致时(POINT 排列), 使用 loadtxt 的C解析器
+        return np.loadtxt(io.BytesIO(block), dtype=dtype, ndmin=2).ravel()
+    except ValueError:
+        # 每行数值个数不一致时(如 BLOCK 排列按行折叠), 退回到按空白分隔逐值解析
+        return np.fromstring(block, dtype=dtype, sep=' ')
+
+
+def _build_zone(header, variables, block, dtype):
+    """根据zone头部信息将数值块整理为按列存储的 TecplotZone"""
+    params = header['params']
+    values = _parse_block(block, dtype)
+    n_vars = len(variables)
+    i, j, k = (int(params.get(name, 1)) for name in ('I', 'J', 'K'))
+    if 'I' not in params and 'J' not in params and 'K' not in params:
+        i = values.size // n_vars
+    n_points = i * j * k
+    if values.size != n_points * n_vars:
+        raise ValueError(
+            f"Zone {params.get('T')!r} expects {n_points} points x {n_vars} variables = {n_points * n_vars} values,"
+            f" but {values.size} values were read"
+        )
+    packing = params.get('DATAPACKING', params.get('F', 'POINT')).upper()
+    if packing == 'POINT':
+        # 转置为按列存储, 使每个变量在内存中连续
+        data = np.ascontiguousarray(values.reshape(n_points, n_vars).T)
+    elif packing == 'BLOCK':
+        data = values.reshape(n_vars, n_points)
+    else:
+        raise ValueError(
+            f"Unsupported datapacking {packing!r}, Optional values include 'POINT'、'BLOCK'"
+        )
+    return TecplotZone(variables, data, params.get('T'), (i, j, k), packing, header['auxdata'])
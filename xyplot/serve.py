@@ -0,0 +1,534 @@
+"""
+常驻绘图服务: 由预热的工作进程池执行绘图, 避免每次绘图都重新启动解释器、导入 matplotlib 与加载字体缓存
+    python -m xyplot.serve --port 8765 -j 4
+    python -m xyplot.serve --unix /tmp/xyplot.sock -j 4
+    python -m xyplot.serve --port 8765 --data-root /data/simulations
+
+    请求: POST /render, 请求体为 JSON(或 Content-Type 为 application/x-yaml 时为 YAML):
+        {
+            "config": {...},        与 XyPlotDirector 相同的绘图配置
+            "format": "png",        输出格式, 默认 png
+            "dpi": 100,             输出分辨率, 默认为画布分辨率
+            "timeout": 30           本次请求的超时时间(秒), 默认为服务的超时设置
+        }
+        配置中可使用数据引用代替实际数据, 在工作进程中读取:
+            {"$tecplot": "file.dat", "var": "X [R]", "zone": 0, "grid": true}    tecplot 文件中的变量
+            {"$npy": "file.npy"}                                                numpy 数组文件(内存映射)
+            {"$array": [[...], ...]}                                            转换为 numpy 数组
+            {"$shm": "psm_xxx", "shape": [m, n], "dtype": "<f8"}               共享内存中的数组(零拷贝, 见 Shared)
+        文件引用的路径相对于 --data-root 解析, 超出该目录(包括经由符号链接)的路径被拒绝, 未指定 --data-root 时
+        不接受文件引用; tecplot 二进制缓存文件(.xycache)只在指定 --tecplot-cache 时写入
+    响应: 200 图像内容; 400 配置或数据错误; 413 请求体超过 --max-body; 500 工作进程异常退出;
+        503 排队已满(背压, 附带 Retry-After); 504 绘图超时
+    GET /health 返回工作进程与请求数的统计信息(启用 --cache-dir 时包括绘图结果缓存的命中/未命中次数)
+        curl --data @request.json http://127.0.0.1:8765/render -o out.png
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import queue
+import socketserver
+import sys
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+__author__ = 'Rookie'
+__all__ = [
+    'WorkerPool',           # 预热的绘图工作进程池
+    'RenderServer',         # HTTP 绘图服务
+    'UnixRenderServer',     # Unix 套接字上的绘图服务
+    'serve',                # 启动绘图服务
+    'resolve_refs',         # 将配置中的数据引用替换为实际数据
+    'confine_refs',         # 将配置中文件引用的路径限制在数据目录内
+]
+
+MIME_TYPES = dict(png='image/png', pdf='application/pdf', svg='image/svg+xml', jpg='image/jpeg', jpeg='image/jpeg',
+                  eps='application/postscript', ps='application/postscript', raw='application/octet-stream',
+                  rgba='application/octet-stream')
+MAX_BODY = 64 * 2 ** 20     # 默认的请求体大小上限(字节)
+
+
+class ServerBusy(Exception):
+    """排队的请求数已达上限"""
+
+
+class RenderTimeout(Exception):
+    """绘图超时"""
+
+
+class RenderError(Exception):
+    """绘图失败(配置或数据错误)"""
+
+
+class WorkerLost(RenderError):
+    """工作进程异常退出"""
+
+
+class RequestTooLarge(Exception):
+    """请求体超过大小上限"""
+
+
+FILE_REFS = ('$tecplot', '$npy')    # 以文件路径引用数据的引用格式
+
+
+def data_file(file, data_root):
+    """
+    将文件引用的路径相对于数据目录解析为真实路径(展开符号链接)
+    Raises
+    ------
+    ValueError: 未指定数据目录, 或路径超出数据目录
+    """
+    if data_root is None:
+        raise ValueError("File references are disabled, start the server with --data-root to enable them")
+    root = os.path.realpath(data_root)
+    path = os.path.realpath(os.path.join(root, os.fspath(file)))
+    if os.path.commonpath([root, path]) != root:
+        raise ValueError(f"File reference {file!r} is outside the data root")
+    return path
+
+
+def confine_refs(value, data_root):
+    """
+    将配置中文件引用的路径替换为数据目录内的真实路径(见 data_file), 其它内容不变
+    Parameters
+    ----------
+    value: 绘图配置
+    data_root: 数据目录, 为None时配置中不能包含文件引用
+    """
+    if isinstance(value, dict):
+        ref = next((k for k in FILE_REFS if k in value), None)
+        if ref is not None:
+            return dict(value, **{ref: data_file(value[ref], data_root)})
+        return {k: confine_refs(v, data_root) for k, v in value.items()}
+    if isinstance(value, list):
+        return [confine_refs(v, data_root) for v in value]
+    return value
+
+
+def resolve_refs(value, datasets=None, data_root=None, tecplot_cache=False):
+    """
+    将配置中的数据引用替换为实际数据, 引用格式见模块说明
+    Parameters
+    ----------
+    value: 绘图配置
+    datasets: 已读取的 tecplot 数据缓存 {(文件路径, 修改时间): TecplotDataset}, 为None时不缓存
+    data_root: 文件引用所在的数据目录, 超出该目录的路径被拒绝(ValueError), 为None时不接受文件引用
+    tecplot_cache: 是否读取/写入 tecplot 二进制缓存文件(与数据文件位于同一目录)
+    """
+    if isinstance(value, dict):
+        if '$tecplot' in value:
+            from .io import read_tecplot
+            file = data_file(value['$tecplot'], data_root)
+            key = (file, os.path.getmtime(file))
+            dataset = None if datasets is None else datasets.get(key)
+            if dataset is None:
+                dataset = read_tecplot(file, cache=tecplot_cache)
+                if datasets is not None:
+                    datasets[key] = dataset
+                    while len(datasets) > 8:
+                        datasets.popitem(last=False)
+            zone = dataset[value.get('zone', 0)]
+            return zone.grid(value['var']) if value.get('grid', True) else zone[value['var']]
+        if '$npy' in value:
+            import numpy as np
+            return np.load(data_file(value['$npy'], data_root), mmap_mode='r')
+        if '$array' in value:
+            import numpy as np
+            return np.asarray(value['$array'], dtype=value.get('dtype'))
+        if '$shm' in value:
+            # 调度时由 method_call 解析为映射共享内存的数组视图, 绘图完成后解除映射
+            from .Shared import SharedArray
+            return SharedArray.from_ref(value)
+        return {k: resolve_refs(v, datasets, data_root, tecplot_cache) for k, v in value.items()}
+    if isinstance(value, list):
+        return [resolve_refs(v, datasets, data_root, tecplot_cache) for v in value]
+    return value
+
+
+def _worker_main(conn, max_renders, data_root=None, tecplot_cache=False):
+    """工作进程: 预热(导入 matplotlib、加载字体缓存)后循环执行绘图请求, 完成 max_renders 次后退出"""
+    import matplotlib
+    matplotlib.use('Agg', force=True)
+    from .xyplotBuilder import XyPlotDirector
+    from .Shared import detach_all
+    with XyPlotDirector(axes=dict(plot=dict(args=([0, 1], [0, 1])), title='warm', xlabel='x')) as director:
+        director.to_bytes()
+    datasets = OrderedDict()
+    conn.send('ready')
+    renders = 0
+    while max_renders is None or renders < max_renders:
+        try:
+            request = conn.recv()
+        except EOFError:
+            break
+        if request is None:
+            break
+        try:
+            config = resolve_refs(request['config'], datasets, data_root, tecplot_cache)
+            with XyPlotDirector(**config) as director:
+                result = ('ok', director.to_bytes(request.get('format', 'png'), request.get('dpi')))
+        except Exception as e:
+            result = ('error', f"{type(e).__name__}: {e}")
+        finally:
+            # 解除本次请求映射的共享数组, 由创建者负责删除
+            detach_all()
+        conn.send(result)
+        renders += 1
+    conn.close()
+
+
+class _Worker:
+    """工作进程及其通信管道"""
+    def __init__(self, context, max_renders, data_root=None, tecplot_cache=False):
+        self.conn, child = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child, max_renders, data_root, tecplot_cache),
+                                       daemon=True)
+        self.process.start()
+        child.close()
+        self.renders = 0
+        self.max_renders = max_renders
+
+    def wait_ready(self, timeout=None):
+        try:
+            ready = self.conn.poll(timeout) and self.conn.recv() == 'ready'
+        except (EOFError, OSError):
+            ready = False
+        if not ready:
+            raise WorkerLost("Worker failed to start")
+
+    @property
+    def exhausted(self):
+        return self.max_renders is not None and self.renders >= self.max_renders
+
+    def stop(self, kill=False):
+        if kill:
+            self.process.kill()
+        else:
+            try:
+                self.conn.send(None)
+            except OSError:
+                pass
+        self.process.join(5)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+class WorkerPool:
+    """
+    预热的绘图工作进程池
+    Parameters
+    ----------
+    processes: 工作进程数, 为None时使用CPU核数
+    max_queue: 等待空闲工作进程的最大请求数, 超过时新请求直接被拒绝(ServerBusy)
+    timeout: 默认的请求超时时间(秒, 包括排队等待时间), 超时的工作进程被终止并重新启动
+    max_renders: 每个工作进程完成该次数的绘图后退出并由新进程替换, 以限制内存增长, 为None时不替换
+    start_method: 进程启动方式, 默认为 spawn(不继承服务进程中的线程与锁)
+    data_root: 配置中文件引用($tecplot/$npy)所在的数据目录, 超出该目录的路径被拒绝, 为None时不接受文件引用
+    tecplot_cache: 是否为引用的 tecplot 文件读取/写入二进制缓存文件(.xycache, 与数据文件位于同一目录)
+    """
+    def __init__(self, processes=None, max_queue=16, timeout=60.0, max_renders=200, start_method='spawn',
+                 data_root=None, tecplot_cache=False):
+        self.processes = (os.cpu_count() or 1) if processes is None else processes
+        self.timeout = timeout
+        self.max_renders = max_renders
+        self.data_root = None if data_root is None else os.path.realpath(data_root)
+        self.tecplot_cache = tecplot_cache
+        self._context = multiprocessing.get_context(start_method)
+        self._slots = threading.BoundedSemaphore(self.processes + max_queue)
+        self._idle = queue.Queue()
+        self._workers = set()
+        self._lock = threading.Lock()
+        self._closed = False
+        self.stats = dict(requests=0, rendered=0, errors=0, rejected=0, timeouts=0, recycled=0)
+        for _ in range(self.processes):
+            self._spawn(wait=False)
+        for worker in list(self._workers):
+            worker.wait_ready(timeout=120)
+            self._idle.put(worker)
+
+    def _spawn(self, wait=True):
+        """启动新的工作进程, wait 为True时在后台线程中等待其预热完成后加入空闲队列"""
+        worker = _Worker(self._context, self.max_renders, self.data_root, self.tecplot_cache)
+        with self._lock:
+            self._workers.add(worker)
+        if wait:
+            def ready():
+                try:
+                    worker.wait_ready(timeout=120)
+                except RenderError:
+                    self._retire(worker, kill=True)
+                    return
+                self._idle.put(worker)
+            threading.Thread(target=ready, daemon=True).start()
+        return worker
+
+    def _retire(self, worker, kill=False, replace=False):
+        """停止工作进程, replace 为True时启动新的工作进程替换"""
+        with self._lock:
+            self._workers.discard(worker)
+        worker.stop(kill)
+        if replace and not self._closed:
+            self._spawn()
+
+    def render(self, config: dict, format: str = 'png', dpi=None, timeout=None) -> bytes:
+        """
+        在工作进程中绘图
+        Returns
+        -------
+        图像内容
+        """
+        timeout = self.timeout if timeout is None else timeout
+        deadline = None if timeout is None else time.monotonic() + timeout
+        self._count('requests')
+        if self._closed or not self._slots.acquire(blocking=False):
+            self._count('rejected')
+            raise ServerBusy("Too many queued render requests")
+        try:
+            try:
+                worker = self._idle.get(timeout=timeout)
+            except queue.Empty:
+                self._count('timeouts')
+                raise RenderTimeout(f"No idle worker within {timeout}s") from None
+            try:
+                worker.conn.send(dict(config=config, format=format, dpi=dpi))
+                remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+                if not worker.conn.poll(remaining):
+                    self._count('timeouts')
+                    self._retire(worker, kill=True, replace=True)
+                    raise RenderTimeout(f"Render did not finish within {timeout}s")
+                status, payload = worker.conn.recv()
+            except (EOFError, OSError) as e:
+                self._count('errors')
+                self._retire(worker, kill=True, replace=True)
+                raise WorkerLost(f"Worker exited unexpectedly: {e!r}") from None
+            worker.renders += 1
+            if worker.exhausted:
+                self._count('recycled')
+                self._retire(worker, replace=True)
+            else:
+                self._idle.put(worker)
+            if status != 'ok':
+                self._count('errors')
+                raise RenderError(payload)
+            self._count('rendered')
+            return payload
+        finally:
+            self._slots.release()
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def health(self) -> dict:
+        """工作进程与请求数的统计信息"""
+        with self._lock:
+            return dict(self.stats, workers=len(self._workers), idle=self._idle.qsize())
+
+    def close(self):
+        """停止全部工作进程"""
+        self._closed = True
+        with self._lock:
+            workers = list(self._workers)
+        for worker in workers:
+            self._retire(worker)
+        while not self._idle.empty():
+            self._idle.get_nowait()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """HTTP 请求处理: POST /render, GET /health"""
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        if self.path.rstrip('/') != '/health':
+            return self._reply(404, b'Not found')
+        health = self.server.pool.health()
+        if self.server.cache is not None:
+            health['cache'] = self.server.cache.info()
+        self._reply(200, json.dumps(health).encode(), 'application/json')
+
+    def do_POST(self):
+        if self.path.rstrip('/') != '/render':
+            return self._reply(404, b'Not found')
+        try:
+            request = self._read_request()
+            fmt = request.get('format', 'png')
+            data = self._render(request, fmt)
+        except RequestTooLarge as e:
+            # 请求体未被读取, 不能继续在该连接上处理后续请求
+            self.close_connection = True
+            return self._reply(413, str(e).encode(), headers={'Connection': 'close'})
+        except ServerBusy as e:
+            return self._reply(503, str(e).encode(), headers={'Retry-After': '1'})
+        except RenderTimeout as e:
+            return self._reply(504, str(e).encode())
+        except WorkerLost as e:
+            return self._reply(500, str(e).encode())
+        except (RenderError, ValueError, KeyError, TypeError, OSError) as e:
+            return self._reply(400, str(e).encode())
+        self._reply(200, data, MIME_TYPES.get(fmt, 'application/octet-stream'))
+
+    def _render(self, request, fmt):
+        """使用绘图结果缓存(如果启用)或在工作进程中绘图"""
+        # 文件引用在计算缓存键(读取文件标识)之前限制在数据目录内
+        config = confine_refs(request['config'], self.server.pool.data_root)
+        cache, key = self.server.cache, None
+        if cache is not None:
+            from .RenderCache import fingerprint
+            key = fingerprint(config, format=fmt, dpi=request.get('dpi'))
+            data = cache.lookup(key)
+            if data is not None:
+                return data
+        data = self.server.pool.render(config, fmt, request.get('dpi'), request.get('timeout'))
+        if key is not None:
+            cache.put(key, data)
+        return data
+
+    def _read_request(self):
+        """读取 JSON/YAML 请求体, 超过大小上限时不读取"""
+        length = int(self.headers.get('Content-Length', 0))
+        if length < 0:
+            raise ValueError(f"Invalid Content-Length {length}")
+        if self.server.max_body is not None and length > self.server.max_body:
+            raise RequestTooLarge(f"Request body of {length} bytes exceeds the limit of {self.server.max_body} bytes")
+        body = self.rfile.read(length)
+        if 'yaml' in self.headers.get('Content-Type', ''):
+            try:
+                import yaml
+            except ImportError:
+                raise ValueError("YAML requests require PyYAML to be installed") from None
+            request = yaml.safe_load(body)
+        else:
+            request = json.loads(body)
+        if not isinstance(request, dict) or not isinstance(request.get('config'), dict):
+            raise ValueError("Request body must be an object with a 'config' object")
+        return request
+
+    def _reply(self, code, body, content_type='text/plain; charset=utf-8', headers=None):
+        self.send_response(code)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for k, v in (headers or dict()).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def address_string(self):
+        # Unix 套接字的客户端地址为空字符串
+        return self.client_address[0] if isinstance(self.client_address, tuple) else 'unix'
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class RenderServer(ThreadingHTTPServer):
+    """
+    HTTP 绘图服务, 每个连接在独立线程中处理, 绘图在工作进程池中执行
+    Parameters
+    ----------
+    address: (host, port)
+    pool: WorkerPool
+    verbose: 是否输出访问日志
+    cache: 绘图结果缓存 RenderCache, 配置(含数据引用的文件标识)与输出参数相同的请求直接返回缓存结果
+    max_body: 请求体大小上限(字节), 超过时返回 413, 为None时不限制
+    """
+    daemon_threads = True
+
+    def __init__(self, address, pool: WorkerPool, verbose=False, cache=None, max_body=MAX_BODY):
+        self.pool = pool
+        self.verbose = verbose
+        self.cache = cache
+        self.max_body = max_body
+        super().__init__(address, _Handler)
+
+
+class UnixRenderServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Unix 套接字上的绘图服务, 参数与 RenderServer 一致"""
+    daemon_threads = True
+
+    def __init__(self, path, pool: WorkerPool, verbose=False, cache=None, max_body=MAX_BODY):
+        self.pool = pool
+        self.verbose = verbose
+        self.cache = cache
+        self.max_body = max_body
+        if os.path.exists(path):
+            os.unlink(path)
+        super().__init__(path, _Handler)
+
+
+def serve(host='127.0.0.1', port=8765, unix=None, processes=None, max_queue=16, timeout=60.0, max_renders=200,
+          verbose=False, cache_dir=None, cache_bytes=512 * 2 ** 20, data_root=None, tecplot_cache=False,
+          max_body=MAX_BODY):
+    """
+    启动绘图服务, 直到收到 KeyboardInterrupt
+    Parameters
+    ----------
+    host, port: 监听地址
+    unix: Unix 套接字路径, 指定时不监听 TCP 端口
+    processes, max_queue, timeout, max_renders: 见 WorkerPool
+    verbose: 是否输出访问日志
+    cache_dir: 绘图结果缓存目录, 为None时不使用缓存
+    cache_bytes: 绘图结果缓存的总大小上限(字节)
+    data_root, tecplot_cache: 见 WorkerPool
+    max_body: 请求体大小上限(字节), 为None时不限制
+    """
+    cache = None
+    if cache_dir is not None:
+        from .RenderCache import RenderCache
+        cache = RenderCache(cache_dir, cache_bytes)
+    with WorkerPool(processes, max_queue, timeout, max_renders, data_root=data_root,
+                    tecplot_cache=tecplot_cache) as pool:
+        if unix:
+            server = UnixRenderServer(unix, pool, verbose, cache, max_body)
+        else:
+            server = RenderServer((host, port), pool, verbose, cache, max_body)
+        where = unix or f"http://{host}:{server.server_address[1]}"
+        print(f"xyplot render server on {where} with {pool.processes} workers", file=sys.stderr)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            if unix and os.path.exists(unix):
+                os.unlink(unix)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m xyplot.serve', description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1', help='监听地址, 默认 127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765, help='监听端口, 默认 8765')
+    parser.add_argument('--unix', default=None, help='Unix 套接字路径, 指定时不监听 TCP 端口')
+    parser.add_argument('-j', '--processes', type=int, default=None, help='工作进程数, 默认为CPU核数')
+    parser.add_argument('--max-queue', type=int, default=16, help='等待空闲工作进程的最大请求数')
+    parser.add_argument('--timeout', type=float, default=60.0, help='默认的请求超时时间(秒)')
+    parser.add_argument('--max-renders', type=int, default=200, help='每个工作进程绘图该次数后被替换, 0 表示不替换')
+    parser.add_argument('-v', '--verbose', action='store_true', help='输出访问日志')
+    parser.add_argument('--cache-dir', default=None, help='绘图结果缓存目录, 默认不使用缓存')
+    parser.add_argument('--cache-size', type=float, default=512, help='绘图结果缓存的总大小上限(MB), 默认 512')
+    parser.add_argument('--data-root', default=None, help='文件引用($tecplot/$npy)所在的数据目录, 默认不接受文件引用')
+    parser.add_argument('--tecplot-cache', action='store_true',
+                        help='为引用的 tecplot 文件读取/写入二进制缓存文件(.xycache, 需要数据目录可写)')
+    parser.add_argument('--max-body', type=float, default=MAX_BODY / 2 ** 20,
+                        help='请求体大小上限(MB), 超过时返回 413, 0 表示不限制, 默认 64')
+    args = parser.parse_args(argv)
+    serve(args.host, args.port, args.unix, args.processes, args.max_queue, args.timeout,
+          args.max_renders or None, args.verbose, args.cache_dir, int(args.cache_size * 2 ** 20),
+          args.data_root, args.tecplot_cache, int(args.max_body * 2 ** 20) or None)
+
+
+if __name__ == '__main__':
+    main()
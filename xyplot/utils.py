@@ -1,11 +1,84 @@
+import threading
+from contextlib import nullcontext
 from functools import wraps
 from typing import Union
 
 from .Adapter import XyPlotAdapter
 from .cfg_names import ARGS_NAME
+from .Shared import resolve_handles
 
 __author__ = 'Rookie'
-__all__ = ['merge', 'xy_call', 'method_call']
+__all__ = ['merge', 'xy_call', 'method_call', 'call_path', 'CallRecorder']
+
+_NULL_SCOPE = nullcontext()
+
+
+class _CallState(threading.local):
+    """
+    调度状态, 每个线程独立, 多个线程同时绘图时互不影响
+        recorders: 当前生效的调度记录器
+        path: 当前调度所在的配置路径(仅在存在调度记录器时维护)
+        profilers: 当前生效的性能分析器(见 Profiler.py), 在配置路径的每一层进入/退出时计时
+    """
+    def __init__(self):
+        self.recorders = []
+        self.path = []
+        self.profilers = []
+
+
+_STATE = _CallState()
+
+
+class CallRecorder:
+    """
+    调度记录器: 在 with 语句块内记录每一次调度执行的配置路径、调用对象、参数与返回值
+    Parameters
+    ----------
+    records: 记录结果 {配置路径: (调用对象, args, kwargs, 返回值)}, 为None时新建字典
+    """
+    def __init__(self, records: dict = None):
+        self.records = dict() if records is None else records
+
+    def __enter__(self):
+        _STATE.recorders.append(self)
+        return self
+
+    def __exit__(self, *exc):
+        _STATE.recorders.remove(self)
+
+    def record(self, path, obj, args, kwargs, ret_obj):
+        self.records[path] = (obj, args, kwargs, ret_obj)
+
+
+class _PathScope:
+    """配置路径的一层"""
+    def __init__(self, name):
+        self.name = f"[{name}]" if isinstance(name, int) else name
+
+    def __enter__(self):
+        _STATE.path.append(self.name)
+        for profiler in _STATE.profilers:
+            profiler.push()
+
+    def __exit__(self, *exc):
+        if _STATE.profilers:
+            path = current_path()
+            for profiler in _STATE.profilers:
+                profiler.pop(path)
+        _STATE.path.pop()
+
+
+def call_path(name: Union[str, int]):
+    """
+    进入配置路径的下一层, 整数表示列表序号, 例如 axes -> [0] -> Branch -> contourf 对应 axes[0].Branch.contourf
+    不存在调度记录器时返回空的上下文, 不产生额外开销
+    """
+    return _PathScope(name) if _STATE.recorders else _NULL_SCOPE
+
+
+def current_path():
+    """当前调度所在的配置路径"""
+    return ''.join(name if name[0] == '[' else f".{name}" for name in _STATE.path).lstrip('.')
 
 
 def merge(dict_1, dict_2):
@@ -25,6 +98,23 @@ def merge(dict_1, dict_2):
     return result
 
 
+def _freeze(value):
+    """将配置转换为可哈希的缓存键(字典按键排序, 列表/数组转换为元组), 无法哈希时返回None"""
+    def freeze(v):
+        if isinstance(v, dict):
+            return tuple(sorted((k, freeze(i)) for k, i in v.items()))
+        if isinstance(v, (list, tuple)):
+            return tuple(freeze(i) for i in v)
+        if hasattr(v, 'tolist') and hasattr(v, 'shape'):
+            return freeze(v.tolist())
+        hash(v)
+        return v
+    try:
+        return freeze(value)
+    except TypeError:
+        return None
+
+
 def xy_call(adapter=None):
 
     def decorator(method):
@@ -47,17 +137,20 @@ def xy_call(adapter=None):
             if adapter is None:     # 当不存在适配器时
                 for key in obj_map.keys():
                     if key in kwargs:
-                        method_call(obj_map[key], kwargs[key])
+                        with call_path(key):
+                            method_call(obj_map[key], kwargs[key])
             elif issubclass(adapter, XyPlotAdapter):  # 当使用 XyPlotAdapter 适配器时
                 for key in obj_map.keys():
                     if key in kwargs:
                         obj, axes = obj_map[key]
-                        method_call(XyPlotAdapter, kwargs[key], obj, axes)
+                        with call_path(key):
+                            method_call(XyPlotAdapter, kwargs[key], obj, axes)
             else:
                 raise TypeError(
                     f"{adapter!r} TypeError"
                 )
 
+        inner._plan_trace = True    # 编译渲染计划时可使用代理对象展开调度
         return inner
     return decorator
 
@@ -78,20 +171,33 @@ def method_call(obj, parameter: Union[dict, tuple, list, ], *args):
     # 定义调度方法的返回值
     ret_obj = None
     call_args = list(args)
-    # 当parameter是字典类型时
+    # 当parameter是字典类型时(只读取不修改parameter, 配置中的数组等对象按引用传递)
     if isinstance(parameter, dict):
-        if ARGS_NAME in parameter.keys():
+        if ARGS_NAME in parameter:
             if isinstance(parameter[ARGS_NAME], (list, tuple)):
-                call_args.extend(parameter.pop(ARGS_NAME))
+                call_args.extend(parameter[ARGS_NAME])
             else:
-                call_args.append(parameter.pop(ARGS_NAME))
+                call_args.append(parameter[ARGS_NAME])
+            parameter = {k: v for k, v in parameter.items() if k != ARGS_NAME}
+        # 共享数组句柄(见 Shared.SharedArray)解析为映射共享数据的数组视图
+        call_args = [resolve_handles(v) for v in call_args]
+        parameter = {k: resolve_handles(v) for k, v in parameter.items()}
         ret_obj = obj(*call_args, **parameter)
     # 当parameter是数组时, 进行遍历调度(递归)
     elif isinstance(parameter, (list, tuple)):
-        for par in parameter:
-            method_call(obj, par, *args)
+        for i, par in enumerate(parameter):
+            with call_path(i):
+                method_call(obj, par, *args)
+        return ret_obj
     # ...
     else:
-        ret_obj = obj(parameter) if len(args) == 0 else obj(parameter, *args)
+        call_args.insert(0, resolve_handles(parameter))
+        parameter = dict()
+        ret_obj = obj(*call_args)
+    # 存在调度记录器时, 记录本次调度
+    if _STATE.recorders and obj is not XyPlotAdapter:
+        path = current_path()
+        for recorder in _STATE.recorders:
+            recorder.record(path, obj, tuple(call_args), parameter, ret_obj)
 
     return ret_obj
@@ -1,14 +1,21 @@
-import copy
+import io
+import os
 from abc import ABCMeta, abstractmethod
+from collections import OrderedDict
+from contextlib import nullcontext
 from typing import Optional
 
 import matplotlib as mpl
-import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
 
-from .utils import method_call
+from .utils import method_call, call_path, CallRecorder, _freeze
 from .Adapter import XyPlotAdapter
 from .Set import SetFigure, SetAxes
-from .cfg_names import SET_RC_NAME, AXES_NAME, SUBPLOT_NAME, SUBPLOT2GRID_NAME, SET_FIG_NAME, ADD_AXES_NAME, INIT_NAME
+from .Plan import PlanTarget
+from .cfg_names import SET_RC_NAME, AXES_NAME, SUBPLOT_NAME, SUBPLOT2GRID_NAME, SET_FIG_NAME, ADD_AXES_NAME, \
+    INIT_NAME, ARGS_NAME, INCREMENTAL_NAME
 
 __author__ = 'Rookie'
 __all__ = [
@@ -18,8 +25,14 @@ __all__ = [
     'Subplot2gridBuilder',  # 使用subplot2grid创建绘制axes子区域类
     'AddAxesBuilder',    # 使用add_axes 创建绘制axes子区域类
     'SetTempRc',        # 设置临时全局mpl.rcParams
+    'new_figure',       # 创建不受 pyplot 管理的画布对象
+    'validate_rc',      # 校验(并缓存) rcParams 配置
+    'remove_artist',    # 从画布中移除绘图对象
+    'replace_artist',   # 替换画布中的绘图对象
 ]
 
+FIGURE_GEOMETRY = ('height', 'width', 'dpi')    # 在创建子区域前预先设置的画布配置项
+
 
 class XyPlotDirector:
     """
@@ -47,6 +60,8 @@ class XyPlotDirector:
             dict类型， 使用subplot2grid创建axes对象并绘图, 具体使用方法与subplot同理
         add_axes:
             dict类型， 使用add_axes创建axes对象并绘图, 具体使用方法与subplot同理
+        incremental:
+            bool类型, 是否开启增量模式, 开启后记录各配置路径创建的绘图对象, 可通过 update 方法更新数据
     -------
     Example
         1. 绘制单个axes对象
@@ -72,6 +87,15 @@ class XyPlotDirector:
             >>>                 axes=(ax1_dict, ax2_dict)
             >>>                )
             >>> XyPlotDirector(subplot=subplot_dict).save('test.png')
+        3. 增量模式, 只更新数据
+            >>> xyplt = XyPlotDirector(incremental=True, axes=dict(plot=dict(args=(x, y1))))
+            >>> xyplt.update({'axes[0].plot': (x, y2)}).save('y2.png')
+        4. 渲染到内存, 不写入文件
+            >>> png = XyPlotDirector(axes=axes_dict).to_bytes('png', dpi=100)
+            >>> rgba = XyPlotDirector(axes=axes_dict).to_rgba()
+        5. 画布不受 pyplot 管理, 使用完毕后通过 close 或 with 语句释放
+            >>> with XyPlotDirector(axes=axes_dict) as xyplt:
+            >>>     xyplt.save('test.png')
 
     -------
     Returns
@@ -80,45 +104,267 @@ class XyPlotDirector:
     """
 
     def __init__(self, **kwargs):
-        kwargs = copy.deepcopy(kwargs)  # 由于执行该class时会修改kwargs内容, 所以要对其进行深拷贝
+        # 配置的调度过程不会修改kwargs内容, 配置中的数组等对象按引用传递, 无需拷贝
         self.figure = None
+        self.artists = dict()   # 增量模式下记录的 {配置路径: (调用对象, args, kwargs, 返回的绘图对象)}
         if len(kwargs):
             self.execute(**kwargs)
 
     def execute(self, **kwargs):
-        # 修改mpl.rcParams
-        tmp_rc = None
-        if SET_RC_NAME in kwargs:
-            tmp_rc = SetTempRc(**kwargs[SET_RC_NAME])
-        # 如果kwargs键中存在AXES_NAME, 则调度subplot方法构建axes子区域集
-        if AXES_NAME in kwargs:
-            self.figure = SubplotBuilder(self.figure, **kwargs[AXES_NAME])()
-        # 如果kwargs键中存在SUBPLOT_NAME, 则调度subplot方法构建axes子区域集
-        if SUBPLOT_NAME in kwargs:
-            self.figure = SubplotBuilder(self.figure, **kwargs[SUBPLOT_NAME])()
-        # 如果kwargs键中存在SUBPLOT2GRID_NAME, 则调度subplot2grid 方法构建axes子区域集
-        if SUBPLOT2GRID_NAME in kwargs:
-            self.figure = Subplot2gridBuilder(self.figure, **kwargs[SUBPLOT2GRID_NAME])()
-        # 如果kwargs键中存在ADD_AXES_NAME, 则调度fig.ADD_AXES_NAME 方法构建 axes 子区域集
-        if ADD_AXES_NAME in kwargs:
-            self.figure = AddAxesBuilder(self.figure, **kwargs[ADD_AXES_NAME])()
-        # 如果kwargs键中存在SET_FIG_NAME, 则调度SetFigure 方法构建
-        self.check()    # 在设置画布前先进行检查figure对象是否已经创建
-        if SET_FIG_NAME in kwargs:
-            SetFigure(self.figure, **kwargs[SET_FIG_NAME])
-        # 还原原有的mpl.rcParams
-        if SET_RC_NAME in kwargs:
-            tmp_rc.revert()
+        # 增量模式下记录各配置路径创建的绘图对象, 以便后续通过 update 方法更新数据
+        recorder = CallRecorder(self.artists) if kwargs.pop(INCREMENTAL_NAME, False) else nullcontext()
+        # 修改mpl.rcParams, 绘图完成后(包括绘图出错时)恢复到原本的设置
+        tmp_rc = SetTempRc(**kwargs[SET_RC_NAME]) if SET_RC_NAME in kwargs else nullcontext()
+        with tmp_rc, recorder:
+            # 预先设置画布尺寸与分辨率, 使绘图时(降采样、插值网格等)能够取得最终的像素尺寸
+            geometry = {k: v for k, v in kwargs.get(SET_FIG_NAME, dict()).items() if k in FIGURE_GEOMETRY}
+            if geometry and any(k in kwargs for k in (AXES_NAME, SUBPLOT_NAME, SUBPLOT2GRID_NAME, ADD_AXES_NAME)):
+                self.figure = new_figure() if self.figure is None else self.figure
+                with call_path(SET_FIG_NAME):
+                    SetFigure(self.figure, **geometry)
+            # 如果kwargs键中存在AXES_NAME, 则调度subplot方法构建axes子区域集
+            if AXES_NAME in kwargs:
+                with call_path(AXES_NAME):
+                    self.figure = SubplotBuilder(self.figure, **kwargs[AXES_NAME])()
+            # 如果kwargs键中存在SUBPLOT_NAME, 则调度subplot方法构建axes子区域集
+            if SUBPLOT_NAME in kwargs:
+                with call_path(SUBPLOT_NAME):
+                    self.figure = SubplotBuilder(self.figure, **kwargs[SUBPLOT_NAME])()
+            # 如果kwargs键中存在SUBPLOT2GRID_NAME, 则调度subplot2grid 方法构建axes子区域集
+            if SUBPLOT2GRID_NAME in kwargs:
+                with call_path(SUBPLOT2GRID_NAME):
+                    self.figure = Subplot2gridBuilder(self.figure, **kwargs[SUBPLOT2GRID_NAME])()
+            # 如果kwargs键中存在ADD_AXES_NAME, 则调度fig.ADD_AXES_NAME 方法构建 axes 子区域集
+            if ADD_AXES_NAME in kwargs:
+                with call_path(ADD_AXES_NAME):
+                    self.figure = AddAxesBuilder(self.figure, **kwargs[ADD_AXES_NAME])()
+            # 如果kwargs键中存在SET_FIG_NAME, 则调度SetFigure 方法构建
+            self.check()    # 在设置画布前先进行检查figure对象是否已经创建
+            if SET_FIG_NAME in kwargs:
+                with call_path(SET_FIG_NAME):
+                    SetFigure(self.figure, **kwargs[SET_FIG_NAME])
+
+    def update(self, data: dict):
+        """
+        增量更新: 将新的数据替换到已创建的绘图对象上, 不重新构建画布、子区域及其它设置
+        需要在创建时开启增量模式(incremental=True)
+        Parameters
+        ----------
+        data: {配置路径: 新的参数}, 配置路径如 'axes[0].plot'、'axes[0].Branch.contourf.init'、'subplot[1].title',
+            新的参数为 args 元组(替换原有的无关键字参数), 或与配置格式相同的字典(args 以及需要覆盖的关键字参数)
+            1. plot/scatter/pcolormesh/图像/文本 直接更新数据(set_data/set_offsets/set_array/set_text)
+            2. contourf/streamplot 等无法直接更新数据的对象, 移除后使用原有设置重新绘制,
+               并将对应的色卡重新关联到新的绘图对象上
+            色阶范围(norm)保持不变, 以便时间序列各帧之间颜色映射一致
+
+        Returns
+        -------
+        self
+        """
+        for path, parameter in data.items():
+            if path not in self.artists:
+                raise KeyError(
+                    f"For key {path!r}, No recorded artist (incremental mode required), Optional key includes:\n"
+                    f" {list(self.artists.keys())!r}"
+                )
+            obj, args, kwargs, artist = self.artists[path]
+            if isinstance(parameter, dict):
+                new_args = parameter.get(ARGS_NAME, args)
+                new_args = tuple(new_args) if isinstance(new_args, (list, tuple)) else (new_args, )
+                kwargs = dict(kwargs, **{k: v for k, v in parameter.items() if k != ARGS_NAME})
+            else:
+                new_args = tuple(parameter) if isinstance(parameter, (list, tuple)) else (parameter, )
+            # 降采样绘制的对象需要重新降采样, 不能直接更新数据
+            if 'decimate' in kwargs or not self.set_artist_data(artist, args, new_args, kwargs):
+                if hasattr(artist, 'norm') and 'norm' not in kwargs:
+                    # 沿用原有的 norm, 保持色阶范围以及色卡的刻度设置不变
+                    kwargs = dict(kwargs, norm=artist.norm)
+                new_artist = obj(*new_args, **kwargs)
+                self.relink_colorbars(artist, new_artist)
+                replace_artist(artist, new_artist)
+                artist = new_artist
+            self.artists[path] = (obj, new_args, kwargs, artist)
+        return self
 
     @staticmethod
-    def show():
-        """显示画布"""
-        plt.show()
+    def set_artist_data(artist, args, new_args, kwargs) -> bool:
+        """直接更新绘图对象的数据, 无法直接更新时返回False"""
+        from matplotlib.collections import PathCollection, QuadMesh
+        from matplotlib.image import AxesImage
+        from matplotlib.lines import Line2D
+        from matplotlib.text import Text
+        if isinstance(artist, list) and len(artist) == 1 and isinstance(artist[0], Line2D):
+            # plot(y) 或 plot(x, y)
+            line = artist[0]
+            if len(new_args) == 1:
+                line.set_data(np.arange(len(new_args[0])), new_args[0])
+            else:
+                line.set_data(new_args[0], new_args[1])
+        elif isinstance(artist, PathCollection) and len(new_args) >= 2:
+            artist.set_offsets(np.column_stack((np.ravel(new_args[0]), np.ravel(new_args[1]))))
+            if 'c' in kwargs and len(np.shape(kwargs['c'])):
+                artist.set_array(np.ravel(kwargs['c']))
+        elif isinstance(artist, QuadMesh) and len(new_args) == len(args) and \
+                all(a is b for a, b in zip(new_args[:-1], args[:-1])):
+            # 网格坐标不变时只更新数据
+            artist.set_array(new_args[-1])
+        elif isinstance(artist, AxesImage) and len(new_args) == len(args) and \
+                all(a is b for a, b in zip(new_args[:-1], args[:-1])):
+            # imshow(Z) 或 栅格方式的填色图(网格坐标不变时)
+            artist.set_data(new_args[-1])
+        elif isinstance(artist, Text):
+            artist.set_text(new_args[0])
+        else:
+            return False
+        return True
+
+    def relink_colorbars(self, old, new):
+        """将关联在旧绘图对象上的色卡重新关联到新的绘图对象"""
+        from matplotlib.colorbar import Colorbar
+        for path, (obj, args, kwargs, artist) in self.artists.items():
+            if isinstance(artist, Colorbar) and artist.mappable is old:
+                artist.update_normal(new)
 
     @staticmethod
-    def save(*args, **kwargs):
-        """保存画布"""
-        plt.savefig(*args, **kwargs)
+    def compile(config: Optional[dict] = None, **kwargs):
+        """
+        将绘图配置编译为可重复执行的渲染计划(RenderPlan), 配置键的检查与调度只在编译时进行一次
+        Parameters
+        ----------
+        config: 绘图配置, 与 XyPlotDirector 的 kwargs 一致, 数据可使用 Placeholder 占位
+        kwargs: 绘图配置, 与 config 合并
+
+        Returns
+        -------
+        RenderPlan
+        Example
+            >>> plan = XyPlotDirector.compile(axes=dict(plot=dict(args=(Placeholder('x'), Placeholder('y')))))
+            >>> for i, y in enumerate(series):
+            >>>     plan(x=x, y=y).save(f'{i}.png')
+        """
+        from .Plan import RenderPlan
+        return RenderPlan(**dict(config or dict(), **kwargs))
+
+    def show(self, *args, **kwargs):
+        """显示画布: 将画布交由 pyplot 的窗口管理器显示, 参数与 plt.show 一致"""
+        import matplotlib.pyplot as plt
+        self.check()
+        plt.figure(self.figure)
+        plt.show(*args, **kwargs)
+
+    def save(self, *args, **kwargs):
+        """保存画布, 参数与 Figure.savefig 一致"""
+        self.check()
+        with call_path('savefig'):
+            self.figure.savefig(*args, **kwargs)
+
+    def save_all(self, files, formats=None, dpi=None, bbox_inches=None, pad_inches=None, **kwargs) -> list:
+        """
+        只进行一次布局, 将画布依次保存为多个文件/格式
+        布局引擎(constrained/tight)与 bbox_inches='tight' 的裁剪范围只计算一次, 之后的保存固定使用该布局,
+        各格式的结果与分别调用 save 一致
+        Parameters
+        ----------
+        files: 文件路径(列表), 格式由扩展名确定; 或与 formats 一起使用的不带扩展名的路径
+        formats: 格式列表, 例如 ('png', 'pdf', 'svg'), 指定时 files 为不带扩展名的路径
+        dpi, bbox_inches, pad_inches, kwargs: 与 Figure.savefig 一致
+
+        Returns
+        -------
+        保存的文件路径列表
+        Example
+            >>> xyplt.save_all('product', formats=('png', 'pdf', 'svg'), dpi=150)
+        """
+        self.check()
+        if formats is not None:
+            files = [f"{os.fspath(files)}.{fmt}" for fmt in formats]
+        elif isinstance(files, (str, os.PathLike)):
+            files = [files]
+        figure = self.figure
+        engine = figure.get_layout_engine()
+        dpi = mpl.rcParams['savefig.dpi'] if dpi is None else dpi
+        dpi = figure.dpi if dpi == 'figure' else dpi
+        raw_dpi = figure.dpi
+        with call_path('savefig'):
+            # 与 savefig 一样在目标分辨率下绘制一次, 完成布局并得到裁剪范围(文字等尺寸随分辨率取整, 布局与分辨率有关)
+            figure.dpi = dpi
+            try:
+                figure.canvas.draw()
+                bbox_inches = mpl.rcParams['savefig.bbox'] if bbox_inches is None else bbox_inches
+                if bbox_inches == 'tight':
+                    pad = mpl.rcParams['savefig.pad_inches'] if pad_inches in (None, 'layout') else pad_inches
+                    bbox_inches = figure.get_tightbbox(figure.canvas.get_renderer()).padded(pad)
+            finally:
+                figure.dpi = raw_dpi
+            if engine is not None:
+                figure.set_layout_engine('none')
+            try:
+                for file in files:
+                    figure.savefig(file, dpi=dpi, bbox_inches=bbox_inches, **kwargs)
+            finally:
+                if engine is not None:
+                    figure.set_layout_engine(engine)
+        return list(files)
+
+    def to_bytes(self, format: str = 'png', dpi=None, **kwargs) -> bytes:
+        """
+        将画布渲染到内存中并返回编码后的字节内容, 无需写入临时文件
+        Parameters
+        ----------
+        format: 图片格式, 如 png、jpg、svg、pdf
+        dpi: 分辨率, 为None时使用 rcParams['savefig.dpi']
+        kwargs: 其它参数, 与 Figure.savefig 一致
+        """
+        self.check()
+        buffer = io.BytesIO()
+        with call_path('savefig'):
+            self.figure.savefig(buffer, format=format, dpi=dpi, **kwargs)
+        return buffer.getvalue()
+
+    def to_rgba(self, dpi=None) -> np.ndarray:
+        """
+        将画布渲染为 RGBA 像素数组, shape 为 (高, 宽, 4), dtype 为 uint8
+        画布为 Agg 画布时直接返回渲染缓冲区的视图(不拷贝), 该视图在画布下一次绘制时会被覆盖, 需要保留时请自行 copy
+        Parameters
+        ----------
+        dpi: 分辨率, 为None时使用画布自身的分辨率
+        """
+        self.check()
+        figure = self.figure
+        raw_dpi = figure.dpi
+        if dpi is not None:
+            figure.dpi = dpi
+        try:
+            canvas = figure.canvas
+            if isinstance(canvas, FigureCanvasAgg):
+                with call_path('draw'):
+                    canvas.draw()
+                return np.asarray(canvas.buffer_rgba())
+            # 非 Agg 画布(如交互式后端)时, 通过 savefig 渲染原始 RGBA 数据
+            width, height = (int(round(n)) for n in figure.bbox.size)
+            buffer = io.BytesIO()
+            with call_path('draw'):
+                figure.savefig(buffer, format='rgba', dpi=figure.dpi)
+            return np.frombuffer(buffer.getbuffer(), dtype=np.uint8).reshape(height, width, 4)
+        finally:
+            figure.dpi = raw_dpi
+
+    def close(self):
+        """关闭画布, 释放画布及增量模式下记录的绘图对象"""
+        if self.figure is not None:
+            if self.figure.canvas.manager is not None:
+                # 画布已通过 show 交由 pyplot 管理
+                import matplotlib.pyplot as plt
+                plt.close(self.figure)
+            self.figure.clear()
+            self.figure = None
+        self.artists.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
 
     def check(self):
         """检查"""
@@ -128,12 +374,91 @@ class XyPlotDirector:
             )
 
 
+def new_figure(**kwargs):
+    """
+    创建画布对象, 参数与 matplotlib.figure.Figure 一致
+    画布直接使用 Agg 画布渲染, 不注册到 pyplot 的全局画布列表中, 不再引用后即可被回收, 也可在多个线程中分别使用
+    """
+    figure = Figure(**kwargs)
+    FigureCanvasAgg(figure)
+    return figure
+
+
+def remove_artist(artist):
+    """从画布中移除绘图对象"""
+    for a in _flatten_artist(artist):
+        if a.axes is not None or a.figure is not None:
+            a.remove()
+
+
+def replace_artist(old, new):
+    """用新的绘图对象替换旧的绘图对象, 保持其在子区域中的绘制顺序"""
+    old_lst = _flatten_artist(old)
+    new_lst = _flatten_artist(new)
+    axes = old_lst[0].axes if old_lst else None
+    if axes is not None:
+        children = _axes_children(axes)
+        if old_lst[0] in children and all(a in children for a in new_lst):
+            # 旧对象之后添加的对象依次移除, 在新对象之后重新添加, 新对象即位于旧对象原来的位置
+            later = [a for a in children[children.index(old_lst[0]):] if a not in old_lst and a not in new_lst]
+            for a in new_lst + later:
+                a.remove()
+            for a in new_lst + later:
+                _add_child(axes, a)
+    remove_artist(old)
+
+
+def _axes_children(axes) -> list:
+    """子区域中添加的绘图对象, 按添加顺序(即 zorder 相同时的绘制顺序)排列, 不包括坐标轴、标题等"""
+    added = {id(a) for group in (axes.lines, axes.collections, axes.patches, axes.images, axes.texts, axes.tables,
+                                 axes.artists) for a in group}
+    return [a for a in axes.get_children() if id(a) in added]
+
+
+def _add_child(axes, artist):
+    """使用与类型对应的方法将绘图对象添加到子区域"""
+    from matplotlib.collections import Collection
+    from matplotlib.image import AxesImage
+    from matplotlib.lines import Line2D
+    from matplotlib.patches import Patch
+    from matplotlib.table import Table
+    if isinstance(artist, Line2D):
+        axes.add_line(artist)
+    elif isinstance(artist, Collection):
+        axes.add_collection(artist, autolim=False)
+    elif isinstance(artist, Patch):
+        axes.add_patch(artist)
+    elif isinstance(artist, AxesImage):
+        axes.add_image(artist)
+    elif isinstance(artist, Table):
+        axes.add_table(artist)
+    else:
+        axes.add_artist(artist)
+
+
+def _flatten_artist(artist):
+    """展开绘图方法返回的绘图对象(列表、StreamplotSet 等)"""
+    if isinstance(artist, (list, tuple)):
+        return [a for sub in artist for a in _flatten_artist(sub)]
+    if hasattr(artist, 'lines') and hasattr(artist, 'arrows'):
+        # streamplot 的箭头以 FancyArrowPatch 逐个添加在流线之后, StreamplotSet.arrows 本身并未添加到子区域中
+        from matplotlib.patches import FancyArrowPatch
+        lines = artist.lines
+        if lines.axes is None:
+            return [lines]
+        children = _axes_children(lines.axes)
+        start = children.index(lines) + 1
+        arrows = children[start:start + len(artist.arrows.get_paths())]
+        return [lines] + [a for a in arrows if isinstance(a, FancyArrowPatch)]
+    return [artist]
+
+
 class AxesBuilder(metaclass=ABCMeta):
     """
     Axes 建造者
     """
 
-    def __init__(self, figure: Optional[plt.Figure] = None, **kwargs):
+    def __init__(self, figure: Optional[Figure] = None, **kwargs):
         """
         添加子区域绘图对象并对其进行设置与绘制 抽象模板方法类
         Parameters
@@ -143,7 +468,7 @@ class AxesBuilder(metaclass=ABCMeta):
             1. axes and init, 适用于绘制多个子区域图
             2. 等同于 SetAxes类 的 kwargs 可选参数
         """
-        self.figure = figure if figure is not None else plt.figure()
+        self.figure = figure if figure is not None else new_figure()
         self.execute(**kwargs)
 
     def execute(self, **kwargs):
@@ -160,7 +485,8 @@ class AxesBuilder(metaclass=ABCMeta):
                 f"Optional types of {INIT_NAME!r} include tuple、list、dict"
             )
         # 根据初始化设置信息调度构建方法, 创建 axes 对象 列表
-        ax_lst = self.create_axes(self.figure, init_lst)
+        with call_path(INIT_NAME):
+            ax_lst = self.create_axes(self.figure, init_lst)
         # ax_lst = method_call(XyPlotAdapter, init_lst, self.create_axes, self.figure)
         if not isinstance(ax_lst, list):
             raise TypeError(
@@ -198,11 +524,19 @@ class AxesBuilder(metaclass=ABCMeta):
         """
         调度设置axes
         """
-        for ax, cfg in zip(ax_lst, cfg_lst):
-            method_call(XyPlotAdapter, copy.deepcopy(cfg), SetAxes, ax)
+        # 多个子区域时, 预先在线程池中并行计算各子区域的等值线几何(编译渲染计划时不计算)
+        if len(ax_lst) > 1 and not isinstance(ax_lst[0], PlanTarget):
+            from .DrawContourf import precompute_contours
+            scope = precompute_contours(cfg_lst)
+        else:
+            scope = nullcontext()
+        with scope:
+            for i, (ax, cfg) in enumerate(zip(ax_lst, cfg_lst)):
+                with call_path(i):
+                    method_call(XyPlotAdapter, cfg, SetAxes, ax)
 
     @abstractmethod
-    def create_axes(self, figure: plt.figure, init_lst: list) -> list:
+    def create_axes(self, figure: Figure, init_lst: list) -> list:
         ...
 
 
@@ -210,10 +544,11 @@ class SubplotBuilder(AxesBuilder):
     """
     使用subplot构建axes
     """
-    def create_axes(self, figure: plt.figure, init_lst: list) -> list:
+    def create_axes(self, figure: Figure, init_lst: list) -> list:
         ax_lst = []
         for init_cfg in init_lst:
-            ax = method_call(plt.subplot, init_cfg)
+            # 等同于 plt.subplot, 但直接作用于传入的画布对象
+            ax = method_call(figure.add_subplot, init_cfg)
             ax_lst.append(ax)
         return ax_lst
 
@@ -222,19 +557,25 @@ class Subplot2gridBuilder(AxesBuilder):
     """
     使用subplot2grid 构建 axes
     """
-    def create_axes(self, figure: Optional[plt.figure], init_lst: list) -> list:
+    def create_axes(self, figure: Optional[Figure], init_lst: list) -> list:
         ax_lst = []
         for init_cfg in init_lst:
-            ax = method_call(plt.subplot2grid, init_cfg)
+            ax = method_call(self.subplot2grid, init_cfg, figure)
             ax_lst.append(ax)
         return ax_lst
 
+    @staticmethod
+    def subplot2grid(figure, shape, loc, rowspan=1, colspan=1, **kwargs):
+        """等同于 plt.subplot2grid, 但直接作用于传入的画布对象"""
+        grid_spec = figure.add_gridspec(*shape)
+        return figure.add_subplot(grid_spec.new_subplotspec(loc, rowspan, colspan), **kwargs)
+
 
 class AddAxesBuilder(AxesBuilder):
     """
     使用add_axes 构建 axes
     """
-    def create_axes(self, figure: plt.figure, init_lst: list) -> list:
+    def create_axes(self, figure: Figure, init_lst: list) -> list:
         ax_lst = []
         for init_cfg in init_lst:
             ax = method_call(figure.add_axes, init_cfg)
@@ -244,19 +585,68 @@ class AddAxesBuilder(AxesBuilder):
 
 class SetTempRc:
     """
-    修改mpl.rcParams
+    临时修改mpl.rcParams, 只记录并恢复被修改的键
+    配置经 matplotlib 校验后会被缓存, 同一主题配置在多次绘图中重复使用时无需再次校验
+    可作为上下文管理器使用, 退出时(包括发生异常时)恢复原有设置
     """
     def __init__(self, **kwargs):
-        self.Raw_Rc = copy.copy(mpl.rcParams)
-        self.execute(**kwargs)
+        rc = validate_rc(kwargs)
+        self.Raw_Rc = {k: _rc_get(k) for k in rc}
+        self.execute(**rc)
 
     @staticmethod
     def execute(**kwargs):
-        """执行修改"""
+        """执行修改, kwargs 需为已校验的配置(校验见 validate_rc), 恢复时原样写回原有的值"""
         for k, v in kwargs.items():
-            mpl.rcParams[k] = v
+            _rc_set(k, v)
 
     def revert(self):
         """恢复原有设置"""
-        for k, v in self.Raw_Rc.items():
-            mpl.rcParams[k] = v
+        self.execute(**self.Raw_Rc)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.revert()
+
+
+_RC_CACHE = OrderedDict()   # 校验后的 rcParams 配置缓存(LRU)
+_RC_CACHE_SIZE = 32
+
+
+def validate_rc(rc: dict) -> dict:
+    """
+    使用 matplotlib 的校验器校验 rcParams 配置, 返回校验(类型转换)后的配置字典
+    配置中的值均可哈希(列表按元组处理)时缓存校验结果
+    """
+    key = _freeze(rc)
+    if key is not None and key in _RC_CACHE:
+        _RC_CACHE.move_to_end(key)
+        validated = _RC_CACHE[key]
+    else:
+        # 经 RcParams.__setitem__ 校验(包括 backend 等特殊键的处理与弃用提示)
+        params = mpl.RcParams(rc)
+        validated = {k: _rc_get(k, params) for k in dict.keys(params)}
+        if key is not None:
+            _RC_CACHE[key] = validated
+            while len(_RC_CACHE) > _RC_CACHE_SIZE:
+                _RC_CACHE.popitem(last=False)
+    # 列表等可变的值每次返回副本, 修改 rcParams 中的值不会影响缓存
+    return {k: v.copy() if isinstance(v, (list, dict)) else v for k, v in validated.items()}
+
+
+def _rc_get(key, params=None):
+    """读取 rcParams(默认为全局的 mpl.rcParams)中存储的值, 不经过弃用与后端解析逻辑"""
+    params = mpl.rcParams if params is None else params
+    if hasattr(params, '_get'):
+        return params._get(key)
+    return dict.__getitem__(params, key)
+
+
+def _rc_set(key, value):
+    """写入已校验的值, matplotlib 3.7 起使用 RcParams._set(保证 API 稳定的直接写入接口)"""
+    if hasattr(mpl.rcParams, '_set'):
+        mpl.rcParams._set(key, value)
+    else:
+        dict.__setitem__(mpl.rcParams, key, value)